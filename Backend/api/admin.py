@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Cart, CartItem, Category, Order, User, Restaurant, MenuItem
+from .models import Cart, CartItem, Category, CrewAvailability, DeliveryAssignment, Order, User, Restaurant, MenuItem
 
 admin.site.register(User)
 admin.site.register(Restaurant)
@@ -8,3 +8,5 @@ admin.site.register(Category)
 admin.site.register(CartItem)
 admin.site.register(Cart)
 admin.site.register(Order)
+admin.site.register(CrewAvailability)
+admin.site.register(DeliveryAssignment)
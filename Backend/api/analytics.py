@@ -0,0 +1,126 @@
+# analytics.py
+"""
+Order counts and revenue per hour, day or week, restaurant and status.
+
+Grouping happens in the database (current and archived orders). A bucket
+that has ended can only change when one of its orders is edited, so closed
+buckets are cached per region and granularity, and an order save drops the
+buckets it falls in. Each call therefore queries just the open bucket plus
+any closed ones not cached yet.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from . import metrics
+from .models import ArchivedOrder, Order
+
+GRANULARITIES = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+}
+# Window returned when no start is given
+DEFAULT_SPANS = {'hour': 24, 'day': 30, 'week': 12}
+MAX_BUCKETS = 1000
+ALL_REGIONS = '*'
+
+
+def bucket_start(moment, granularity):
+    """Start of the bucket containing `moment`, in the current time zone (weeks start on Monday)."""
+    moment = timezone.localtime(moment)
+    if granularity == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    start = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == 'week':
+        start -= timedelta(days=start.weekday())
+    return timezone.make_aware(start.replace(tzinfo=None))
+
+
+def next_bucket(start, granularity):
+    if granularity == 'hour':
+        return start + GRANULARITIES['hour']
+    # Step in local wall time, so days stay aligned across DST changes
+    return timezone.make_aware(timezone.localtime(start).replace(tzinfo=None) + GRANULARITIES[granularity])
+
+
+def bucket_starts(start, end, granularity):
+    """Starts of the buckets overlapping [start, end)."""
+    starts, current = [], bucket_start(start, granularity)
+    while current < end:
+        starts.append(current)
+        current = next_bucket(current, granularity)
+    return starts
+
+
+def cache_key(region, granularity, start):
+    return f'order-analytics:{region}:{granularity}:{start.isoformat()}'
+
+
+def query_buckets(region, granularity, start, end):
+    """{bucket start: rows} for orders created in [start, end), straight from the database."""
+    buckets = {}
+    for model in (Order, ArchivedOrder):
+        queryset = model.objects.filter(created_at__gte=start, created_at__lt=end)
+        if region != ALL_REGIONS:
+            queryset = queryset.filter(restaurant__region=region)
+        rows = (
+            queryset.annotate(bucket=Trunc('created_at', granularity))
+            .values('bucket', 'restaurant_id', 'restaurant__name', 'status')
+            .annotate(orders=Count('pk'), revenue=Sum('total_amount'))
+            .order_by()
+        )
+        for row in rows:
+            grouped = buckets.setdefault(row['bucket'], {})
+            key = (row['restaurant_id'], row['status'])
+            if key in grouped:
+                grouped[key]['orders'] += row['orders']
+                grouped[key]['revenue'] += row['revenue']
+            else:
+                grouped[key] = {
+                    'restaurant': row['restaurant_id'],
+                    'restaurant_name': row['restaurant__name'],
+                    'status': row['status'],
+                    'orders': row['orders'],
+                    'revenue': row['revenue'],
+                }
+    return {bucket: sorted(grouped.values(), key=lambda row: (row['restaurant'], row['status'])) for bucket, grouped in buckets.items()}
+
+
+def order_buckets(region, granularity, start, end):
+    """
+    [(bucket start, closed, rows)] for [start, end). `region` is a restaurant
+    region or ALL_REGIONS.
+    """
+    open_start = bucket_start(timezone.now(), granularity)
+    starts = bucket_starts(start, end, granularity)
+    closed = [bucket for bucket in starts if bucket < open_start]
+    keys = {bucket: cache_key(region, granularity, bucket) for bucket in closed}
+    cached = cache.get_many(keys.values())
+    rows = {bucket: cached[key] for bucket, key in keys.items() if key in cached}
+
+    missing = [bucket for bucket in closed if bucket not in rows]
+    metrics.record_cache_lookup('analytics', True, len(rows))
+    metrics.record_cache_lookup('analytics', False, len(missing))
+    if missing:
+        # One query over the span of the missing buckets
+        fetched = query_buckets(region, granularity, missing[0], next_bucket(missing[-1], granularity))
+        for bucket in missing:
+            rows[bucket] = fetched.get(bucket, [])
+        cache.set_many({keys[bucket]: rows[bucket] for bucket in missing}, settings.ANALYTICS_CACHE_TIMEOUT)
+    if starts and starts[-1] >= open_start:
+        rows.update(query_buckets(region, granularity, open_start, next_bucket(open_start, granularity)))
+    return [(bucket, bucket < open_start, rows.get(bucket, [])) for bucket in starts]
+
+
+def invalidate_order(order, region):
+    """Drops the cached buckets `order` is counted in."""
+    keys = [
+        cache_key(scope, granularity, bucket_start(order.created_at, granularity))
+        for scope in (region, ALL_REGIONS) for granularity in GRANULARITIES
+    ]
+    cache.delete_many(keys)
@@ -0,0 +1,116 @@
+# archiving.py
+"""
+Hot/cold order storage.
+
+Delivered and cancelled orders older than ORDER_ARCHIVE_AFTER_DAYS are moved,
+in batches, from Order/OrderItem into ArchivedOrder/ArchivedOrderItem (same
+ids), so the tables every kitchen screen and manager list scans stay small.
+OrderHistory reads both as one newest-first collection.
+"""
+import asyncio
+import heapq
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import ArchivedOrder, ArchivedOrderItem, CrewAvailability, Order, OrderItem
+
+ARCHIVABLE_STATUSES = ('delivered', 'cancelled')
+REVENUE_STATUSES = ('confirmed', 'preparing', 'ready', 'delivered')
+ORDER_FIELDS = [field.attname for field in Order._meta.concrete_fields]
+ITEM_FIELDS = [field.attname for field in OrderItem._meta.concrete_fields]
+
+
+def archivable_orders(older_than_days):
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    return Order.objects.filter(status__in=ARCHIVABLE_STATUSES, created_at__lt=cutoff)
+
+
+def archive_batch(queryset, batch_size):
+    """Moves up to `batch_size` orders of `queryset`, with their items, to the archive. Returns how many moved."""
+    with transaction.atomic():
+        orders = list(queryset.order_by('id').select_for_update()[:batch_size].values(*ORDER_FIELDS))
+        if not orders:
+            return 0
+        ids = [order['id'] for order in orders]
+        items = OrderItem.objects.filter(order_id__in=ids).values(*ITEM_FIELDS)
+        ArchivedOrder.objects.bulk_create([ArchivedOrder(**order) for order in orders])
+        ArchivedOrderItem.objects.bulk_create([ArchivedOrderItem(**item) for item in items])
+        OrderItem.objects.filter(order_id__in=ids).delete()
+        # Their delivery assignments are deleted with them
+        CrewAvailability.release(Order.objects.filter(id__in=ids))
+        Order.objects.filter(id__in=ids).delete()
+    return len(ids)
+
+
+TOTALS = {'count': Count('pk'), 'revenue': Sum('total_amount', filter=Q(status__in=REVENUE_STATUSES))}
+
+
+def _add_totals(results):
+    return sum(totals['count'] for totals in results), sum(totals['revenue'] or 0 for totals in results)
+
+
+def order_totals(**filters):
+    """(order count, revenue) over current and archived orders matching `filters`."""
+    return _add_totals([model.objects.filter(**filters).aggregate(**TOTALS) for model in (Order, ArchivedOrder)])
+
+
+async def aorder_totals(**filters):
+    """order_totals() on the async ORM, both tables at once."""
+    return _add_totals(await asyncio.gather(*(model.objects.filter(**filters).aaggregate(**TOTALS) for model in (Order, ArchivedOrder))))
+
+
+class OrderHistory:
+    """
+    Current and archived orders behind a small read-only queryset-like
+    interface: filter(), apply(), get(), count() and newest-first iteration.
+    The two tables share column and relation names, so both kinds of row
+    render with OrderSerializer.
+    """
+    model = Order
+
+    def __init__(self, hot=None, archived=None):
+        self.hot = Order.objects.all() if hot is None else hot
+        self.archived = ArchivedOrder.objects.all() if archived is None else archived
+
+    def apply(self, func):
+        """Applies a queryset transformation (e.g. select_related) to both tables."""
+        return OrderHistory(func(self.hot), func(self.archived))
+
+    def filter(self, *args, **kwargs):
+        return self.apply(lambda queryset: queryset.filter(*args, **kwargs))
+
+    def all(self):
+        return self
+
+    def get(self, *args, **kwargs):
+        try:
+            return self.hot.get(*args, **kwargs)
+        except Order.DoesNotExist:
+            try:
+                return self.archived.get(*args, **kwargs)
+            except ArchivedOrder.DoesNotExist:
+                raise Order.DoesNotExist('Order matching query does not exist.') from None
+
+    async def aget(self, *args, **kwargs):
+        try:
+            return await self.hot.aget(*args, **kwargs)
+        except Order.DoesNotExist:
+            try:
+                return await self.archived.aget(*args, **kwargs)
+            except ArchivedOrder.DoesNotExist:
+                raise Order.DoesNotExist('Order matching query does not exist.') from None
+
+    def count(self):
+        return self.hot.count() + self.archived.count()
+
+    def __iter__(self):
+        return heapq.merge(
+            self.hot.order_by('-created_at', '-id'), self.archived.order_by('-created_at', '-id'),
+            key=lambda order: (order.created_at, order.id), reverse=True,
+        )
+
+    def __len__(self):
+        return self.count()
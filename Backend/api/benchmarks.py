@@ -0,0 +1,631 @@
+# benchmarks.py
+"""
+In-process benchmark of the API hot paths.
+
+Every flow goes through the full middleware and DRF stack with a real JWT,
+against a dataset seeded by `seed()`. Run it with `manage.py benchmark`,
+which does so inside a throwaway test database.
+"""
+import asyncio
+import json
+import math
+import platform
+import random
+import statistics
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.db.models import Sum
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import geo
+from .models import Cart, CartItem, Category, MenuItem, Order, OrderItem, Restaurant, User
+
+FLOWS = {}
+REGION_CENTERS = {'india': (28.61, 77.21), 'america': (40.71, -74.01)}
+
+
+def flow(name):
+    """
+    Registers a benchmark flow. A flow receives the BenchmarkContext and
+    returns a zero-argument callable performing the request to be timed, so
+    per-iteration setup (e.g. filling a cart before checkout) stays untimed.
+    """
+    def register(func):
+        FLOWS[name] = func
+        return func
+    return register
+
+
+class BenchmarkContext:
+    def __init__(self, data):
+        self.data = data
+        self.rng = random.Random(0)
+        self._clients = {}
+
+    def client_for(self, user):
+        if user.pk not in self._clients:
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+            self._clients[user.pk] = client
+        return self._clients[user.pk]
+
+    def random_menu_item(self, region):
+        return self.rng.choice(self.data['menu_items'][region])
+
+
+def seed(scale=1, seed_value=0):
+    """
+    Creates a dataset proportional to `scale`: per region 5*scale restaurants
+    with 20 menu items each, 50*scale members and 200*scale orders.
+    """
+    rng = random.Random(seed_value)
+    positions = random.Random(f'{seed_value}:positions')
+    regions = [code for code, _ in Restaurant.REGION_CHOICES]
+    password = 'benchmark'
+
+    categories = [Category.objects.create(name=name) for name in ('Starters', 'Mains', 'Desserts', 'Drinks')]
+    admin = User.objects.create_user(
+        email='bench-admin@example.com', password=password, first_name='Admin', role='admin', region='global'
+    )
+    data = {'admin': admin, 'managers': {}, 'members': {}, 'menu_items': {}}
+
+    for region in regions:
+        data['managers'][region] = User.objects.create_user(
+            email=f'bench-manager-{region}@example.com', password=password,
+            first_name='Manager', role='manager', region=region,
+        )
+        members = User.objects.bulk_create([
+            User(email=f'bench-member-{region}-{i}@example.com', first_name='Member', role='member', region=region)
+            for i in range(50 * scale)
+        ])
+        data['members'][region] = members
+        # Spread over an area growing with scale, so restaurant density stays the same
+        center_lat, center_lng = REGION_CENTERS[region]
+        spread = 0.1 * math.sqrt(scale)
+        restaurants = []
+        for i in range(5 * scale):
+            latitude = round(center_lat + positions.uniform(-spread, spread), 6)
+            longitude = round(center_lng + positions.uniform(-spread, spread), 6)
+            restaurants.append(Restaurant(
+                name=f'{region.title()} Kitchen {i}', description='Benchmark restaurant ' * 5,
+                cuisine_type='Fusion', region=region, rating='4.5', created_by=admin,
+                latitude=latitude, longitude=longitude, geohash=geo.encode(latitude, longitude),
+            ))
+        restaurants = Restaurant.objects.bulk_create(restaurants)
+        menu_items = MenuItem.objects.bulk_create([
+            MenuItem(
+                restaurant=restaurant, name=f'Dish {i}', description='A benchmark dish ' * 4,
+                price=Decimal(rng.randint(300, 2500)) / 100, category=categories[i % len(categories)],
+            )
+            for restaurant in restaurants
+            for i in range(20)
+        ])
+        data['menu_items'][region] = menu_items
+
+        orders = Order.objects.bulk_create([
+            Order(
+                customer=rng.choice(members), restaurant=rng.choice(restaurants),
+                status=rng.choice([choice for choice, _ in Order.STATUS_CHOICES]),
+                payment_method=rng.choice([choice for choice, _ in Order.PAYMENT_METHOD_CHOICES]),
+                total_amount=Decimal('0.00'),
+            )
+            for _ in range(200 * scale)
+        ])
+        by_restaurant = {}
+        for item in menu_items:
+            by_restaurant.setdefault(item.restaurant_id, []).append(item)
+        order_items = []
+        for order in orders:
+            for item in rng.sample(by_restaurant[order.restaurant_id], rng.randint(1, 4)):
+                order_items.append(OrderItem(order=order, menu_item=item, quantity=rng.randint(1, 3), price=item.price))
+        OrderItem.objects.bulk_create(order_items)
+
+    data['member'] = data['members'][regions[0]][0]
+    return data
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _serialize_ms(response):
+    # RequestInstrumentationMiddleware reports serializer time as `serialize;dur=<ms>`
+    for metric in response.get('Server-Timing', '').split(','):
+        name, _, params = metric.strip().partition(';')
+        if name == 'serialize':
+            return float(params.partition('dur=')[2].split(';')[0])
+    return 0.0
+
+
+def run_flow(ctx, func, iterations, warmup, memory_iterations):
+    for _ in range(warmup):
+        func(ctx)()
+
+    durations, queries, sizes, serialize = [], [], [], []
+    for _ in range(iterations):
+        request = func(ctx)
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = request()
+            durations.append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            raise RuntimeError(f'{func.__name__} returned {response.status_code}: {response.content[:200]!r}')
+        queries.append(len(captured))
+        sizes.append(len(response.content))
+        serialize.append(_serialize_ms(response))
+
+    # tracemalloc slows everything down, so memory gets its own short pass
+    tracemalloc.start()
+    try:
+        for _ in range(memory_iterations):
+            func(ctx)()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    total = sum(durations)
+    return {
+        'iterations': iterations,
+        'throughput_rps': round(iterations / total, 2) if total else None,
+        'mean_ms': round(statistics.mean(durations) * 1000, 3),
+        'p50_ms': round(_percentile(durations, 50) * 1000, 3),
+        'p95_ms': round(_percentile(durations, 95) * 1000, 3),
+        'p99_ms': round(_percentile(durations, 99) * 1000, 3),
+        'queries': round(statistics.mean(queries), 2),
+        'response_bytes': round(statistics.mean(sizes)),
+        'serialize_ms': round(statistics.mean(serialize), 3),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def run_contention(ctx, threads, checkouts):
+    """
+    `threads` managers check out carts holding the same menu item at once,
+    `checkouts` times each, against stock for half of the attempts. Reports
+    checkout throughput and latency, and whether any unit was oversold.
+    Needs a database that serves concurrent connections (not in-memory SQLite).
+    """
+    region = ctx.data['member'].region
+    menu_item = ctx.data['menu_items'][region][0]
+    attempts = threads * checkouts
+    MenuItem.objects.filter(pk=menu_item.pk).update(stock=attempts // 2, is_available=True)
+    managers = User.objects.bulk_create([
+        User(email=f'bench-contention-{i}@example.com', first_name='Manager', role='manager', region=region)
+        for i in range(threads)
+    ])
+    clients = []
+    for manager in managers:
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(manager)}')
+        clients.append((client, Cart.objects.create(customer=manager).id))
+
+    barrier = threading.Barrier(threads)
+    durations, outcomes, errors = [], [], []
+
+    def worker(client, cart_id):
+        try:
+            barrier.wait()
+            for _ in range(checkouts):
+                client.post(reverse('cart-add-item', args=[cart_id]), {'menu_item_id': menu_item.pk}, format='json')
+                started = time.perf_counter()
+                response = client.post(reverse('cart-checkout', args=[cart_id]), {'payment_method': 'cash'}, format='json')
+                durations.append(time.perf_counter() - started)
+                outcomes.append(response.status_code)
+                if response.status_code == 409:
+                    Cart.objects.get(pk=cart_id).clear()
+        except Exception as e:
+            errors.append(repr(e))
+        finally:
+            connection.close()
+
+    workers = [threading.Thread(target=worker, args=args) for args in clients]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if errors:
+        raise RuntimeError(f'contention workers failed: {errors[:3]}')
+
+    menu_item.refresh_from_db()
+    sold = OrderItem.objects.filter(menu_item=menu_item, order__customer__in=managers).aggregate(total=Sum('quantity'))['total'] or 0
+    return {
+        'threads': threads,
+        'attempts': attempts,
+        'initial_stock': attempts // 2,
+        'created': outcomes.count(201),
+        'out_of_stock': outcomes.count(409),
+        'other_statuses': sorted(set(outcomes) - {201, 409}),
+        'units_sold': sold,
+        'final_stock': menu_item.stock,
+        'oversold': sold > attempts // 2,
+        'is_available': menu_item.is_available,
+        'checkouts_per_s': round(len(durations) / elapsed, 2),
+        'p50_ms': round(_percentile(durations, 50) * 1000, 3),
+        'p95_ms': round(_percentile(durations, 95) * 1000, 3),
+    }
+
+
+def _read_requests(ctx):
+    """(Authorization header, [(path, query string)]) of the async read endpoints, for a member with orders."""
+    order = Order.objects.filter(restaurant__region=ctx.data['member'].region).select_related('customer').order_by('pk').first()
+    return f'Bearer {AccessToken.for_user(order.customer)}', [
+        (reverse('menuitem-list'), f'restaurant_id={order.restaurant_id}'),
+        (reverse('restaurant-list'), ''),
+        (reverse('order-detail', args=[order.pk]), ''),
+        (reverse('member-dashboard'), ''),
+    ]
+
+
+def _summary(durations, statuses, elapsed):
+    return {
+        'requests_per_s': round(len(durations) / elapsed, 2),
+        'p50_ms': round(_percentile(durations, 50) * 1000, 3),
+        'p95_ms': round(_percentile(durations, 95) * 1000, 3),
+        'non_200': len(statuses) - statuses.count(200),
+    }
+
+
+def _run_wsgi(authorization, paths, clients, requests, workers):
+    """`clients` clients, each waiting for its previous response, served by `workers` sync workers (threads)."""
+    pool = ThreadPoolExecutor(max_workers=workers)
+    local = threading.local()
+    durations, statuses = [], []
+
+    def serve(path, query):
+        if not hasattr(local, 'client'):
+            local.client = Client(HTTP_AUTHORIZATION=authorization)
+        return local.client.get(f'{path}?{query}').status_code
+
+    def client(index):
+        for n in range(requests):
+            started = time.perf_counter()
+            statuses.append(pool.submit(serve, *paths[(index + n) % len(paths)]).result())
+            durations.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    # One close per worker thread: each waits for the others, so every thread gets one
+    barrier = threading.Barrier(workers)
+    for future in [pool.submit(lambda: (barrier.wait(), connection.close())) for _ in range(workers)]:
+        future.result()
+    pool.shutdown()
+    return {'workers': workers, **_summary(durations, statuses, elapsed)}
+
+
+async def _asgi_get(app, authorization, path, query):
+    """One GET through the ASGI application, as an ASGI server would make it. Returns the status."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': query.encode(), 'root_path': '',
+        'headers': [(b'host', b'testserver'), (b'authorization', authorization.encode())],
+        'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+    }
+    body_sent = False
+    messages = []
+
+    async def receive():
+        nonlocal body_sent
+        if body_sent:  # Nothing more until the client disconnects
+            await asyncio.Event().wait()
+        body_sent = True
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return messages[0]['status']
+
+
+def _run_asgi(authorization, paths, clients, requests):
+    """The same clients, all served at once by one ASGI event loop."""
+    app = ASGIHandler()
+    durations, statuses = [], []
+
+    async def client(index):
+        for n in range(requests):
+            started = time.perf_counter()
+            statuses.append(await _asgi_get(app, authorization, *paths[(index + n) % len(paths)]))
+            durations.append(time.perf_counter() - started)
+
+    async def main():
+        await asyncio.gather(*(client(i) for i in range(clients)))
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    return _summary(durations, statuses, time.perf_counter() - started)
+
+
+def run_concurrency(ctx, clients, requests, workers, db_latency_ms=0):
+    """
+    `clients` concurrent clients make `requests` reads each (menu list,
+    restaurant list, order detail, member dashboard in turn), once against
+    `workers` gunicorn-style sync workers and once against the ASGI
+    application. `db_latency_ms` adds that much sleep to every query, as a
+    network round trip to the database would. Needs a database that serves
+    concurrent connections (not in-memory SQLite).
+    """
+    authorization, paths = _read_requests(ctx)
+
+    def add_latency(execute, sql, params, many, context):
+        time.sleep(db_latency_ms / 1000)
+        return execute(sql, params, many, context)
+
+    def on_connect(connection, **kwargs):
+        # First, so the request instrumentation's execute_wrapper() pops its own wrapper, not this one
+        connection.execute_wrappers.insert(0, add_latency)
+
+    if db_latency_ms:
+        connection_created.connect(on_connect)
+    conn_max_age = connection.settings_dict['CONN_MAX_AGE']
+    try:
+        wsgi = _run_wsgi(authorization, paths, clients, requests, workers)
+        # As restaurant/asgi.py sets it: every ASGI request has its own thread, so its own connection
+        connection.settings_dict['CONN_MAX_AGE'] = 0
+        asgi = _run_asgi(authorization, paths, clients, requests)
+    finally:
+        connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+        connection_created.disconnect(on_connect)
+    return {'clients': clients, 'requests': clients * requests, 'db_latency_ms': db_latency_ms, 'wsgi': wsgi, 'asgi': asgi}
+
+
+# Django's own middleware, which api.middleware's versions skip for API requests
+STOCK_MIDDLEWARE = {
+    'api.middleware.SessionMiddleware': 'django.contrib.sessions.middleware.SessionMiddleware',
+    'api.middleware.CsrfViewMiddleware': 'django.middleware.csrf.CsrfViewMiddleware',
+    'api.middleware.AuthenticationMiddleware': 'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.middleware.MessageMiddleware': 'django.contrib.messages.middleware.MessageMiddleware',
+}
+
+
+def run_middleware(ctx, iterations, warmup):
+    """
+    Times two cheap API requests, a 304 revalidation of the menu list and an
+    unknown path's 404, with Django's session, CSRF, auth and message
+    middleware (`stock`) and with the API skipping them (`lean`), so the
+    difference is their per-request overhead.
+    """
+    member = ctx.data['member']
+    authorization = f'Bearer {AccessToken.for_user(member)}'
+    url = reverse('menuitem-list')
+    params = {'restaurant_id': ctx.random_menu_item(member.region).restaurant_id}
+    etag = ctx.client_for(member).get(url, params)['ETag']
+    requests = {
+        'menu_list_revalidate': lambda client: client.get(url, params, HTTP_IF_NONE_MATCH=etag),
+        'api_not_found': lambda client: client.get('/api/v1/no-such-endpoint/'),
+    }
+    stock = [STOCK_MIDDLEWARE.get(path, path) for path in settings.MIDDLEWARE]
+
+    clients = {}
+    for variant, middleware in (('stock', stock), ('lean', list(settings.MIDDLEWARE))):
+        with override_settings(MIDDLEWARE=middleware):
+            clients[variant] = APIClient()
+            clients[variant].credentials(HTTP_AUTHORIZATION=authorization)
+            for request in requests.values():  # The first request loads the middleware
+                for _ in range(warmup):
+                    request(clients[variant])
+
+    report = {variant: {} for variant in clients}
+    # DEBUG would answer the 404 with its technical page
+    with override_settings(DEBUG=False):
+        for name, request in requests.items():
+            durations, queries = {variant: [] for variant in clients}, {variant: [] for variant in clients}
+            for _ in range(iterations):
+                for variant, client in clients.items():  # Interleaved, so drift affects both alike
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        request(client)
+                        durations[variant].append(time.perf_counter() - started)
+                    queries[variant].append(len(captured))
+            for variant in clients:
+                report[variant][name] = {
+                    'mean_ms': round(statistics.mean(durations[variant]) * 1000, 3),
+                    'p50_ms': round(_percentile(durations[variant], 50) * 1000, 3),
+                    'queries': round(statistics.mean(queries[variant]), 2),
+                }
+    report['saved_p50_ms'] = {
+        name: round(report['stock'][name]['p50_ms'] - report['lean'][name]['p50_ms'], 3) for name in requests
+    }
+    return report
+
+
+def run_suite(scale=1, iterations=50, warmup=5, memory_iterations=5, names=None, seed_value=0, contention_threads=0,
+              contention_checkouts=20, concurrency_clients=0, concurrency_requests=20, sync_workers=4, db_latency_ms=0,
+              middleware=False):
+    """
+    Seeds the current database and runs the selected flows, then the stock
+    contention run if `contention_threads` is set, the WSGI/ASGI concurrency
+    run if `concurrency_clients` is and the middleware comparison if
+    `middleware` is. Returns a JSON-serialisable report.
+    """
+    names = names or list(FLOWS)
+    unknown = set(names) - set(FLOWS)
+    if unknown:
+        raise ValueError(f"Unknown benchmark flows: {', '.join(sorted(unknown))}")
+
+    # Throttling would turn repeated checkouts into 429s
+    rest_framework = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {scope: None for scope in settings.REST_FRAMEWORK.get('DEFAULT_THROTTLE_RATES', {})},
+    }
+    # Jobs (menu document rebuilds) run inline so they never race the timed requests
+    with override_settings(REST_FRAMEWORK=rest_framework, JOBS_EAGER=True):
+        ctx = BenchmarkContext(seed(scale, seed_value))
+        results = {name: run_flow(ctx, FLOWS[name], iterations, warmup, memory_iterations) for name in names}
+        contention = run_contention(ctx, contention_threads, contention_checkouts) if contention_threads else None
+        concurrency = None
+        if concurrency_clients:
+            concurrency = run_concurrency(ctx, concurrency_clients, concurrency_requests, sync_workers, db_latency_ms)
+        middleware_overhead = run_middleware(ctx, iterations, warmup) if middleware else None
+
+    report = {
+        'meta': {
+            'scale': scale,
+            'iterations': iterations,
+            'seed': seed_value,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+        },
+        'flows': results,
+    }
+    if contention:
+        report['contention'] = contention
+    if concurrency:
+        report['concurrency'] = concurrency
+    if middleware_overhead:
+        report['middleware'] = middleware_overhead
+    return report
+
+
+def compare(report, baseline, tolerance=0.2):
+    """
+    Lists regressions of `report` against `baseline`: a p50/p95 latency more
+    than `tolerance` (as a fraction) above the baseline, or any flow issuing
+    more queries than it used to.
+    """
+    regressions = []
+    for name, result in report['flows'].items():
+        previous = baseline.get('flows', {}).get(name)
+        if not previous:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            if result[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(f'{name}: {metric} {previous[metric]} -> {result[metric]}')
+        if result['queries'] > previous['queries']:
+            regressions.append(f"{name}: queries {previous['queries']} -> {result['queries']}")
+    return regressions
+
+
+def load_report(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+@flow('menu_list')
+def menu_list(ctx):
+    client = ctx.client_for(ctx.data['member'])
+    restaurant_id = ctx.random_menu_item(ctx.data['member'].region).restaurant_id
+    url = reverse('menuitem-list')
+    return lambda: client.get(url, {'restaurant_id': restaurant_id})
+
+
+@flow('menu_list_expanded')
+def menu_list_expanded(ctx):
+    client = ctx.client_for(ctx.data['member'])
+    restaurant_id = ctx.random_menu_item(ctx.data['member'].region).restaurant_id
+    url = reverse('menuitem-list')
+    return lambda: client.get(url, {'restaurant_id': restaurant_id, 'expand': 'category,restaurant'})
+
+
+@flow('menu_list_revalidate')
+def menu_list_revalidate(ctx):
+    client = ctx.client_for(ctx.data['member'])
+    params = {'restaurant_id': ctx.random_menu_item(ctx.data['member'].region).restaurant_id}
+    url = reverse('menuitem-list')
+    etag = client.get(url, params)['ETag']
+    return lambda: client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+
+
+@flow('restaurant_menu')
+def restaurant_menu(ctx):
+    # The same menu as menu_list, pre-rendered
+    client = ctx.client_for(ctx.data['member'])
+    url = reverse('restaurant-menu', args=[ctx.random_menu_item(ctx.data['member'].region).restaurant_id])
+    return lambda: client.get(url)
+
+
+@flow('restaurant_nearby')
+def restaurant_nearby(ctx):
+    member = ctx.data['member']
+    client = ctx.client_for(member)
+    latitude, longitude = REGION_CENTERS[member.region]
+    url = reverse('restaurant-nearby')
+    return lambda: client.get(url, {'lat': latitude, 'lon': longitude, 'radius': 10})
+
+
+@flow('cart_add')
+def cart_add(ctx):
+    member = ctx.data['member']
+    client = ctx.client_for(member)
+    cart, _ = Cart.objects.get_or_create(customer=member)
+    url = reverse('cart-add-item', args=[cart.id])
+    payload = {'menu_item_id': ctx.random_menu_item(member.region).id, 'quantity': 1}
+    return lambda: client.post(url, payload, format='json')
+
+
+@flow('checkout')
+def checkout(ctx):
+    manager = ctx.data['managers'][ctx.data['member'].region]
+    client = ctx.client_for(manager)
+    cart, _ = Cart.objects.get_or_create(customer=manager)
+    for _ in range(3):
+        CartItem.objects.get_or_create(cart=cart, menu_item=ctx.random_menu_item(manager.region))
+    url = reverse('cart-checkout', args=[cart.id])
+    return lambda: client.post(url, {'payment_method': 'cash'}, format='json')
+
+
+@flow('order_list')
+def order_list(ctx):
+    client = ctx.client_for(ctx.data['managers'][ctx.data['member'].region])
+    url = reverse('order-list')
+    return lambda: client.get(url)
+
+
+@flow('order_list_expanded')
+def order_list_expanded(ctx):
+    # What every order list returned before ids became the default
+    client = ctx.client_for(ctx.data['managers'][ctx.data['member'].region])
+    url = reverse('order-list')
+    return lambda: client.get(url, {'expand': 'restaurant,items.menu_item.category'})
+
+
+@flow('order_list_gzip')
+def order_list_gzip(ctx):
+    client = ctx.client_for(ctx.data['managers'][ctx.data['member'].region])
+    url = reverse('order-list')
+    return lambda: client.get(url, {'expand': 'restaurant,items.menu_item.category'}, HTTP_ACCEPT_ENCODING='gzip')
+
+
+@flow('admin_dashboard')
+def admin_dashboard(ctx):
+    client = ctx.client_for(ctx.data['admin'])
+    url = reverse('admin-dashboard')
+    return lambda: client.get(url)
+
+
+@flow('manager_dashboard')
+def manager_dashboard(ctx):
+    client = ctx.client_for(ctx.data['managers'][ctx.data['member'].region])
+    url = reverse('manager-dashboard')
+    return lambda: client.get(url)
+
+
+@flow('member_dashboard')
+def member_dashboard(ctx):
+    client = ctx.client_for(ctx.data['member'])
+    url = reverse('member-dashboard')
+    return lambda: client.get(url)
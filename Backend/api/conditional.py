@@ -0,0 +1,90 @@
+# conditional.py
+import hashlib
+from functools import partial
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.http import Http404
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from .fieldsets import FieldSelection
+
+
+class ConditionalGetMixin:
+    """
+    ETag/Last-Modified for list and retrieve, from one MAX(updated_at)/COUNT
+    aggregate over the filtered queryset. A matching If-None-Match (or, on
+    detail routes, If-Modified-Since) gets a 304 before any row is loaded.
+
+    The ETag also covers the query string and the user's role and region, so
+    differently filtered or shaped responses never share a validator.
+    `expanded_last_modified` maps an expandable relation to the field whose
+    MAX must be included when it is embedded.
+
+    `list` is async (for adrf viewsets): its two queries, the aggregate and
+    the rows, go through the async ORM.
+    """
+    last_modified_field = 'updated_at'
+    expanded_last_modified = {}
+
+    async def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag, _ = self.validators_from(await queryset.order_by().aaggregate(**self.get_validator_aggregates()))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            rows = [row async for row in queryset]
+            response = Response(self.get_serializer(rows, many=True).data)
+        return self.add_validators(response, etag, None)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            validators = self.get_validators(queryset.filter(**{self.lookup_field: kwargs[lookup_url_kwarg]}))
+        except (TypeError, ValueError, ValidationError):
+            # A lookup value the field can't hold, as DRF's get_object_or_404 treats it
+            raise Http404
+        render = partial(super().retrieve, request, *args, **kwargs)
+        return self.conditional(request, validators, render, last_modified_header=True)
+
+    def get_validator_aggregates(self):
+        aggregates = {'last_modified': Max(self.last_modified_field), 'count': Count('pk')}
+        selection = FieldSelection.from_request(self.request)
+        for name, field in self.expanded_last_modified.items():
+            if selection.expands(name):
+                aggregates[name] = Max(field)
+        return aggregates
+
+    def get_validators(self, queryset):
+        return self.validators_from(queryset.order_by().aggregate(**self.get_validator_aggregates()))
+
+    def validators_from(self, state):
+        """(ETag, last modified) from the validator aggregates."""
+        user = self.request.user
+        parts = [self.request.META.get('QUERY_STRING', ''), getattr(user, 'role', ''), getattr(user, 'region', '')]
+        parts += [str(state[key]) for key in sorted(state)]
+        etag = 'W/' + quote_etag(hashlib.md5('|'.join(parts).encode(), usedforsecurity=False).hexdigest())
+        last_modified = max((value for key, value in state.items() if key != 'count' and value), default=None)
+        return etag, last_modified
+
+    def conditional(self, request, validators, render, last_modified_header=False):
+        etag, last_modified = validators
+        # HTTP dates have whole-second precision
+        last_modified = int(last_modified.timestamp()) if last_modified and last_modified_header else None
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = render()
+            if not 200 <= response.status_code < 300:
+                return response
+        return self.add_validators(response, etag, last_modified)
+
+    def add_validators(self, response, etag, last_modified):
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        # Per-user responses: let browsers keep them but always revalidate
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Authorization',))
+        return response
@@ -0,0 +1,90 @@
+# dispatch.py
+"""
+Delivery crew assignment.
+
+Each cycle takes a region's ready, unassigned orders and its available crew
+(members of the Crew group with CrewAvailability.is_available), builds the
+crew x order cost matrix with NumPy and solves it as one assignment problem
+(scipy's linear_sum_assignment), then writes every assignment in one
+transaction. Cost is the estimated travel time from the crew member to the
+restaurant, less the minutes the order has been waiting, so older orders
+win when there are more orders than crew. `manage.py assign_deliveries`
+runs the cycles.
+"""
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from scipy.optimize import linear_sum_assignment
+
+from .models import CrewAvailability, DeliveryAssignment, Order
+
+EARTH_RADIUS_KM = 6371.0
+
+
+class AssignmentConflict(Exception):
+    """Another cycle took some of the same crew or orders; the next cycle retries."""
+
+
+def travel_minutes(crew_positions, restaurant_positions):
+    """
+    (crew x orders) estimated travel minutes between [(lat, lng)] arrays, at
+    DELIVERY_SPEED_KMH; unknown positions (NaN) cost DELIVERY_UNKNOWN_TRAVEL_MINUTES.
+    """
+    crew = np.radians(crew_positions)[:, np.newaxis, :]
+    restaurants = np.radians(restaurant_positions)[np.newaxis, :, :]
+    dlat = restaurants[..., 0] - crew[..., 0]
+    dlng = restaurants[..., 1] - crew[..., 1]
+    a = np.sin(dlat / 2) ** 2 + np.cos(crew[..., 0]) * np.cos(restaurants[..., 0]) * np.sin(dlng / 2) ** 2
+    km = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+    minutes = km / settings.DELIVERY_SPEED_KMH * 60
+    return np.where(np.isnan(minutes), settings.DELIVERY_UNKNOWN_TRAVEL_MINUTES, minutes)
+
+
+def match(crew_positions, restaurant_positions, waiting_minutes):
+    """[(crew index, order index, travel minutes)] minimising total cost; min(crew, orders) pairs."""
+    travel = travel_minutes(crew_positions, restaurant_positions)
+    cost = travel - np.asarray(waiting_minutes, dtype=float)[np.newaxis, :]
+    rows, cols = linear_sum_assignment(cost)
+    return [(int(row), int(col), float(travel[row, col])) for row, col in zip(rows, cols)]
+
+
+def pending_orders(region):
+    return Order.objects.filter(status='ready', restaurant__region=region, delivery_assignment__isnull=True)
+
+
+def available_crew(region):
+    return CrewAvailability.objects.filter(
+        is_available=True, crew__is_active=True, crew__region=region, crew__groups__name='Crew',
+    )
+
+
+def assign_region(region):
+    """Runs one cycle for `region`. Returns the DeliveryAssignments made."""
+    orders = list(pending_orders(region).order_by('updated_at', 'id').values_list(
+        'id', 'updated_at', 'restaurant__latitude', 'restaurant__longitude'))
+    crew = list(available_crew(region).order_by('pk').values_list('pk', 'latitude', 'longitude'))
+    if not orders or not crew:
+        return []
+
+    now = timezone.now()
+    pairs = match(
+        np.array([position for _, *position in crew], dtype=float),
+        np.array([position for _, _, *position in orders], dtype=float),
+        [(now - ready_since).total_seconds() / 60 for _, ready_since, *_ in orders],
+    )
+    assignments = [
+        DeliveryAssignment(order_id=orders[col][0], crew_id=crew[row][0], travel_minutes=round(minutes, 1))
+        for row, col, minutes in pairs
+    ]
+    try:
+        with transaction.atomic():
+            crew_ids = [assignment.crew_id for assignment in assignments]
+            # Only crew still available are claimed; any shortfall means a concurrent cycle won them
+            if CrewAvailability.objects.filter(pk__in=crew_ids, is_available=True).update(is_available=False) != len(crew_ids):
+                raise AssignmentConflict(f'crew in {region} were assigned concurrently')
+            DeliveryAssignment.objects.bulk_create(assignments)
+    except IntegrityError as e:
+        raise AssignmentConflict(f'orders in {region} were assigned concurrently') from e
+    return assignments
+
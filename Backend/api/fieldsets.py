@@ -0,0 +1,135 @@
+# fieldsets.py
+"""
+Sparse fieldsets and opt-in expansion for the API serializers.
+
+    ?fields=id,status,items.quantity     only these fields (dotted for nested)
+    ?expand=restaurant,items.menu_item   embed these relations instead of ids
+
+Relations listed in a serializer's `expandable_fields` are rendered as
+primary keys unless expanded. Viewsets using `ExpandableQuerysetMixin` only
+join or prefetch the relations the response will actually contain.
+"""
+from django.db.models import Prefetch
+
+
+def _parse(value):
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for part in path.strip().split('.'):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+
+class FieldSelection:
+    """The parsed `fields`/`expand` trees for one serializer level."""
+
+    def __init__(self, fields=None, expand=None):
+        self.fields = fields  # None means every field
+        self.expand = expand or {}
+
+    @classmethod
+    def from_request(cls, request):
+        if request is None:
+            return cls()
+        params = request.query_params
+        fields = _parse(params['fields']) if params.get('fields') else None
+        return cls(fields, _parse(params.get('expand', '')))
+
+    def includes(self, name):
+        return self.fields is None or name in self.fields
+
+    def expands(self, name):
+        return name in self.expand and self.includes(name)
+
+    def child(self, name):
+        fields = self.fields.get(name) if self.fields else None
+        return FieldSelection(fields or None, self.expand.get(name))
+
+
+class ExpandableFieldsMixin:
+    """
+    Serializer mixin applying a FieldSelection. `expandable_fields` maps a
+    model relation to (serializer class, kwargs); unless expanded it keeps
+    the primary key field ModelSerializer generates for it.
+    """
+    expandable_fields = {}
+    # Relations read by plain fields (e.g. a property on the model), joined regardless of the selection
+    always_select_related = ()
+
+    def __init__(self, *args, **kwargs):
+        self._selection = kwargs.pop('selection', None)
+        super().__init__(*args, **kwargs)
+
+    @property
+    def selection(self):
+        # Nested serializers get theirs from the parent; the outermost one reads the request
+        if self._selection is None:
+            self._selection = FieldSelection.from_request(self.context.get('request'))
+        return self._selection
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selection = self.selection
+        for name, (serializer_class, kwargs) in self.expandable_fields.items():
+            if name in fields and selection.expands(name):
+                fields[name] = serializer_class(read_only=True, selection=selection.child(name), **kwargs)
+        for name, field in fields.items():
+            nested = getattr(field, 'child', field)
+            if name not in self.expandable_fields and isinstance(nested, ExpandableFieldsMixin):
+                nested._selection = selection.child(name)
+        if selection.fields is not None:
+            fields = {name: field for name, field in fields.items() if field.write_only or selection.includes(name)}
+        return fields
+
+    @classmethod
+    def _nested_for(cls, selection):
+        """Yields (name, source, serializer class, many) for every relation the selection renders as objects."""
+        for name, (serializer_class, kwargs) in cls.expandable_fields.items():
+            if selection.expands(name):
+                yield name, name, serializer_class, kwargs.get('many', False)
+        for name, field in cls._declared_fields.items():
+            nested = getattr(field, 'child', field)
+            if name in cls.expandable_fields or not isinstance(nested, ExpandableFieldsMixin):
+                continue
+            if selection.includes(name):
+                yield name, field.source or name, type(nested), nested is not field
+
+    @classmethod
+    def related_lookups(cls, selection, model=None):
+        """
+        The select_related and prefetch_related lookups needed to render
+        `selection` without N+1 queries. `model` is the model actually being
+        serialized when it is not Meta.model but has the same relations.
+        """
+        model = model or cls.Meta.model
+        select, prefetch = list(cls.always_select_related), []
+        for name, source, serializer_class, many in cls._nested_for(selection):
+            related_model = model._meta.get_field(source).related_model
+            child_select, child_prefetch = serializer_class.related_lookups(selection.child(name), related_model)
+            if many:
+                queryset = related_model.objects.prefetch_related(*child_prefetch)
+                if child_select:  # select_related() without arguments would follow every foreign key
+                    queryset = queryset.select_related(*child_select)
+                prefetch.append(Prefetch(source, queryset=queryset))
+                continue
+            select.append(source)
+            select.extend(f'{source}__{lookup}' for lookup in child_select)
+            prefetch.extend(
+                Prefetch(f'{source}__{lookup.prefetch_through}', queryset=lookup.queryset) for lookup in child_prefetch
+            )
+        return select, prefetch
+
+
+class ExpandableQuerysetMixin:
+    """Viewset mixin: joins/prefetches only what the requested fields and expansions need."""
+
+    def get_field_selection(self):
+        return FieldSelection.from_request(self.request)
+
+    def select_requested(self, queryset):
+        select, prefetch = self.get_serializer_class().related_lookups(self.get_field_selection(), queryset.model)
+        if select:
+            queryset = queryset.select_related(*select)
+        return queryset.prefetch_related(*prefetch)
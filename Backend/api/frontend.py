@@ -0,0 +1,53 @@
+# frontend.py
+"""
+The React app's shell, and 404s for the API.
+
+The built frontend's index.html is rendered once per process and served as
+bytes with an ETag and `Cache-Control: no-cache`: browsers revalidate it on
+every visit (a 304 without the body) and so pick up a new build's asset
+names straight away, while the assets themselves are content-hashed and
+served by WhiteNoise as immutable (see StaticFilesMiddleware).
+
+The shell answers every path outside api/, admin/, static/ and media/.
+Unknown API paths fall through to not_found, Django's handler404, which
+answers them with a JSON body instead of an HTML page.
+"""
+import functools
+import hashlib
+
+from django.http import Http404, HttpResponse, JsonResponse
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_safe
+from django.views.defaults import page_not_found
+
+
+@functools.cache
+def shell():
+    """{body, etag} of the rendered index.html, or None when the frontend isn't built."""
+    try:
+        body = get_template('index.html').render().encode()
+    except TemplateDoesNotExist:
+        return None
+    return {'body': body, 'etag': '"%s"' % hashlib.md5(body, usedforsecurity=False).hexdigest()}
+
+
+@require_safe
+def spa_shell(request):
+    document = shell()
+    if document is None:
+        raise Http404('Frontend not built')
+    response = get_conditional_response(request, etag=document['etag'])
+    if response is None:
+        response = HttpResponse(document['body'])
+    response['ETag'] = document['etag']
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def not_found(request, exception):
+    """handler404: a JSON body like DRF's for API paths, Django's page for the rest."""
+    if request.path_info.startswith('/api/'):
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+    return page_not_found(request, exception)
@@ -0,0 +1,107 @@
+# geo.py
+"""
+Geohashes for nearest-restaurant search without PostGIS.
+
+A geohash names a lat/lng cell; every prefix of it names the enclosing,
+coarser cell. Restaurant.geohash is indexed, so all restaurants in a cell
+are one index range (`prefix <= geohash < next prefix`, see cell_range). A
+search picks the finest precision whose cells are at least `radius` wide,
+so the 3x3 block of cells around the point covers the whole circle, and
+only ranks the restaurants in those nine ranges: the work depends on how
+many restaurants are near the point, not on how many there are in total.
+"""
+import heapq
+import math
+
+from django.db.models import Q
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+PRECISION = 9  # ~5 m cells, as stored
+KM_PER_DEGREE = 111.32
+EARTH_RADIUS_KM = 6371.0
+MAX_SEARCH_RADIUS_KM = 50
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def cell_range(prefix):
+    """
+    (low, high) bounds of the geohashes starting with `prefix`; `high` is the
+    next prefix in base32 order, or None past the last one.
+    """
+    chars = list(prefix)
+    while chars:
+        position = BASE32.index(chars[-1])
+        if position + 1 < len(BASE32):
+            chars[-1] = BASE32[position + 1]
+            return prefix, ''.join(chars)
+        chars.pop()
+    return prefix, None
+
+
+def cell_size(precision):
+    """(degrees of latitude, degrees of longitude) spanned by a cell."""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def search_precision(latitude, radius_km):
+    """The finest precision whose cells are at least `radius_km` tall and wide at `latitude`."""
+    for precision in range(PRECISION, 0, -1):
+        lat_span, lng_span = cell_size(precision)
+        width_km = lng_span * KM_PER_DEGREE * math.cos(math.radians(latitude))
+        if min(lat_span * KM_PER_DEGREE, width_km) >= radius_km:
+            return precision
+    return 1
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """Geohash prefixes of the 3x3 cells around the point, covering `radius_km` around it."""
+    precision = search_precision(latitude, radius_km)
+    lat_span, lng_span = cell_size(precision)
+    cells = set()
+    for dlat in (-lat_span, 0, lat_span):
+        for dlng in (-lng_span, 0, lng_span):
+            lat = min(max(latitude + dlat, -90.0), 90.0)
+            lng = (longitude + dlng + 180.0) % 360.0 - 180.0
+            cells.add(encode(lat, lng, precision))
+    return sorted(cells)
+
+
+def distance_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def nearest(queryset, latitude, longitude, radius_km, limit):
+    """[(distance km, row)] of the `limit` rows of `queryset` nearest the point within `radius_km`, nearest first."""
+    cells = Q()
+    for prefix in covering_cells(latitude, longitude, radius_km):
+        low, high = cell_range(prefix)
+        cells |= Q(geohash__gte=low, geohash__lt=high) if high else Q(geohash__gte=low)
+    ranked = []
+    for row in queryset.filter(cells):
+        distance = distance_km(latitude, longitude, row.latitude, row.longitude)
+        if distance <= radius_km:
+            ranked.append((distance, row))
+    return heapq.nsmallest(limit, ranked, key=lambda pair: (pair[0], pair[1].pk))
@@ -0,0 +1,104 @@
+# instrumentation.py
+import contextvars
+import heapq
+import time
+
+_current_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+def current_stats():
+    """Returns the RequestStats of the request being handled, if any."""
+    return _current_stats.get()
+
+
+class RequestStats:
+    """Timing and SQL counters collected for a single request."""
+    top_queries_kept = 5
+
+    def __init__(self, method):
+        self.started = time.perf_counter()
+        self.total_time = 0.0
+        self.method = method
+        self.view = None
+        self.action = None
+        self.route = None
+        self.route_name = None
+        self.query_count = 0
+        self.query_time = 0.0
+        self.serializer_time = 0.0
+        self._top_queries = []
+
+    def activate(self):
+        return _current_stats.set(self)
+
+    @staticmethod
+    def deactivate(token):
+        _current_stats.reset(token)
+
+    def resolve(self, request, view_func):
+        """Labels the stats with the viewset/view class and action handling the request."""
+        view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+        self.view = view_class.__name__ if view_class else view_func.__name__
+        method = request.method.lower()
+        actions = getattr(view_func, 'actions', None)
+        if actions:
+            self.action = actions.get(method, method)
+        else:
+            self.action = method
+        match = request.resolver_match
+        if match:
+            self.route = match.route
+            self.route_name = match.view_name
+        else:
+            self.route = request.path
+
+    def record_query(self, execute, sql, params, many, context):
+        """Connection execute wrapper counting and timing every query."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.query_count += 1
+            self.query_time += duration
+            # Bounded min-heap: only the slowest statements are retained
+            entry = (duration, self.query_count, sql)
+            if len(self._top_queries) < self.top_queries_kept:
+                heapq.heappush(self._top_queries, entry)
+            elif duration > self._top_queries[0][0]:
+                heapq.heapreplace(self._top_queries, entry)
+
+    def add_serializer_time(self, seconds):
+        self.serializer_time += seconds
+
+    def finish(self):
+        self.total_time = time.perf_counter() - self.started
+
+    @property
+    def top_queries(self):
+        return [
+            {'sql': sql, 'ms': round(duration * 1000, 2)}
+            for duration, _, sql in sorted(self._top_queries, reverse=True)
+        ]
+
+    def server_timing(self):
+        return ', '.join([
+            f'db;dur={self.query_time * 1000:.2f};desc="{self.query_count} queries"',
+            f'serialize;dur={self.serializer_time * 1000:.2f}',
+            f'total;dur={self.total_time * 1000:.2f}',
+        ])
+
+    def as_log_record(self, request, response):
+        return {
+            'method': request.method,
+            'path': request.path,
+            'route': self.route,
+            'view': self.view,
+            'action': self.action,
+            'status': response.status_code,
+            'total_ms': round(self.total_time * 1000, 2),
+            'sql_ms': round(self.query_time * 1000, 2),
+            'sql_count': self.query_count,
+            'serializer_ms': round(self.serializer_time * 1000, 2),
+            'top_queries': self.top_queries,
+        }
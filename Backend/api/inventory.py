@@ -0,0 +1,48 @@
+# inventory.py
+"""
+Menu item stock.
+
+MenuItem.stock is None for items that are not counted. Checkout takes stock
+with one conditional UPDATE per counted item (`WHERE stock >= quantity`), so
+concurrent checkouts of a hot item never wait on each other's row locks for
+longer than that statement, and can never drive it below zero. The update
+that takes the last unit also marks the item unavailable.
+"""
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .jobs import menu_documents
+from .menus import rebuild_menu_document
+from .models import MenuItem
+
+
+class OutOfStock(Exception):
+    def __init__(self, menu_item):
+        super().__init__(f'{menu_item.name} is out of stock')
+        self.menu_item = menu_item
+
+
+def reserve(lines, allow_shortfall=False):
+    """
+    Takes stock for `lines`, [(menu_item, quantity)], inside the caller's
+    transaction; raises OutOfStock (the caller rolls back) if an item has too
+    little. With `allow_shortfall`, such an item is sold down to zero instead.
+    """
+    counted = sorted(((item, quantity) for item, quantity in lines if item.stock is not None), key=lambda line: line[0].pk)
+    for menu_item, quantity in counted:  # In id order, so two checkouts never lock in opposite orders
+        updated = MenuItem.objects.filter(pk=menu_item.pk, stock__gte=quantity).update(
+            stock=F('stock') - quantity,
+            is_available=Case(When(stock=quantity, then=Value(False)), default=F('is_available')),
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            if not allow_shortfall:
+                raise OutOfStock(menu_item)
+            MenuItem.objects.filter(pk=menu_item.pk).update(stock=0, is_available=False, updated_at=timezone.now())
+
+    if counted:
+        # Queryset updates send no signals; refresh the menus of sold-out items
+        sold_out = MenuItem.objects.filter(pk__in=[item.pk for item, _ in counted], stock=0)
+        for restaurant_id in set(sold_out.values_list('restaurant_id', flat=True)):
+            transaction.on_commit(lambda restaurant_id=restaurant_id: menu_documents.enqueue(rebuild_menu_document, restaurant_id))
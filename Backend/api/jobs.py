@@ -0,0 +1,78 @@
+# jobs.py
+"""
+In-process background jobs.
+
+Each JobQueue drains on one daemon thread per process (started lazily, so
+it is created after gunicorn forks its workers). Identical pending jobs are
+coalesced, and the depth is reported as api_job_queue_depth. Jobs live in
+memory only: anything queued when a process dies is lost, so every job must
+be something a management command can redo from the database.
+
+With JOBS_EAGER = True jobs run inline, which the tests and the benchmark use.
+"""
+import logging
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _start(self):
+        # Called with the lock held; (re)initialises after a fork
+        self._pid = os.getpid()
+        self._queue = queue.Queue()
+        self._pending = set()
+        threading.Thread(target=self._work, name=f'jobs-{self.name}', daemon=True).start()
+
+    def enqueue(self, func, *args):
+        if getattr(settings, 'JOBS_EAGER', False):
+            func(*args)
+            return
+        job = (func, args)
+        with self._lock:
+            if self._pid != os.getpid():
+                self._start()
+            if job in self._pending:
+                return
+            self._pending.add(job)
+            depth = len(self._pending)
+        self._queue.put(job)
+        metrics.set_queue_depth(self.name, depth)
+
+    def join(self):
+        """Blocks until every queued job has run."""
+        if self._pid == os.getpid():
+            self._queue.join()
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                # Dropped before running, so changes made meanwhile queue it again
+                self._pending.discard(job)
+                depth = len(self._pending)
+            metrics.set_queue_depth(self.name, depth)
+            func, args = job
+            try:
+                func(*args)
+            except Exception:
+                logger.exception('Job %s%r on queue %s failed', func.__name__, args, self.name)
+            finally:
+                close_old_connections()
+                self._queue.task_done()
+
+
+menu_documents = JobQueue('menu_documents')
+recommendation_updates = JobQueue('recommendation_updates')
@@ -0,0 +1,103 @@
+# kitchen.py
+"""
+Kitchen ticket queue.
+
+At checkout an order's items are split into one KitchenTicket per station
+(Category.station), promised KITCHEN_PROMISE_MINUTES after the order was
+placed. Each station's queue is a range of kitchen_queue_idx (restaurant,
+station, status, promised_at, id), so taking the next N tickets and moving
+tickets along are index lookups that never scan Order.
+
+Orders follow their tickets: the first acknowledged ticket moves an order
+to preparing, and the order is ready once all of its tickets are.
+Cancelling an order cancels its open tickets.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import KitchenTicket, Order
+
+# Ticket statuses each transition may start from
+TRANSITIONS = {
+    'acknowledged': ('queued',),
+    'ready': ('queued', 'acknowledged'),
+}
+# Order statuses, in kitchen order; tickets only ever move an order forward
+ORDER_PROGRESS = ['pending', 'confirmed', 'preparing', 'ready']
+
+
+def create_tickets(order):
+    """Queues one ticket per station for `order`'s items."""
+    stations = {}
+    for item in order.items.select_related('menu_item__category').order_by('id'):
+        stations.setdefault(item.menu_item.category.station, []).append({
+            'menu_item': item.menu_item_id,
+            'name': item.menu_item.name,
+            'quantity': item.quantity,
+            'special_instructions': item.special_instructions,
+        })
+    promised_at = order.created_at + timedelta(minutes=settings.KITCHEN_PROMISE_MINUTES)
+    return KitchenTicket.objects.bulk_create([
+        KitchenTicket(order=order, restaurant_id=order.restaurant_id, station=station, promised_at=promised_at, lines=lines)
+        for station, lines in sorted(stations.items())
+    ])
+
+
+def queue(restaurant_id, station):
+    """A station's queued tickets, soonest promised first."""
+    return KitchenTicket.objects.filter(restaurant_id=restaurant_id, station=station, status='queued').order_by('promised_at', 'id')
+
+
+def take_next(restaurant_id, station, limit):
+    """Acknowledges and returns up to `limit` tickets from the head of a station's queue."""
+    with transaction.atomic():
+        # Concurrent callers skip each other's rows and take the tickets behind them
+        ids = list(queue(restaurant_id, station).select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+        advance(restaurant_id, ids, 'acknowledged')
+        return list(KitchenTicket.objects.filter(pk__in=ids).order_by('promised_at', 'id'))
+
+
+def advance(restaurant_id, ticket_ids, status):
+    """
+    Moves the tickets among `ticket_ids` that belong to the restaurant and can
+    go to `status`, and their orders with them. Returns the moved ticket ids.
+    """
+    with transaction.atomic():
+        tickets = KitchenTicket.objects.filter(pk__in=ticket_ids, restaurant_id=restaurant_id, status__in=TRANSITIONS[status])
+        moved = list(tickets.select_for_update().values_list('id', 'order_id'))
+        if not moved:
+            return []
+        KitchenTicket.objects.filter(pk__in=[id for id, _ in moved]).update(status=status, **{f'{status}_at': timezone.now()})
+        sync_orders({order_id for _, order_id in moved})
+    return sorted(id for id, _ in moved)
+
+
+def sync_orders(order_ids):
+    """Moves orders forward to match their tickets, saving them so the order signals run."""
+    progress = (
+        KitchenTicket.objects.filter(order_id__in=order_ids).exclude(status='cancelled')
+        .values('order_id')
+        .annotate(open=Count('pk', filter=~Q(status='ready')), started=Count('pk', filter=~Q(status='queued')))
+        .order_by()
+    )
+    targets = {}
+    for row in progress:
+        if not row['open']:
+            targets[row['order_id']] = 'ready'
+        elif row['started']:
+            targets[row['order_id']] = 'preparing'
+    orders = Order.objects.filter(pk__in=targets, status__in=ORDER_PROGRESS).select_related('restaurant')
+    for order in orders.select_for_update(of=('self',)):
+        if ORDER_PROGRESS.index(targets[order.pk]) > ORDER_PROGRESS.index(order.status):
+            order.status = targets[order.pk]
+            order.save(update_fields=['status', 'updated_at'])
+
+
+def order_saved(order):
+    """Cancels the open tickets of an order that has just been cancelled."""
+    if order.status == 'cancelled' and getattr(order, '_loaded_status', None) != 'cancelled':
+        order.tickets.filter(status__in=TRANSITIONS['ready']).update(status='cancelled')
@@ -0,0 +1,206 @@
+# leaderboards.py
+"""
+Top restaurants and menu items, from counter tables.
+
+Every non-cancelled order adds one to its restaurant's all-time and daily
+counters, and each of its items adds its quantity to the menu item's
+counters; cancelling an order takes them back off. Signals in
+api/signals.py do this inside the order's own transaction, so counters
+commit or roll back with it. Counters carry the restaurant's region, so a
+top-N read is one indexed query: the all-time tables directly, the daily
+ones summed over the last 7 or 30 days.
+
+`manage.py rebuild_leaderboards` recomputes everything from the orders
+(current and archived) and drops daily rows older than LEADERBOARD_DAYS.
+"""
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import (
+    ArchivedOrder, ArchivedOrderItem, DailyMenuItemOrderCount, DailyRestaurantOrderCount,
+    MenuItemOrderCount, Order, OrderItem, RestaurantOrderCount,
+)
+
+WINDOWS = {'all': None, '7d': 7, '30d': 30}
+LEADERBOARD_DAYS = 30
+
+
+def _increment(model, key_fields, count_field, rows):
+    """
+    Adds to counters in one statement. `rows` are (key values..., region,
+    amount); missing counters are inserted.
+    """
+    if not rows:
+        return
+    opts = model._meta
+    quote = connection.ops.quote_name
+    keys = [opts.get_field(name).column for name in key_fields]
+    columns = ', '.join(quote(column) for column in [*keys, 'region', count_field])
+    values = ', '.join(['(%s)' % ', '.join(['%s'] * (len(keys) + 2))] * len(rows))
+    table, count = quote(opts.db_table), quote(count_field)
+    # INSERT ... ON CONFLICT works the same on PostgreSQL and SQLite
+    sql = (
+        f'INSERT INTO {table} ({columns}) VALUES {values} '
+        f'ON CONFLICT ({", ".join(quote(key) for key in keys)}) '
+        f'DO UPDATE SET {count} = {table}.{count} + EXCLUDED.{count}, region = EXCLUDED.region'
+    )
+    params = [connection.ops.adapt_datefield_value(value) if key == 'day' else value
+              for row in rows for key, value in zip([*key_fields, 'region', count_field], row)]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def record_order(order, region, sign):
+    day = timezone.localdate(order.created_at)
+    _increment(RestaurantOrderCount, ['restaurant'], 'order_count', [(order.restaurant_id, region, sign)])
+    _increment(DailyRestaurantOrderCount, ['restaurant', 'day'], 'order_count', [(order.restaurant_id, day, region, sign)])
+
+
+def record_items(order, items, region, sign):
+    """`items` is [(menu_item_id, quantity)] of `order`."""
+    quantities = Counter()
+    for menu_item_id, quantity in items:
+        quantities[menu_item_id] += quantity * sign
+    day = timezone.localdate(order.created_at)
+    _increment(MenuItemOrderCount, ['menu_item'], 'quantity',
+               [(menu_item_id, region, quantity) for menu_item_id, quantity in quantities.items()])
+    _increment(DailyMenuItemOrderCount, ['menu_item', 'day'], 'quantity',
+               [(menu_item_id, day, region, quantity) for menu_item_id, quantity in quantities.items()])
+
+
+def order_saved(order, created):
+    """Applies a status change of `order` to the counters."""
+    counted = order.status != 'cancelled'
+    if created:
+        # Its items are added as they are created
+        was_counted = False
+    elif not hasattr(order, '_loaded_status'):
+        # Not loaded from the database, so the previous status is unknown
+        return
+    else:
+        was_counted = order._loaded_status not in (None, 'cancelled')
+    order._loaded_status = order.status
+    if counted == was_counted:
+        return
+    sign = 1 if counted else -1
+    region = order.restaurant.region
+    record_order(order, region, sign)
+    if not created:
+        record_items(order, order.items.values_list('menu_item_id', 'quantity'), region, sign)
+
+
+def order_item_created(item):
+    order = item.order
+    if order.status != 'cancelled':
+        record_items(order, [(item.menu_item_id, item.quantity)], order.restaurant.region, 1)
+
+
+def order_deleted(order, items):
+    """Takes a deleted order, with its (menu_item_id, quantity) items, off the counters."""
+    if order.status != 'cancelled':
+        region = order.restaurant.region
+        record_order(order, region, -1)
+        record_items(order, items, region, -1)
+
+
+def sync_region(restaurant):
+    """Moves a restaurant's counters along when its region changes."""
+    for model in (RestaurantOrderCount, DailyRestaurantOrderCount):
+        model.objects.filter(restaurant=restaurant).exclude(region=restaurant.region).update(region=restaurant.region)
+    for model in (MenuItemOrderCount, DailyMenuItemOrderCount):
+        model.objects.filter(menu_item__restaurant=restaurant).exclude(region=restaurant.region).update(region=restaurant.region)
+
+
+def _top(counter, daily, count_field, key, fields, region, window, limit):
+    if WINDOWS[window] is None:
+        queryset = counter.objects.annotate(total=F(count_field))
+    else:
+        since = timezone.localdate() - timedelta(days=WINDOWS[window] - 1)
+        queryset = daily.objects.filter(day__gte=since).values(key, *fields).annotate(total=Sum(count_field))
+    if region:
+        queryset = queryset.filter(region=region)
+    # Ties go to the lower id, so the rebuild and the counters rank them alike
+    return queryset.filter(total__gt=0).order_by('-total', key).values_list(key, *fields, 'total')[:limit]
+
+
+def _top_restaurants(region, window, limit):
+    return _top(RestaurantOrderCount, DailyRestaurantOrderCount, 'order_count', 'restaurant_id', ['restaurant__name'], region, window, limit)
+
+
+def _top_menu_items(region, window, limit):
+    return _top(MenuItemOrderCount, DailyMenuItemOrderCount, 'quantity', 'menu_item_id',
+                ['menu_item__name', 'menu_item__restaurant_id'], region, window, limit)
+
+
+def top_restaurants(region=None, window='all', limit=3):
+    """[{id, name, order_count}] with the most orders, optionally in one region and the last 7d/30d."""
+    return [{'id': id, 'name': name, 'order_count': total} for id, name, total in _top_restaurants(region, window, limit)]
+
+
+def top_menu_items(region=None, window='all', limit=5):
+    """[{id, name, restaurant, quantity}] ordered most often, like top_restaurants."""
+    return [{'id': id, 'name': name, 'restaurant': restaurant, 'quantity': total}
+            for id, name, restaurant, total in _top_menu_items(region, window, limit)]
+
+
+async def atop_restaurants(region=None, window='all', limit=3):
+    """top_restaurants() on the async ORM."""
+    return [{'id': id, 'name': name, 'order_count': total} async for id, name, total in _top_restaurants(region, window, limit)]
+
+
+async def atop_menu_items(region=None, window='all', limit=5):
+    """top_menu_items() on the async ORM."""
+    return [{'id': id, 'name': name, 'restaurant': restaurant, 'quantity': total}
+            async for id, name, restaurant, total in _top_menu_items(region, window, limit)]
+
+
+@transaction.atomic
+def rebuild():
+    """Recomputes every counter from current and archived orders."""
+    since = timezone.make_aware(datetime.combine(timezone.localdate() - timedelta(days=LEADERBOARD_DAYS - 1), time.min))
+    restaurants, daily_restaurants, items, daily_items = Counter(), Counter(), Counter(), Counter()
+    for order_model, item_model in ((Order, OrderItem), (ArchivedOrder, ArchivedOrderItem)):
+        orders = order_model.objects.exclude(status='cancelled')
+        for row in orders.values('restaurant_id', 'restaurant__region').annotate(n=Count('pk')).order_by():
+            restaurants[row['restaurant_id'], row['restaurant__region']] += row['n']
+        recent = orders.filter(created_at__gte=since).annotate(day=TruncDate('created_at'))
+        for row in recent.values('restaurant_id', 'day', 'restaurant__region').annotate(n=Count('pk')).order_by():
+            daily_restaurants[row['restaurant_id'], row['day'], row['restaurant__region']] += row['n']
+
+        order_items = item_model.objects.exclude(order__status='cancelled')
+        region = F('order__restaurant__region')
+        for row in order_items.values('menu_item_id', region=region).annotate(n=Sum('quantity')).order_by():
+            items[row['menu_item_id'], row['region']] += row['n']
+        recent = order_items.filter(order__created_at__gte=since).annotate(day=TruncDate('order__created_at'))
+        for row in recent.values('menu_item_id', 'day', region=region).annotate(n=Sum('quantity')).order_by():
+            daily_items[row['menu_item_id'], row['day'], row['region']] += row['n']
+
+    for model in (RestaurantOrderCount, DailyRestaurantOrderCount, MenuItemOrderCount, DailyMenuItemOrderCount):
+        model.objects.all().delete()
+    RestaurantOrderCount.objects.bulk_create(
+        [RestaurantOrderCount(restaurant_id=id, region=region, order_count=n) for (id, region), n in restaurants.items()],
+        batch_size=1000)
+    DailyRestaurantOrderCount.objects.bulk_create(
+        [DailyRestaurantOrderCount(restaurant_id=id, day=day, region=region, order_count=n)
+         for (id, day, region), n in daily_restaurants.items()], batch_size=1000)
+    MenuItemOrderCount.objects.bulk_create(
+        [MenuItemOrderCount(menu_item_id=id, region=region, quantity=n) for (id, region), n in items.items()],
+        batch_size=1000)
+    DailyMenuItemOrderCount.objects.bulk_create(
+        [DailyMenuItemOrderCount(menu_item_id=id, day=day, region=region, quantity=n)
+         for (id, day, region), n in daily_items.items()], batch_size=1000)
+    return len(restaurants), len(items)
+
+
+def prune():
+    """Drops daily counters that have left every window."""
+    cutoff = timezone.localdate() - timedelta(days=LEADERBOARD_DAYS - 1)
+    deleted = 0
+    for model in (DailyRestaurantOrderCount, DailyMenuItemOrderCount):
+        deleted += model.objects.filter(day__lt=cutoff).delete()[0]
+    return deleted
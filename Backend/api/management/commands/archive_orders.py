@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.archiving import archivable_orders, archive_batch
+
+
+class Command(BaseCommand):
+    help = 'Moves old delivered and cancelled orders into the archive tables, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=settings.ORDER_ARCHIVE_AFTER_DAYS,
+                            help='Archive orders created more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Orders moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the orders that would be moved')
+
+    def handle(self, *args, **options):
+        queryset = archivable_orders(options['older_than_days'])
+        if options['dry_run']:
+            self.stdout.write(f'{queryset.count()} orders would be archived')
+            return
+        archived = 0
+        # Short transactions, so checkout and the kitchen screens never wait long on the locks
+        while moved := archive_batch(queryset, options['batch_size']):
+            archived += moved
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} orders'))
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api import dispatch
+from api.models import Restaurant
+
+
+class Command(BaseCommand):
+    help = 'Assigns ready orders to available delivery crew, one batch per region'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--region', action='append', dest='regions', choices=[region for region, _ in Restaurant.REGION_CHOICES],
+                            help='Region to assign (repeatable, default: all)')
+        parser.add_argument('--interval', type=float, help='Keep running, one cycle every this many seconds')
+
+    def handle(self, *args, **options):
+        regions = options['regions'] or [region for region, _ in Restaurant.REGION_CHOICES]
+        while True:
+            for region in regions:
+                started = time.perf_counter()
+                try:
+                    assignments = dispatch.assign_region(region)
+                except dispatch.AssignmentConflict as e:
+                    self.stderr.write(f'{region}: skipped, {e}')
+                    continue
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                self.stdout.write(f'{region}: assigned {len(assignments)} orders in {elapsed_ms:.1f} ms')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+            # A long-running loop drops connections past their CONN_MAX_AGE or broken, as a request would
+            close_old_connections()
@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from api import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the API hot paths in-process against a seeded throwaway test database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=1, help='Dataset size multiplier')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--flow', action='append', dest='flows', choices=sorted(benchmarks.FLOWS),
+                            help='Flow to run (repeatable, default: all)')
+        parser.add_argument('--contention-threads', type=int, default=0,
+                            help='Also check out one stocked menu item from this many threads at once')
+        parser.add_argument('--contention-checkouts', type=int, default=20, help='Checkouts per contention thread')
+        parser.add_argument('--concurrency-clients', type=int, default=0,
+                            help='Also compare this many concurrent readers against sync workers and ASGI')
+        parser.add_argument('--concurrency-requests', type=int, default=20, help='Requests per concurrent reader')
+        parser.add_argument('--sync-workers', type=int, default=4, help='Sync workers serving the concurrent readers')
+        parser.add_argument('--db-latency-ms', type=float, default=0,
+                            help='Simulated database round trip added to every query of the concurrency run')
+        parser.add_argument('--middleware', action='store_true',
+                            help="Also compare API requests with and without Django's session/CSRF/auth/message middleware")
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument('--baseline', help='Compare against a previously saved report')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed latency increase over the baseline, as a fraction')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        if (options['contention_threads'] or options['concurrency_clients']) and connection.vendor == 'sqlite':
+            # An in-memory test database cannot be shared by the worker threads' connections,
+            # and SQLite cannot upgrade a read transaction to a write one under contention
+            connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.gettempdir(), 'benchmark_contention.sqlite3')
+            connection.settings_dict['OPTIONS'].update(transaction_mode='IMMEDIATE', timeout=30)
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            report = benchmarks.run_suite(
+                scale=options['scale'],
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                names=options['flows'],
+                seed_value=options['seed'],
+                contention_threads=options['contention_threads'],
+                contention_checkouts=options['contention_checkouts'],
+                concurrency_clients=options['concurrency_clients'],
+                concurrency_requests=options['concurrency_requests'],
+                sync_workers=options['sync_workers'],
+                db_latency_ms=options['db_latency_ms'],
+                middleware=options['middleware'],
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output)
+        self.stdout.write(output)
+
+        if options['baseline']:
+            regressions = benchmarks.compare(report, benchmarks.load_report(options['baseline']), options['tolerance'])
+            if regressions:
+                raise CommandError('Performance regressions:\n' + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
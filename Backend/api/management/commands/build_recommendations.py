@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api import recommendations
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the "frequently ordered together" counts and recommendations from all orders'
+
+    def handle(self, *args, **options):
+        pairs, rows = recommendations.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Counted {pairs} item pairs and kept {rows} recommendations'))
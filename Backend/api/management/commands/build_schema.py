@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from api import schema
+
+
+class Command(BaseCommand):
+    help = 'Renders the OpenAPI schema to SCHEMA_ARTIFACT_DIR, served by /api/v1/schema/ (see api/schema.py)'
+
+    def handle(self, *args, **options):
+        for path in schema.write():
+            self.stdout.write(path)
+        self.stdout.write(self.style.SUCCESS('Schema built'))
@@ -0,0 +1,315 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Max
+
+from api import geo
+from api.models import Cart, CartItem, Category, MenuItem, Order, OrderItem, Restaurant, User
+
+CATEGORY_NAMES = ['Starters', 'Mains', 'Breads', 'Rice', 'Desserts', 'Drinks', 'Sides', 'Specials']
+CUISINES = {
+    'india': ['North Indian', 'South Indian', 'Mughlai', 'Street Food', 'Bengali', 'Chinese'],
+    'america': ['American', 'BBQ', 'Tex-Mex', 'Italian', 'Burgers', 'Southern'],
+}
+# Restaurants cluster around these city centres, within ~10 km
+CITIES = {
+    'india': [(28.61, 77.21), (19.08, 72.88), (12.97, 77.59)],
+    'america': [(40.71, -74.01), (34.05, -118.24), (41.88, -87.63)],
+}
+# Share of users and restaurants in each region
+REGION_WEIGHTS = [('india', 0.6), ('america', 0.4)]
+# Relative order volume per hour of day: lunch and dinner peaks
+HOUR_WEIGHTS = [1, 1, 0, 0, 0, 0, 1, 2, 4, 4, 5, 9, 14, 13, 7, 4, 4, 6, 11, 15, 14, 9, 4, 2]
+# Orders older than a day are settled; recent ones are spread across the pipeline
+SETTLED_STATUSES = (['delivered', 'cancelled'], [92, 8])
+OPEN_STATUSES = (['pending', 'confirmed', 'preparing', 'ready', 'delivered', 'cancelled'], [15, 15, 20, 15, 30, 5])
+PAYMENT_METHODS = (['card', 'cash', 'paypal'], [55, 25, 20])
+
+
+class Plan:
+    """Id ranges and sizes shared by every worker; ids are assigned up front so workers never query."""
+
+    def __init__(self, options, starts):
+        self.seed = options['seed']
+        self.users = options['users']
+        self.restaurants = options['restaurants']
+        self.items_per_restaurant = options['menu_items_per_restaurant']
+        self.menu_items = self.restaurants * self.items_per_restaurant
+        self.orders = options['orders']
+        self.carts = min(options['carts'], self.users)
+        self.days = options['days']
+        self.batch_size = options['batch_size']
+        self.starts = starts
+        self.category_ids = list(Category.objects.filter(name__in=CATEGORY_NAMES).values_list('id', flat=True))
+        self.password = make_password('password')
+        end = options['until'] or datetime.now(dt_timezone.utc)
+        self.now = end.replace(minute=0, second=0, microsecond=0)
+        self.user_cutoffs = self._cutoffs(self.users)
+        self.restaurant_cutoffs = self._cutoffs(self.restaurants)
+
+    @staticmethod
+    def _cutoffs(total):
+        # Contiguous index ranges per region: [(region, start, stop), ...]
+        ranges, start = [], 0
+        for index, (region, weight) in enumerate(REGION_WEIGHTS):
+            stop = total if index == len(REGION_WEIGHTS) - 1 else start + int(total * weight)
+            ranges.append((region, start, stop))
+            start = stop
+        return ranges
+
+    @staticmethod
+    def region_of(cutoffs, index):
+        for region, start, stop in cutoffs:
+            if start <= index < stop:
+                return region
+        return cutoffs[-1][0]
+
+    def menu_item_price(self, item_index):
+        # Deterministic per item so order and cart workers agree with the menu
+        return Decimal(random.Random(f'{self.seed}:price:{item_index}').randint(150, 2500)) / 100
+
+
+def _rng(plan, kind, start):
+    return random.Random(f'{plan.seed}:{kind}:{start}')
+
+
+@contextmanager
+def _explicit_timestamps(*models):
+    """Lets bulk_create keep the generated created_at/updated_at instead of now()."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _create_users(plan, start, count):
+    users = []
+    for index in range(start, start + count):
+        pk = plan.starts['user'] + index
+        users.append(User(
+            id=pk, email=f'user{pk}@example.com', password=plan.password,
+            first_name=f'User{pk}', last_name='Generated', role='member',
+            region=plan.region_of(plan.user_cutoffs, index),
+        ))
+    User.objects.bulk_create(users, batch_size=plan.batch_size)
+    return len(users)
+
+
+def _create_restaurants(plan, start, count):
+    rng = _rng(plan, 'restaurant', start)
+    # Own stream, so positions don't shift the other generated values
+    positions = _rng(plan, 'restaurant_position', start)
+    restaurants = []
+    for index in range(start, start + count):
+        region = plan.region_of(plan.restaurant_cutoffs, index)
+        cuisine = rng.choice(CUISINES[region])
+        city_lat, city_lng = positions.choice(CITIES[region])
+        latitude, longitude = round(positions.gauss(city_lat, 0.05), 6), round(positions.gauss(city_lng, 0.05), 6)
+        restaurants.append(Restaurant(
+            id=plan.starts['restaurant'] + index, name=f'{cuisine} House {index}',
+            description=f'Generated {cuisine.lower()} restaurant', cuisine_type=cuisine, region=region,
+            rating=f'{rng.triangular(2.5, 5.0, 4.2):.1f}', is_active=rng.random() > 0.03,
+            # bulk_create skips Restaurant.save(), which sets the geohash
+            latitude=latitude, longitude=longitude, geohash=geo.encode(latitude, longitude),
+        ))
+    Restaurant.objects.bulk_create(restaurants, batch_size=plan.batch_size)
+    return len(restaurants)
+
+
+def _create_menu_items(plan, start, count):
+    rng = _rng(plan, 'menu_item', start)
+    items = []
+    for index in range(start, start + count):
+        restaurant_index, position = divmod(index, plan.items_per_restaurant)
+        items.append(MenuItem(
+            id=plan.starts['menu_item'] + index,
+            restaurant_id=plan.starts['restaurant'] + restaurant_index,
+            name=f'Dish {position + 1}', description='Generated dish',
+            price=plan.menu_item_price(index),
+            category_id=plan.category_ids[position % len(plan.category_ids)],
+            is_available=rng.random() > 0.05,
+        ))
+    MenuItem.objects.bulk_create(items, batch_size=plan.batch_size)
+    return len(items)
+
+
+def _create_carts(plan, start, count):
+    rng = _rng(plan, 'cart', start)
+    stride = max(1, plan.users // plan.carts)
+    carts, cart_items = [], []
+    for index in range(start, start + count):
+        cart_id = plan.starts['cart'] + index
+        user_index = index * stride
+        cart = Cart(id=cart_id, customer_id=plan.starts['user'] + user_index)
+        carts.append(cart)
+        region = plan.region_of(plan.user_cutoffs, user_index)
+        _, r_start, r_stop = next(r for r in plan.restaurant_cutoffs if r[0] == region)
+        restaurant_index = rng.randrange(r_start, max(r_start + 1, r_stop))
+        for position in rng.sample(range(plan.items_per_restaurant), min(plan.items_per_restaurant, rng.randint(1, 4))):
+            item_index = restaurant_index * plan.items_per_restaurant + position
+            cart_item = CartItem(cart_id=cart_id, quantity=rng.randint(1, 3), menu_item_id=plan.starts['menu_item'] + item_index)
+            cart_items.append(cart_item)
+            # Stored totals, as Cart.add_item would keep them
+            cart.item_count += cart_item.quantity
+            cart.subtotal += plan.menu_item_price(item_index) * cart_item.quantity
+    Cart.objects.bulk_create(carts, batch_size=plan.batch_size)
+    CartItem.objects.bulk_create(cart_items, batch_size=plan.batch_size)
+    return len(carts)
+
+
+def _order_time(plan, rng):
+    day = int(rng.triangular(0, plan.days, 0))  # denser towards today
+    hour = rng.choices(range(24), HOUR_WEIGHTS)[0]
+    moment = (plan.now - timedelta(days=day)).replace(hour=hour, minute=rng.randrange(60), second=rng.randrange(60))
+    # Later today's hours have not happened yet: move them to yesterday
+    return moment - timedelta(days=1) if moment > plan.now else moment
+
+
+def _create_orders(plan, start, count):
+    rng = _rng(plan, 'order', start)
+    orders, order_items = [], []
+    for index in range(start, start + count):
+        order_id = plan.starts['order'] + index
+        restaurant_index = rng.randrange(plan.restaurants)
+        region = plan.region_of(plan.restaurant_cutoffs, restaurant_index)
+        _, u_start, u_stop = next(r for r in plan.user_cutoffs if r[0] == region)
+        created_at = _order_time(plan, rng)
+        statuses = SETTLED_STATUSES if plan.now - created_at > timedelta(days=1) else OPEN_STATUSES
+        status = rng.choices(*statuses)[0]
+
+        total = Decimal('0.00')
+        lines = rng.sample(range(plan.items_per_restaurant), min(plan.items_per_restaurant, rng.choices([1, 2, 3, 4, 5], [30, 30, 20, 12, 8])[0]))
+        for position in lines:
+            item_index = restaurant_index * plan.items_per_restaurant + position
+            price = plan.menu_item_price(item_index)
+            quantity = rng.choices([1, 2, 3, 4], [60, 25, 10, 5])[0]
+            total += price * quantity
+            order_items.append(OrderItem(
+                order_id=order_id, menu_item_id=plan.starts['menu_item'] + item_index,
+                quantity=quantity, price=price,
+            ))
+        orders.append(Order(
+            id=order_id, customer_id=plan.starts['user'] + rng.randrange(u_start, max(u_start + 1, u_stop)),
+            restaurant_id=plan.starts['restaurant'] + restaurant_index, status=status,
+            payment_method=rng.choices(*PAYMENT_METHODS)[0], total_amount=total,
+            created_at=created_at, updated_at=created_at + timedelta(minutes=rng.randint(5, 90)),
+            placed_at=created_at,
+            cancelled_at=created_at + timedelta(minutes=rng.randint(1, 30)) if status == 'cancelled' else None,
+        ))
+    with _explicit_timestamps(Order):
+        Order.objects.bulk_create(orders, batch_size=plan.batch_size)
+    OrderItem.objects.bulk_create(order_items, batch_size=plan.batch_size)
+    return len(orders)
+
+
+STEPS = [
+    # (label, builder, size attribute); steps run in order, chunks of one step in parallel
+    ('users', _create_users, 'users'),
+    ('restaurants', _create_restaurants, 'restaurants'),
+    ('menu items', _create_menu_items, 'menu_items'),
+    ('carts', _create_carts, 'carts'),
+    ('orders', _create_orders, 'orders'),
+]
+
+_worker_plan = None
+
+
+def _utc_datetime(value):
+    moment = datetime.fromisoformat(value)
+    return moment if moment.tzinfo else moment.replace(tzinfo=dt_timezone.utc)
+
+
+def _set_plan(plan):
+    global _worker_plan
+    _worker_plan = plan
+
+
+def _init_worker(plan):
+    """Initializer of the forked worker processes."""
+    _set_plan(plan)
+    # Connections inherited from the parent must not be shared
+    connections.close_all()
+
+
+def _run_chunk(builder, start, count):
+    with transaction.atomic():
+        return builder(_worker_plan, start, count)
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generates a large, deterministic dataset (users, restaurants, menus, carts, orders) for scale testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--restaurants', type=int, default=2_000)
+        parser.add_argument('--menu-items-per-restaurant', type=int, default=25)
+        parser.add_argument('--carts', type=int, default=20_000)
+        parser.add_argument('--orders', type=int, default=1_000_000)
+        parser.add_argument('--days', type=int, default=365, help='Span of order history')
+        parser.add_argument('--until', type=_utc_datetime, default=None,
+                            help='End of the order history as an ISO date/time (default: now); fix it for reproducible timestamps')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5_000, help='Rows per bulk_create chunk')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Worker processes (default: CPU count, 1 on SQLite)')
+
+    def handle(self, *args, **options):
+        if options['restaurants'] < 1 or options['users'] < 1 or options['menu_items_per_restaurant'] < 1:
+            raise CommandError('At least one user, restaurant and menu item per restaurant is required.')
+        workers = options['workers'] or (1 if connection.vendor == 'sqlite' else os.cpu_count())
+
+        for name in CATEGORY_NAMES:
+            Category.objects.get_or_create(name=name)
+        starts = {
+            key: (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+            for key, model in [('user', User), ('restaurant', Restaurant), ('menu_item', MenuItem),
+                               ('cart', Cart), ('order', Order)]
+        }
+        plan = Plan(options, starts)
+
+        started = time.perf_counter()
+        if workers > 1:
+            connections.close_all()
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(plan,)) as pool:
+                for label, builder, size in STEPS:
+                    self._run_step(label, builder, getattr(plan, size), plan.batch_size, pool)
+        else:
+            # In-process: keep the caller's connection (and any transaction it is in)
+            _set_plan(plan)
+            for label, builder, size in STEPS:
+                self._run_step(label, builder, getattr(plan, size), plan.batch_size)
+
+        # Explicit ids leave Postgres sequences behind
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), [User, Restaurant, MenuItem, Cart, Order])
+        with connection.cursor() as cursor:
+            for sql in sequence_sql:
+                cursor.execute(sql)
+
+        self.stdout.write(self.style.SUCCESS(f'Generated dataset in {time.perf_counter() - started:.1f}s'))
+
+    def _run_step(self, label, builder, total, batch_size, pool=None):
+        step_started = time.perf_counter()
+        chunks = [(builder, start, min(batch_size, total - start)) for start in range(0, total, batch_size)]
+        if pool is not None:
+            futures = [pool.submit(_run_chunk, *chunk) for chunk in chunks]
+            created = sum(future.result() for future in futures)
+        else:
+            created = sum(_run_chunk(*chunk) for chunk in chunks)
+        self.stdout.write(f'{label}: {created} in {time.perf_counter() - step_started:.1f}s')
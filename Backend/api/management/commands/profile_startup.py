@@ -0,0 +1,31 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from api import startup
+
+
+class Command(BaseCommand):
+    help = 'Boots the application in a fresh interpreter and reports where the startup time goes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=25, help='Slowest modules and packages to list')
+        parser.add_argument('--warmup', action='store_true', help='Also time the warmup steps (api/startup.py)')
+        parser.add_argument('--output', help='Write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        report = startup.profile(limit=options['limit'], with_warmup=options['warmup'])
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(json.dumps(report, indent=2))
+
+        self.stdout.write('Phases (ms):')
+        for name, ms in report['phases_ms'].items():
+            self.stdout.write(f'  {name:<12} {ms:>9.1f}')
+        self.stdout.write(f'{report["modules"]} modules imported in {report["import_ms"]:.1f} ms')
+        self.stdout.write('Slowest modules (cumulative / self ms):')
+        for row in report['slowest_modules']:
+            self.stdout.write(f'  {row["cumulative_ms"]:>9.1f} {row["self_ms"]:>9.1f}  {row["module"]}')
+        self.stdout.write('Slowest packages (ms):')
+        for row in report['slowest_packages']:
+            self.stdout.write(f'  {row["ms"]:>9.1f}  {row["package"]}')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from api import leaderboards
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the leaderboard counters from all orders, or only prunes old daily counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prune', action='store_true', help='Only drop daily counters older than the longest window')
+
+    def handle(self, *args, **options):
+        if options['prune']:
+            self.stdout.write(self.style.SUCCESS(f'Pruned {leaderboards.prune()} daily counters'))
+            return
+        restaurants, items = leaderboards.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt counters for {restaurants} restaurants and {items} menu items'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from api.menus import rebuild_menu_document
+from api.models import MenuDocument, Restaurant
+
+
+class Command(BaseCommand):
+    help = 'Re-renders the pre-built menu documents (all restaurants by default)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('restaurant_ids', nargs='*', type=int, help='Only these restaurants')
+
+    def handle(self, *args, **options):
+        ids = options['restaurant_ids']
+        if not ids:
+            # Stale documents of deactivated restaurants get dropped too
+            ids = set(Restaurant.objects.values_list('id', flat=True))
+            ids.update(MenuDocument.objects.values_list('restaurant_id', flat=True))
+        built = sum(rebuild_menu_document(restaurant_id) is not None for restaurant_id in sorted(ids))
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {built} menu documents'))
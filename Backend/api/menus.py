@@ -0,0 +1,103 @@
+# menus.py
+"""
+Pre-rendered restaurant menus.
+
+Each active restaurant's available items, grouped by category, are rendered
+once to JSON bytes (plus a gzipped copy) and stored as a MenuDocument. The
+menu endpoint serves those bytes from the cache, or the MenuDocument row on
+a cache miss, without touching the menu tables. Signals in api/signals.py
+queue a rebuild whenever a restaurant, one of its items or a category they
+use changes; `manage.py rebuild_menu_documents` redoes them all, e.g. after
+bulk imports that bypass signals.
+"""
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from . import metrics
+from .fieldsets import FieldSelection
+from .models import MenuDocument, MenuItem, Restaurant
+from .renderers import ORJSONRenderer
+from .serializers import MenuItemSerializer
+
+
+# Everything but `stock`, which every sale changes while the document is only
+# rebuilt when an item sells out; `is_available` is what the menu shows
+ITEM_FIELDS = FieldSelection({name: {} for name in MenuItemSerializer.Meta.fields if name != 'stock'})
+
+
+def cache_key(restaurant_id):
+    return f'menu-document:{restaurant_id}'
+
+
+def render_menu(restaurant):
+    items = MenuItem.objects.filter(restaurant=restaurant, is_available=True).select_related('category')
+    categories = {}
+    for item in items.order_by('category__name', 'name'):
+        if item.category_id not in categories:
+            categories[item.category_id] = {'id': item.category_id, 'name': item.category.name, 'items': []}
+        categories[item.category_id]['items'].append(item)
+    for category in categories.values():
+        category['items'] = MenuItemSerializer(category['items'], many=True, selection=ITEM_FIELDS).data
+    return ORJSONRenderer().render({
+        'restaurant': {
+            'id': restaurant.id,
+            'name': restaurant.name,
+            'cuisine_type': restaurant.cuisine_type,
+            'region': restaurant.region,
+        },
+        'categories': list(categories.values()),
+        'generated_at': timezone.now(),
+    })
+
+
+def _cache_entry(document):
+    return {
+        'region': document.region,
+        'etag': document.etag,
+        'body': bytes(document.body),
+        'gzip_body': bytes(document.gzip_body),
+    }
+
+
+def rebuild_menu_document(restaurant_id):
+    """Re-renders one restaurant's menu; inactive or deleted restaurants lose theirs."""
+    restaurant = Restaurant.objects.filter(pk=restaurant_id, is_active=True).first()
+    if restaurant is None:
+        MenuDocument.objects.filter(restaurant_id=restaurant_id).delete()
+        cache.delete(cache_key(restaurant_id))
+        return None
+    body = render_menu(restaurant)
+    document, _ = MenuDocument.objects.update_or_create(restaurant=restaurant, defaults={
+        'region': restaurant.region,
+        'body': body,
+        'gzip_body': gzip.compress(body, mtime=0),
+        'etag': '"%s"' % hashlib.md5(body, usedforsecurity=False).hexdigest(),
+    })
+    cache.set(cache_key(restaurant_id), _cache_entry(document), settings.MENU_DOCUMENT_CACHE_TIMEOUT)
+    return document
+
+
+def rebuild_category_menus(category_id):
+    restaurant_ids = MenuItem.objects.filter(category_id=category_id).values_list('restaurant_id', flat=True)
+    for restaurant_id in set(restaurant_ids):
+        rebuild_menu_document(restaurant_id)
+
+
+def get_menu_document(restaurant_id):
+    """The cached document as a dict (region, etag, body, gzip_body), or None if there is none."""
+    entry = cache.get(cache_key(restaurant_id))
+    metrics.record_cache_lookup('menu', entry is not None)
+    if entry is None:
+        document = MenuDocument.objects.filter(restaurant_id=restaurant_id).first()
+        if document is None:
+            # Not built yet (e.g. bulk-imported); inactive restaurants stay None
+            document = rebuild_menu_document(restaurant_id)
+            if document is None:
+                return None
+        entry = _cache_entry(document)
+        cache.set(cache_key(restaurant_id), entry, settings.MENU_DOCUMENT_CACHE_TIMEOUT)
+    return entry
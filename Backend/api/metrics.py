@@ -0,0 +1,77 @@
+# metrics.py
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+
+# Under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR
+# (see gunicorn.conf.py) and the scrape merges all of them.
+MULTIPROCESS = 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+
+REQUEST_LATENCY = Histogram(
+    'api_request_latency_seconds',
+    'Request latency by route and action.',
+    ['route', 'action', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS = Counter(
+    'api_requests_total',
+    'Requests by route, action and response status.',
+    ['route', 'action', 'method', 'status'],
+)
+DB_QUERIES = Counter(
+    'api_db_queries_total',
+    'SQL queries executed by route and action.',
+    ['route', 'action'],
+)
+CACHE_REQUESTS = Counter(
+    'api_cache_requests_total',
+    'Application cache lookups by cache and result (hit/miss).',
+    ['cache', 'result'],
+)
+JOB_QUEUE_DEPTH = Gauge(
+    'api_job_queue_depth',
+    'Jobs waiting in the background queue.',
+    ['queue'],
+    multiprocess_mode='livesum',
+)
+CHECKOUTS = Counter(
+    'api_checkouts_total',
+    'Checkout attempts by flow and outcome.',
+    ['flow', 'outcome'],
+)
+
+
+def observe_request(stats, response):
+    """Records the latency and query count of a finished request."""
+    route = stats.route_name or 'unmatched'
+    action = stats.action or 'none'
+    REQUEST_LATENCY.labels(route, action, stats.method).observe(stats.total_time)
+    REQUESTS.labels(route, action, stats.method, response.status_code).inc()
+    if stats.query_count:
+        DB_QUERIES.labels(route, action).inc(stats.query_count)
+
+
+def record_cache_lookup(cache, hit, count=1):
+    """Counts `count` lookups in the application cache `cache` (menu, analytics)."""
+    if count:
+        CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc(count)
+
+
+def set_queue_depth(queue, depth):
+    JOB_QUEUE_DEPTH.labels(queue).set(depth)
+
+
+def record_checkout(flow, outcome):
+    CHECKOUTS.labels(flow, outcome).inc()
+
+
+def render_latest():
+    """Returns (body, content_type) in the Prometheus text format."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,310 @@
+# middleware.py
+import json
+import logging
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware as BaseAuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware as BaseMessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware as BaseSessionMiddleware
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.http import JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware as BaseCsrfViewMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+from django.utils.text import compress_string
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+from . import metrics
+from .instrumentation import RequestStats, current_stats
+
+slow_request_logger = logging.getLogger('api.slow_requests')
+
+# Authenticated by JWT alone, see BrowserOnlyMixin
+API_PATH_PREFIX = '/api/'
+
+accepts_br = _lazy_re_compile(r'\bbr\b')
+accepts_gzip = _lazy_re_compile(r'\bgzip\b')
+vite_asset = _lazy_re_compile(r'/dist/assets/[^/]+-[0-9A-Za-z_-]{8}\.\w+$')
+
+
+class AsyncCapableMiddleware:
+    """
+    Base for middleware that runs in both handler modes, like Django's
+    MiddlewareMixin: under ASGI with an async chain, __call__ hands over to
+    __acall__ instead of forcing the request through a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    async def __acall__(self, request):
+        raise NotImplementedError
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise, async-capable so that it does not put every ASGI request through a thread."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    def immutable_file_test(self, path, url):
+        # The frontend's build (static/dist/) is hashed by Vite, not by the manifest
+        return bool(vite_asset.search(url)) or super().immutable_file_test(path, url)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
+class RequestInstrumentationMiddleware(AsyncCapableMiddleware):
+    """
+    Records SQL count/time, serializer time and total time for every request,
+    reports them in a Server-Timing header and to the Prometheus metrics, and
+    logs requests slower than SLOW_REQUEST_THRESHOLD_MS, with their slowest
+    queries, as one JSON line.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.slow_threshold = getattr(settings, 'SLOW_REQUEST_THRESHOLD_MS', 500) / 1000
+
+    def handle(self, request):
+        stats = RequestStats(request.method)
+        token = stats.activate()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats.record_query))
+                response = self.get_response(request)
+        finally:
+            stats.deactivate(token)
+        return self.report(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = RequestStats(request.method)
+        token = stats.activate()
+        try:
+            with ExitStack() as stack:
+                # Connections belong to the thread the async ORM runs this request's queries in
+                for connection in await sync_to_async(connections.all)():
+                    stack.enter_context(connection.execute_wrapper(stats.record_query))
+                response = await self.get_response(request)
+        finally:
+            stats.deactivate(token)
+        return self.report(request, response, stats)
+
+    def report(self, request, response, stats):
+        stats.finish()
+        response['Server-Timing'] = stats.server_timing()
+        metrics.observe_request(stats, response)
+        if stats.total_time >= self.slow_threshold:
+            slow_request_logger.warning(json.dumps(stats.as_log_record(request, response)))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = current_stats()
+        if stats is not None:
+            stats.resolve(request, view_func)
+        return None
+
+
+def statement_timeout_for(view_func):
+    """Milliseconds a statement may run for `view_func`, from its view class's statement_timeout_scope."""
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    scope = getattr(view_class, 'statement_timeout_scope', 'default')
+    return settings.STATEMENT_TIMEOUTS.get(scope, settings.STATEMENT_TIMEOUTS['default'])
+
+
+def query_canceled(exception):
+    """Whether a database error is PostgreSQL cancelling a statement (SQLSTATE 57014), e.g. on its statement_timeout."""
+    cause = exception.__cause__
+    return isinstance(exception, OperationalError) and getattr(cause, 'sqlstate', getattr(cause, 'pgcode', None)) == '57014'
+
+
+class StatementTimeout:
+    """
+    execute_wrapper that SETs the request's statement_timeout before its
+    first query; reset() puts the connection's default back afterwards.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.connection = None
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.connection is None:
+            # The request's first query comes before any transaction its view opens: authentication
+            milliseconds = getattr(self.request, 'statement_timeout', settings.STATEMENT_TIMEOUTS['default'])
+            context['cursor'].cursor.execute(f'SET statement_timeout = {int(milliseconds)}')
+            self.connection = context['connection']
+        return execute(sql, params, many, context)
+
+    def reset(self):
+        if self.connection is not None and self.connection.connection is not None:
+            # On the driver's cursor, like the SET: neither is one of the request's queries
+            with self.connection.connection.cursor() as cursor:
+                cursor.execute('RESET statement_timeout')
+
+
+class StatementTimeoutMiddleware(AsyncCapableMiddleware):
+    """
+    Per-endpoint statement timeouts on PostgreSQL. A view's
+    statement_timeout_scope picks its limit from STATEMENT_TIMEOUTS, e.g.
+    longer for dashboards and analytics than for the cart. Connections are
+    pooled and move between requests, so the limit is SET for the request
+    and RESET after it. A statement cancelled by the timeout answers 503
+    with Retry-After instead of a 500, so clients back off rather than pile
+    up more slow queries.
+    """
+    retry_after = 5
+
+    def __init__(self, get_response):
+        if connections[DEFAULT_DB_ALIAS].vendor != 'postgresql':
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def handle(self, request):
+        timeout = StatementTimeout(request)
+        with connections[DEFAULT_DB_ALIAS].execute_wrapper(timeout):
+            try:
+                return self.get_response(request)
+            finally:
+                timeout.reset()
+
+    async def __acall__(self, request):
+        timeout = StatementTimeout(request)
+        # The connection of the thread the async ORM runs this request's queries in
+        connection = await sync_to_async(connections.__getitem__)(DEFAULT_DB_ALIAS)
+        with connection.execute_wrapper(timeout):
+            try:
+                return await self.get_response(request)
+            finally:
+                await sync_to_async(timeout.reset)()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.statement_timeout = statement_timeout_for(view_func)
+        return None
+
+    def process_exception(self, request, exception):
+        if not query_canceled(exception):
+            return None
+        response = JsonResponse({'detail': 'The database took too long to answer. Please retry.'}, status=503)
+        response['Retry-After'] = str(self.retry_after)
+        return response
+
+
+class CompressionMiddleware(AsyncCapableMiddleware):
+    """
+    Compresses JSON and text responses of at least COMPRESSION_MIN_SIZE bytes,
+    with brotli when the client accepts it and the module is installed,
+    gzip otherwise. Small bodies are sent as-is: compressing them costs
+    more CPU than it saves on the wire.
+    """
+    compressible_types = ('application/json', 'text/')
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+
+    def handle(self, request):
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        if (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or len(response.content) < self.min_size
+            or not response.get('Content-Type', '').startswith(self.compressible_types)
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is not None and accepts_br.search(accept_encoding):
+            content, encoding = brotli.compress(response.content, quality=4), 'br'
+        elif accepts_gzip.search(accept_encoding):
+            content, encoding = compress_string(response.content), 'gzip'
+        else:
+            return response
+        if len(content) >= len(response.content):
+            return response
+
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoding
+        # The representation changed, so a strong ETag no longer holds
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+
+class BrowserOnlyMixin:
+    """
+    Skips a middleware for API requests. The API authenticates with JWTs in
+    the Authorization header only, so sessions, CSRF cookies, request.user
+    and messages only matter to the admin and the frontend, which keep them.
+    """
+
+    def __call__(self, request):
+        if request.path_info.startswith(API_PATH_PREFIX):
+            return self.get_response(request)  # a coroutine in async mode, as the caller expects
+        return super().__call__(request)
+
+
+class SessionMiddleware(BrowserOnlyMixin, BaseSessionMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(BrowserOnlyMixin, BaseCsrfViewMiddleware):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if request.path_info.startswith(API_PATH_PREFIX):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class AuthenticationMiddleware(BrowserOnlyMixin, BaseAuthenticationMiddleware):
+    pass
+
+
+class MessageMiddleware(BrowserOnlyMixin, BaseMessageMiddleware):
+    pass
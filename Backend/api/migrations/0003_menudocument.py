@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_remove_user_email_verified'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MenuDocument',
+            fields=[
+                ('restaurant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='menu_document', serialize=False, to='api.restaurant')),
+                ('region', models.CharField(choices=[('india', 'India'), ('america', 'America')], max_length=10)),
+                ('body', models.BinaryField()),
+                ('gzip_body', models.BinaryField()),
+                ('etag', models.CharField(max_length=64)),
+                ('generated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_archivedorder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MenuItemOrderCount',
+            fields=[
+                ('menu_item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='order_counter', serialize=False, to='api.menuitem')),
+                ('region', models.CharField(choices=[('india', 'India'), ('america', 'America')], max_length=10)),
+                ('quantity', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['region', '-quantity'], name='api_menuite_region_b9038c_idx'), models.Index(fields=['-quantity'], name='api_menuite_quantit_36525b_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RestaurantOrderCount',
+            fields=[
+                ('restaurant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='order_counter', serialize=False, to='api.restaurant')),
+                ('region', models.CharField(choices=[('india', 'India'), ('america', 'America')], max_length=10)),
+                ('order_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['region', '-order_count'], name='api_restaur_region_00e85a_idx'), models.Index(fields=['-order_count'], name='api_restaur_order_c_fff1e0_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyMenuItemOrderCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('region', models.CharField(choices=[('india', 'India'), ('america', 'America')], max_length=10)),
+                ('quantity', models.IntegerField(default=0)),
+                ('menu_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_order_counters', to='api.menuitem')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['region', 'day'], name='api_dailyme_region_9ff31c_idx'), models.Index(fields=['day'], name='api_dailyme_day_c8da92_idx')],
+                'constraints': [models.UniqueConstraint(fields=('menu_item', 'day'), name='unique_menu_item_day_count')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyRestaurantOrderCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('region', models.CharField(choices=[('india', 'India'), ('america', 'America')], max_length=10)),
+                ('order_count', models.IntegerField(default=0)),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_order_counters', to='api.restaurant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['region', 'day'], name='api_dailyre_region_a0a6be_idx'), models.Index(fields=['day'], name='api_dailyre_day_11a358_idx')],
+                'constraints': [models.UniqueConstraint(fields=('restaurant', 'day'), name='unique_restaurant_day_count')],
+            },
+        ),
+    ]
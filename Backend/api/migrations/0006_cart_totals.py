@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:54
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_totals(apps, schema_editor):
+    Cart = apps.get_model('api', 'Cart')
+    CartItem = apps.get_model('api', 'CartItem')
+    lines = CartItem.objects.filter(cart=OuterRef('pk')).order_by().values('cart')
+    amount = models.ExpressionWrapper(F('quantity') * F('menu_item__price'), output_field=models.DecimalField(max_digits=10, decimal_places=2))
+    Cart.objects.update(
+        item_count=Coalesce(Subquery(lines.annotate(count=Sum('quantity')).values('count')), 0),
+        subtotal=Coalesce(Subquery(lines.annotate(amount=Sum(amount)).values('amount')), Decimal('0')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_leaderboard_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.RunPython(fill_totals, migrations.RunPython.noop),
+    ]
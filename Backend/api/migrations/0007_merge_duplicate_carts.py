@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:01
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def merge_duplicate_carts(apps, schema_editor):
+    """Folds each customer's extra carts into their most recently updated one."""
+    Cart = apps.get_model('api', 'Cart')
+    CartItem = apps.get_model('api', 'CartItem')
+    duplicated = Cart.objects.values('customer').annotate(carts=Count('id')).filter(carts__gt=1)
+    for customer_id in duplicated.values_list('customer', flat=True):
+        keep, *others = Cart.objects.filter(customer_id=customer_id).order_by('-updated_at', '-id')
+        for item in CartItem.objects.filter(cart__in=others).select_related('menu_item'):
+            existing = CartItem.objects.filter(cart=keep, menu_item_id=item.menu_item_id).first()
+            if existing:
+                existing.quantity += item.quantity
+                existing.save(update_fields=['quantity'])
+                item.delete()
+            else:
+                item.cart = keep
+                item.save(update_fields=['cart'])
+        Cart.objects.filter(pk__in=[cart.pk for cart in others]).delete()
+        items = list(CartItem.objects.filter(cart=keep).select_related('menu_item'))
+        keep.item_count = sum(item.quantity for item in items)
+        keep.subtotal = sum((item.menu_item.price * item.quantity for item in items), 0)
+        keep.save(update_fields=['item_count', 'subtotal'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_cart_totals'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_carts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Separate from the merge, so PostgreSQL has no deferred FK checks
+    # pending from it when the table is altered
+
+    dependencies = [
+        ('api', '0007_merge_duplicate_carts'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='cart',
+            constraint=models.UniqueConstraint(fields=('customer',), name='one_cart_per_customer'),
+        ),
+    ]
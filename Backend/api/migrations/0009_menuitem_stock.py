@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_one_cart_per_customer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menuitem',
+            name='stock',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_menuitem_stock'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='station',
+            field=models.CharField(default='kitchen', max_length=50),
+        ),
+        migrations.CreateModel(
+            name='KitchenTicket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('station', models.CharField(max_length=50)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('acknowledged', 'Acknowledged'), ('ready', 'Ready'), ('cancelled', 'Cancelled')], default='queued', max_length=20)),
+                ('promised_at', models.DateTimeField()),
+                ('lines', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('acknowledged_at', models.DateTimeField(blank=True, null=True)),
+                ('ready_at', models.DateTimeField(blank=True, null=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tickets', to='api.order')),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kitchen_tickets', to='api.restaurant')),
+            ],
+            options={
+                'ordering': ['promised_at', 'id'],
+                'indexes': [models.Index(fields=['restaurant', 'station', 'status', 'promised_at', 'id'], name='kitchen_queue_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_kitchen_tickets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='CrewAvailability',
+            fields=[
+                ('crew', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='crew_availability', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('is_available', models.BooleanField(default=True)),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'crew availability',
+                'indexes': [models.Index(fields=['is_available'], name='api_crewava_is_avai_d84abc_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DeliveryAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('travel_minutes', models.FloatField()),
+                ('assigned_at', models.DateTimeField(auto_now_add=True)),
+                ('crew', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='delivery_assignments', to=settings.AUTH_USER_MODEL)),
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='delivery_assignment', to='api.order')),
+            ],
+        ),
+    ]
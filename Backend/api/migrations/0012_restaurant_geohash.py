@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:26
+
+from django.db import migrations, models
+
+from api import geo
+
+
+def fill_geohashes(apps, schema_editor):
+    Restaurant = apps.get_model('api', 'Restaurant')
+    restaurants = list(Restaurant.objects.filter(latitude__isnull=False, longitude__isnull=False))
+    for restaurant in restaurants:
+        restaurant.geohash = geo.encode(restaurant.latitude, restaurant.longitude)
+    Restaurant.objects.bulk_update(restaurants, ['geohash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_delivery_assignment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='geohash',
+            field=models.CharField(blank=True, editable=False, max_length=12),
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(fields=['geohash'], name='api_restaur_geohash_69d4f7_idx'),
+        ),
+        migrations.RunPython(fill_geohashes, migrations.RunPython.noop),
+    ]
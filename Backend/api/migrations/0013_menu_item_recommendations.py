@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_restaurant_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MenuItemPairCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('orders', models.IntegerField(default=0)),
+                ('menu_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.menuitem')),
+                ('other', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.menuitem')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('menu_item', 'other'), name='unique_menu_item_pair')],
+            },
+        ),
+        migrations.CreateModel(
+            name='MenuItemRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.IntegerField()),
+                ('menu_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='api.menuitem')),
+                ('recommended', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommended_with', to='api.menuitem')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('menu_item', 'recommended'), name='unique_menu_item_recommendation')],
+            },
+        ),
+    ]
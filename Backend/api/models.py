@@ -1,8 +1,15 @@
 # models.py
-from django.db import models
+from decimal import Decimal
+
+from django.db import connection, models, transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from django.utils import timezone
 from django.utils.text import slugify
 
+from . import geo
+
 
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
@@ -72,6 +79,10 @@ class Restaurant(models.Model):
     region = models.CharField(max_length=10, choices=REGION_CHOICES)
     rating = models.CharField(max_length=100)
     image_url = models.URLField(blank=True, null=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    # Derived from latitude/longitude on save; indexed for /restaurants/nearby/ (see api/geo.py)
+    geohash = models.CharField(max_length=12, blank=True, editable=False)
     is_active = models.BooleanField(default=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name="restaurants")
     created_at = models.DateTimeField(auto_now_add=True)
@@ -81,14 +92,29 @@ class Restaurant(models.Model):
         indexes = [
             models.Index(fields=['region']),
             models.Index(fields=['is_active']),
+            models.Index(fields=['geohash']),
         ]
 
+    def save(self, *args, **kwargs):
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = geo.encode(self.latitude, self.longitude)
+        else:
+            self.geohash = ''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.name
 
 class Category(models.Model):
     name = models.CharField(max_length=255, unique=True)
     slug = models.SlugField(max_length=255, unique=True, blank=True)
+    # Kitchen station that prepares items of this category (see api/kitchen.py)
+    station = models.CharField(max_length=50, default="kitchen")
+    # Validator for menu item responses that embed it (?expand=category)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["name"]
@@ -114,6 +140,8 @@ class MenuItem(models.Model):
     )
     image_url = models.URLField(blank=True, null=True)
     is_available = models.BooleanField(default=True)
+    # Units left, taken at checkout (api/inventory.py); None = not counted
+    stock = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -124,17 +152,181 @@ class MenuItem(models.Model):
             models.Index(fields=['is_available']),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        item = super().from_db(db, field_names, values)
+        # Lets the reprice signal tell whether the price changed
+        item._loaded_price = item.__dict__.get('price')
+        return item
+
     def __str__(self):
         return f"{self.name} ({self.restaurant.name})"
 
+class MenuDocument(models.Model):
+    """A restaurant's menu pre-rendered to JSON (see api/menus.py), rebuilt whenever it changes."""
+    restaurant = models.OneToOneField(
+        Restaurant, on_delete=models.CASCADE, primary_key=True, related_name="menu_document"
+    )
+    region = models.CharField(max_length=10, choices=Restaurant.REGION_CHOICES)
+    body = models.BinaryField()
+    gzip_body = models.BinaryField()
+    etag = models.CharField(max_length=64)
+    generated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Menu document for restaurant #{self.restaurant_id}"
+
+class RestaurantOrderCount(models.Model):
+    """All-time count of a restaurant's non-cancelled orders, kept current by api/leaderboards.py."""
+    restaurant = models.OneToOneField(
+        Restaurant, on_delete=models.CASCADE, primary_key=True, related_name="order_counter"
+    )
+    region = models.CharField(max_length=10, choices=Restaurant.REGION_CHOICES)
+    order_count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['region', '-order_count']),
+            models.Index(fields=['-order_count']),
+        ]
+
+class DailyRestaurantOrderCount(models.Model):
+    """A restaurant's non-cancelled orders placed on one day, for windowed leaderboards."""
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name="daily_order_counters")
+    day = models.DateField()
+    region = models.CharField(max_length=10, choices=Restaurant.REGION_CHOICES)
+    order_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['restaurant', 'day'], name='unique_restaurant_day_count'),
+        ]
+        indexes = [
+            models.Index(fields=['region', 'day']),
+            models.Index(fields=['day']),
+        ]
+
+class MenuItemOrderCount(models.Model):
+    """All-time quantity of a menu item in non-cancelled orders."""
+    menu_item = models.OneToOneField(
+        MenuItem, on_delete=models.CASCADE, primary_key=True, related_name="order_counter"
+    )
+    region = models.CharField(max_length=10, choices=Restaurant.REGION_CHOICES)
+    quantity = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['region', '-quantity']),
+            models.Index(fields=['-quantity']),
+        ]
+
+class MenuItemPairCount(models.Model):
+    """
+    How many orders contained both items, one row per direction; only items
+    of the same restaurant are paired. Kept by api/recommendations.py.
+    """
+    menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name="+")
+    other = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name="+")
+    orders = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['menu_item', 'other'], name='unique_menu_item_pair'),
+        ]
+
+class MenuItemRecommendation(models.Model):
+    """One of the items most often ordered together with `menu_item`, the top RECOMMENDATIONS_PER_ITEM of its pair counts."""
+    menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name="recommendations")
+    recommended = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name="recommended_with")
+    score = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['menu_item', 'recommended'], name='unique_menu_item_recommendation'),
+        ]
+
+class DailyMenuItemOrderCount(models.Model):
+    """Quantity of a menu item in non-cancelled orders placed on one day."""
+    menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name="daily_order_counters")
+    day = models.DateField()
+    region = models.CharField(max_length=10, choices=Restaurant.REGION_CHOICES)
+    quantity = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['menu_item', 'day'], name='unique_menu_item_day_count'),
+        ]
+        indexes = [
+            models.Index(fields=['region', 'day']),
+            models.Index(fields=['day']),
+        ]
+
 class Cart(models.Model):
     customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name="carts")
+    # Stored totals at current menu prices: CartItem.save()/delete() adjust
+    # them in the same transaction with F() expressions, and menu price
+    # changes reprice the affected carts (api/signals.py). Queryset updates
+    # and bulk_create() bypass this; use clear() or recalculate().
+    item_count = models.PositiveIntegerField(default=0)
+    subtotal = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['customer'], name='one_cart_per_customer'),
+        ]
+
     @property
     def total(self):
-        return sum(item.subtotal for item in self.items.all())
+        return self.subtotal
+
+    @classmethod
+    def add_item(cls, cart_id, customer_id, menu_item_id, quantity, special_instructions=''):
+        """
+        Adds `quantity` of a menu item to the customer's cart, to its existing
+        line if there is one, with a single INSERT ... ON CONFLICT DO UPDATE,
+        then moves the stored totals. Returns False, changing nothing, when
+        the cart is not the customer's or the menu item does not exist.
+        """
+        quote = connection.ops.quote_name
+        line, cart, item = (quote(model._meta.db_table) for model in (CartItem, Cart, MenuItem))
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        sql = (
+            f'INSERT INTO {line} (cart_id, menu_item_id, quantity, special_instructions, created_at, updated_at) '
+            f'SELECT c.id, m.id, %s, %s, %s, %s FROM {cart} c, {item} m '
+            f'WHERE c.id = %s AND c.customer_id = %s AND m.id = %s '
+            f'ON CONFLICT (cart_id, menu_item_id) DO UPDATE SET quantity = {line}.quantity + EXCLUDED.quantity, '
+            f'special_instructions = EXCLUDED.special_instructions, updated_at = EXCLUDED.updated_at'
+        )
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [quantity, special_instructions, now, now, cart_id, customer_id, menu_item_id])
+                if not cursor.rowcount:
+                    return False
+            price = MenuItem.objects.filter(pk=menu_item_id).order_by().values('price')
+            cls.objects.filter(pk=cart_id).update(
+                item_count=F('item_count') + quantity,
+                subtotal=F('subtotal') + Subquery(price) * quantity,
+                updated_at=timezone.now(),
+            )
+        return True
+
+    def clear(self):
+        with transaction.atomic():
+            self.items.all().delete()
+            Cart.objects.filter(pk=self.pk).update(item_count=0, subtotal=0, updated_at=timezone.now())
+        self.item_count, self.subtotal = 0, Decimal('0')
+
+    @classmethod
+    def recalculate(cls, carts):
+        """Recomputes the stored totals of the `carts` queryset from their lines, in one UPDATE."""
+        lines = CartItem.objects.filter(cart=OuterRef('pk')).order_by().values('cart')
+        amount = models.ExpressionWrapper(F('quantity') * F('menu_item__price'), output_field=models.DecimalField(max_digits=10, decimal_places=2))
+        return carts.update(
+            item_count=Coalesce(Subquery(lines.annotate(count=Sum('quantity')).values('count')), 0),
+            subtotal=Coalesce(Subquery(lines.annotate(amount=Sum(amount)).values('amount')), Decimal('0')),
+        )
 
     def __str__(self):
         return f"Cart #{self.id} for {self.customer.email}"
@@ -154,6 +346,35 @@ class CartItem(models.Model):
     class Meta:
         unique_together = ('cart', 'menu_item')
 
+    def _locked_quantity(self):
+        return CartItem.objects.select_for_update().values_list('quantity', flat=True).get(pk=self.pk)
+
+    def _adjust_cart(self, quantity):
+        if not quantity:
+            return
+        Cart.objects.filter(pk=self.cart_id).update(
+            item_count=F('item_count') + quantity,
+            subtotal=F('subtotal') + self.menu_item.price * quantity,
+            updated_at=timezone.now(),
+        )
+        if CartItem.cart.is_cached(self):
+            self.cart.refresh_from_db(fields=['item_count', 'subtotal', 'updated_at'])
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = 0 if self._state.adding else self._locked_quantity()
+            super().save(*args, **kwargs)
+            if hasattr(self.quantity, 'resolve_expression'):
+                self.refresh_from_db(fields=['quantity'])
+            self._adjust_cart(self.quantity - previous)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            quantity = self._locked_quantity()
+            result = super().delete(*args, **kwargs)
+            self._adjust_cart(-quantity)
+        return result
+
     def __str__(self):
         return f"{self.quantity}x {self.menu_item.name} in Cart #{self.cart.id}"
 
@@ -192,6 +413,13 @@ class Order(models.Model):
             models.Index(fields=['status']),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        order = super().from_db(db, field_names, values)
+        # Lets the leaderboard signal see status changes without re-reading the row
+        order._loaded_status = order.__dict__.get('status')
+        return order
+
     def __str__(self):
         return f"Order #{self.id} - {self.get_status_display()}"
 
@@ -207,4 +435,116 @@ class OrderItem(models.Model):
         return self.price * self.quantity
 
     def __str__(self):
-        return f"{self.quantity}x {self.menu_item.name} in Order #{self.order.id}"
\ No newline at end of file
+        return f"{self.quantity}x {self.menu_item.name} in Order #{self.order.id}"
+
+class KitchenTicket(models.Model):
+    """
+    The items of one order that one kitchen station prepares, queued by
+    promised time. Created at checkout and advanced through api/kitchen.py.
+    """
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("acknowledged", "Acknowledged"),
+        ("ready", "Ready"),
+        ("cancelled", "Cancelled"),
+    ]
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="tickets")
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name="kitchen_tickets")
+    station = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    promised_at = models.DateTimeField()
+    # [{menu_item, name, quantity, special_instructions}], so the queue is read without joins
+    lines = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    acknowledged_at = models.DateTimeField(null=True, blank=True)
+    ready_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['promised_at', 'id']
+        indexes = [
+            models.Index(fields=['restaurant', 'station', 'status', 'promised_at', 'id'], name='kitchen_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.station} ticket for Order #{self.order_id} - {self.get_status_display()}"
+
+class CrewAvailability(models.Model):
+    """Whether a member of the Crew group can take a delivery, and where they last were."""
+    crew = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="crew_availability")
+    is_available = models.BooleanField(default=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "crew availability"
+        indexes = [models.Index(fields=['is_available'])]
+
+    @classmethod
+    def release(cls, orders):
+        """
+        Frees the crew members assigned to the undelivered, uncancelled ones of
+        the `orders` queryset, in one UPDATE. Run before deleting orders, whose
+        assignments go with them; finishing an order frees its crew through
+        the order_saved signal.
+        """
+        open_orders = orders.exclude(status__in=('delivered', 'cancelled'))
+        return cls.objects.filter(crew__delivery_assignments__order__in=open_orders).update(is_available=True)
+
+    def __str__(self):
+        return f"{self.crew} ({'available' if self.is_available else 'busy'})"
+
+class DeliveryAssignment(models.Model):
+    """A ready order handed to a crew member by api/dispatch.py."""
+    order = models.OneToOneField(Order, on_delete=models.CASCADE, related_name="delivery_assignment")
+    crew = models.ForeignKey(User, on_delete=models.PROTECT, related_name="delivery_assignments")
+    travel_minutes = models.FloatField()
+    assigned_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Order #{self.order_id} -> {self.crew}"
+
+class ArchivedOrder(models.Model):
+    """
+    A delivered or cancelled order moved out of the hot Order table by
+    `manage.py archive_orders`. Same columns and id; read it together with
+    current orders through api.archiving.OrderHistory.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    customer = models.ForeignKey(User, on_delete=models.PROTECT, related_name="archived_orders")
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.PROTECT, related_name="archived_orders")
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    payment_method = models.CharField(max_length=20, choices=Order.PAYMENT_METHOD_CHOICES)
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    special_instructions = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    placed_at = models.DateTimeField(null=True, blank=True)
+    cancelled_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['customer', '-created_at']),
+            models.Index(fields=['restaurant', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"Archived order #{self.id} - {self.get_status_display()}"
+
+class ArchivedOrderItem(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name="items")
+    menu_item = models.ForeignKey(MenuItem, on_delete=models.PROTECT, related_name="archived_order_items")
+    quantity = models.PositiveIntegerField()
+    price = models.DecimalField(max_digits=8, decimal_places=2)
+    special_instructions = models.TextField(blank=True)
+
+    @property
+    def subtotal(self):
+        return self.price * self.quantity
+
+    def __str__(self):
+        return f"{self.quantity}x {self.menu_item.name} in archived Order #{self.order_id}"
\ No newline at end of file
@@ -1,8 +1,10 @@
 from django.conf import settings
-from paypalcheckoutsdk.core import PayPalHttpClient, SandboxEnvironment
 
 class PayPalClient:
     def __init__(self):
+        # Imported on first use, it isn't needed to boot a worker
+        from paypalcheckoutsdk.core import PayPalHttpClient, SandboxEnvironment
+
         self.client_id = settings.PAYPAL_CLIENT_ID
         self.client_secret = settings.PAYPAL_CLIENT_SECRET
         self.environment = SandboxEnvironment(client_id=self.client_id, client_secret=self.client_secret)
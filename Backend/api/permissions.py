@@ -1,4 +1,7 @@
 # permissions.py
+import hmac
+
+from django.conf import settings
 from rest_framework import permissions
 
 from api.models import User
@@ -56,4 +59,16 @@ class CanCancelOrder(permissions.BasePermission):
 
 class CanUpdatePaymentMethod(permissions.BasePermission):
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.role == "admin"
\ No newline at end of file
+        return request.user.is_authenticated and request.user.role == "admin"
+
+class HasMetricsToken(permissions.BasePermission):
+    """
+    Lets scrapers in with `Authorization: Token <METRICS_TOKEN>`.
+    Disabled when METRICS_TOKEN is empty.
+    """
+    def has_permission(self, request, view):
+        token = getattr(settings, 'METRICS_TOKEN', '')
+        if not token:
+            return False
+        keyword, _, supplied = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+        return keyword == 'Token' and hmac.compare_digest(supplied.encode(), token.encode())
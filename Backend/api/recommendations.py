@@ -0,0 +1,159 @@
+# recommendations.py
+"""
+"Frequently ordered together" suggestions.
+
+MenuItemPairCount holds the sparse item x item co-occurrence matrix: for
+each pair of a restaurant's items, how many orders contained both.
+MenuItemRecommendation keeps just the top RECOMMENDATIONS_PER_ITEM
+neighbours of every item, which is all the cart endpoint reads.
+
+`manage.py build_recommendations` recomputes both from the order history
+(current and archived, cancelled orders left out): per restaurant, the
+order x item incidence matrix A is built with SciPy and the counts are
+A.T @ A. After that, every new order is added on a background job: its
+pairs' counts go up by one and its items' top neighbours are re-ranked.
+Later cancellations are not taken back off; the counts are a popularity
+signal, not a ledger.
+"""
+from collections import defaultdict
+from itertools import permutations
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import ArchivedOrderItem, MenuItemPairCount, MenuItemRecommendation, Order, OrderItem, Restaurant
+
+
+def _add_pairs(pairs):
+    """Adds one to the count of each (menu_item_id, other_id) pair, a few hundred pairs per statement."""
+    if not pairs:
+        return
+    quote = connection.ops.quote_name
+    table = quote(MenuItemPairCount._meta.db_table)
+    orders = quote('orders')
+    with connection.cursor() as cursor:
+        for start in range(0, len(pairs), 400):  # Stays under SQLite's bound parameter limit
+            batch = pairs[start:start + 400]
+            # INSERT ... ON CONFLICT works the same on PostgreSQL and SQLite
+            cursor.execute(
+                f'INSERT INTO {table} ({quote("menu_item_id")}, {quote("other_id")}, {orders}) '
+                f'VALUES {", ".join(["(%s, %s, 1)"] * len(batch))} '
+                f'ON CONFLICT ({quote("menu_item_id")}, {quote("other_id")}) DO UPDATE SET {orders} = {table}.{orders} + 1',
+                [id for pair in batch for id in pair],
+            )
+
+
+def _lock_items(menu_item_ids):
+    """
+    Makes workers recording orders with common items take turns, or their
+    refreshes clash and roll back the increments. Advisory locks, held to the
+    end of the transaction and taken in id order, leave the MenuItem rows to
+    checkout's stock updates.
+    """
+    if connection.vendor != 'postgresql':
+        return  # SQLite has one writer at a time
+    with connection.cursor() as cursor:
+        for menu_item_id in menu_item_ids:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [menu_item_id])
+
+
+def refresh(menu_item_ids):
+    """Re-ranks the top neighbours of `menu_item_ids` from their pair counts."""
+    limit = settings.RECOMMENDATIONS_PER_ITEM
+    neighbours = defaultdict(list)
+    rows = MenuItemPairCount.objects.filter(menu_item__in=menu_item_ids, orders__gt=0).order_by('menu_item', '-orders', 'other')
+    for menu_item_id, other_id, orders in rows.values_list('menu_item_id', 'other_id', 'orders'):
+        if len(neighbours[menu_item_id]) < limit:
+            neighbours[menu_item_id].append(MenuItemRecommendation(menu_item_id=menu_item_id, recommended_id=other_id, score=orders))
+    MenuItemRecommendation.objects.filter(menu_item__in=menu_item_ids).delete()
+    MenuItemRecommendation.objects.bulk_create([row for rows in neighbours.values() for row in rows])
+
+
+def record_order(order_id):
+    """Adds one order's item pairs to the counts. Run on the recommendations job queue once the order commits."""
+    if not Order.objects.filter(pk=order_id).exclude(status='cancelled').exists():
+        return
+    by_restaurant = defaultdict(set)
+    for menu_item_id, restaurant_id in OrderItem.objects.filter(order_id=order_id).values_list('menu_item_id', 'menu_item__restaurant_id'):
+        by_restaurant[restaurant_id].add(menu_item_id)
+    pairs = sorted(pair for items in by_restaurant.values() for pair in permutations(items, 2))
+    if not pairs:
+        return
+    menu_item_ids = sorted({menu_item_id for menu_item_id, _ in pairs})
+    with transaction.atomic():
+        _lock_items(menu_item_ids)
+        _add_pairs(pairs)
+        refresh(menu_item_ids)
+
+
+def cooccurrence(order_ids, menu_item_ids):
+    """
+    Sparse (item x item) matrix of how many orders contain both items, from
+    parallel arrays of one (order, item) per order line, plus the item ids
+    its rows and columns stand for.
+    """
+    # Only the rebuild needs these, and signals import this module on startup
+    import numpy as np
+    from scipy import sparse
+
+    orders, order_index = np.unique(np.asarray(order_ids), return_inverse=True)
+    items, item_index = np.unique(np.asarray(menu_item_ids), return_inverse=True)
+    incidence = sparse.csr_matrix(
+        (np.ones(len(order_index), dtype=np.int32), (order_index, item_index)), shape=(len(orders), len(items))
+    )
+    incidence.sum_duplicates()
+    incidence.data[:] = 1  # An item on two lines of one order still counts once
+    counts = (incidence.T @ incidence).tocsr()
+    counts.setdiag(0)
+    counts.eliminate_zeros()
+    return counts, items
+
+
+def top_neighbours(counts, limit):
+    """[(row, column, count)] of the `limit` highest counts in each row of a CSR matrix, ties to the lower column."""
+    import numpy as np
+
+    top = []
+    for row in range(counts.shape[0]):
+        start, end = counts.indptr[row], counts.indptr[row + 1]
+        columns, values = counts.indices[start:end], counts.data[start:end]
+        best = np.lexsort((columns, -values))[:limit]
+        top.extend((row, int(columns[i]), int(values[i])) for i in best)
+    return top
+
+
+def _order_lines(restaurant_id):
+    """(order ids, menu item ids) of a restaurant's non-cancelled order lines, current and archived."""
+    order_ids, menu_item_ids = [], []
+    for model in (OrderItem, ArchivedOrderItem):
+        lines = model.objects.filter(menu_item__restaurant_id=restaurant_id).exclude(order__status='cancelled')
+        for order_id, menu_item_id in lines.values_list('order_id', 'menu_item_id').iterator(chunk_size=10000):
+            order_ids.append(order_id)
+            menu_item_ids.append(menu_item_id)
+    return order_ids, menu_item_ids
+
+
+@transaction.atomic
+def rebuild():
+    """Recomputes every pair count and recommendation from the order history. Returns (pairs, recommendations)."""
+    MenuItemPairCount.objects.all().delete()
+    MenuItemRecommendation.objects.all().delete()
+    pairs = recommendations = 0
+    for restaurant_id in Restaurant.objects.order_by('pk').values_list('pk', flat=True):
+        order_ids, menu_item_ids = _order_lines(restaurant_id)
+        if not order_ids:
+            continue
+        counts, items = cooccurrence(order_ids, menu_item_ids)
+        coo = counts.tocoo()
+        MenuItemPairCount.objects.bulk_create([
+            MenuItemPairCount(menu_item_id=int(items[row]), other_id=int(items[column]), orders=int(count))
+            for row, column, count in zip(coo.row, coo.col, coo.data)
+        ], batch_size=1000)
+        top = top_neighbours(counts, settings.RECOMMENDATIONS_PER_ITEM)
+        MenuItemRecommendation.objects.bulk_create([
+            MenuItemRecommendation(menu_item_id=int(items[row]), recommended_id=int(items[column]), score=count)
+            for row, column, count in top
+        ], batch_size=1000)
+        pairs += coo.nnz
+        recommendations += len(top)
+    return pairs, recommendations
@@ -0,0 +1,100 @@
+# schema.py
+"""
+The OpenAPI schema as a build artifact.
+
+drf_spectacular introspects every view and serializer to generate the
+schema, and Swagger UI and Redoc fetch it on every page load. `manage.py
+build_schema` (run by build.sh) renders it once to SCHEMA_ARTIFACT_DIR as
+YAML and JSON, each with a gzipped copy; SchemaView serves those bytes
+with an ETag. A process without the artifact generates it on its first
+schema request and keeps it. With SCHEMA_LIVE (on in debug) every request
+generates it afresh, as SpectacularAPIView does.
+
+The artifact is in the default language and API version: `?lang=` and
+`?version=` only apply to the live schema.
+"""
+import functools
+import gzip
+import hashlib
+import os
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.views import SpectacularAPIView
+
+from .middleware import accepts_gzip
+
+RENDERERS = (OpenApiYamlRenderer, OpenApiJsonRenderer)
+
+
+def generate():
+    """{format: schema bytes}, as SpectacularAPIView would render it."""
+    generator = SpectacularAPIView.generator_class(urlconf=SpectacularAPIView.urlconf)
+    schema = generator.get_schema(request=None, public=SpectacularAPIView.serve_public)
+    return {renderer.format: renderer().render(schema) for renderer in RENDERERS}
+
+
+def artifact_path(format, compressed=False):
+    return os.path.join(settings.SCHEMA_ARTIFACT_DIR, f'openapi.{format}' + ('.gz' if compressed else ''))
+
+
+def write():
+    """Generates the schema and writes it to SCHEMA_ARTIFACT_DIR. Returns the paths written."""
+    os.makedirs(settings.SCHEMA_ARTIFACT_DIR, exist_ok=True)
+    paths = []
+    for format, body in generate().items():
+        for path, content in ((artifact_path(format), body), (artifact_path(format, True), gzip.compress(body, mtime=0))):
+            with open(path, 'wb') as handle:
+                handle.write(content)
+            paths.append(path)
+    return paths
+
+
+def _read(path):
+    with open(path, 'rb') as handle:
+        return handle.read()
+
+
+@functools.cache
+def documents():
+    """{format: {body, gzip_body, etag}} from the artifact, or generated if there is none. Kept for the process."""
+    paths = [artifact_path(renderer.format, compressed) for renderer in RENDERERS for compressed in (False, True)]
+    if all(os.path.exists(path) for path in paths):
+        bodies = {renderer.format: (_read(artifact_path(renderer.format)), _read(artifact_path(renderer.format, True)))
+                  for renderer in RENDERERS}
+    else:
+        bodies = {format: (body, gzip.compress(body, mtime=0)) for format, body in generate().items()}
+    return {
+        format: {
+            'body': body,
+            'gzip_body': gzip_body,
+            'etag': '"%s"' % hashlib.md5(body, usedforsecurity=False).hexdigest(),
+        }
+        for format, (body, gzip_body) in bodies.items()
+    }
+
+
+class SchemaView(SpectacularAPIView):
+    """SpectacularAPIView serving the prebuilt schema, see the module docstring."""
+
+    def _get_schema_response(self, request):
+        if settings.SCHEMA_LIVE:
+            return super()._get_schema_response(request)
+
+        document = documents()[request.accepted_renderer.format]
+        etag = 'W/' + document['etag']  # the same validator for both encodings
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            content_type = request.accepted_renderer.media_type
+            if accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+                response = HttpResponse(document['gzip_body'], content_type=content_type)
+                response['Content-Encoding'] = 'gzip'
+            else:
+                response = HttpResponse(document['body'], content_type=content_type)
+            response['Content-Disposition'] = f'inline; filename="{self._get_filename(request, None)}"'
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, no_cache=True)
+        patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+        return response
@@ -1,9 +1,33 @@
 # serializers.py
 from rest_framework import serializers
-from .models import Category, User, Restaurant, MenuItem, Cart, CartItem, Order, OrderItem
+from .models import ArchivedOrder, Category, KitchenTicket, User, Restaurant, MenuItem, Cart, CartItem, Order, OrderItem
 from django.contrib.auth.hashers import make_password
+import time
+from .instrumentation import current_stats
+from .fieldsets import ExpandableFieldsMixin
 
-class UserCreateSerializer(serializers.ModelSerializer):
+
+class TimedSerializerMixin:
+    """
+    Adds the time spent in to_representation to the current request's stats.
+    Only the outermost serializer (or each child of an outermost list) is
+    timed, so nested serializers are not counted twice.
+    """
+    def _is_outermost(self):
+        parent = self.parent
+        return parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+
+    def to_representation(self, instance):
+        stats = current_stats()
+        if stats is None or not self._is_outermost():
+            return super().to_representation(instance)
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            stats.add_serializer_time(time.perf_counter() - started)
+
+class UserCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'email', 'password', 'first_name', 'last_name', 'region')
@@ -21,33 +45,43 @@ class UserCreateSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError("Only admins can assign the 'global' region.")
         return value
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(ExpandableFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'email', 'first_name', 'last_name', 'role', 'region', 'is_active')
 
-class RestaurantSerializer(serializers.ModelSerializer):
+class RestaurantSerializer(ExpandableFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Restaurant
         fields = '__all__'
         read_only_fields = ('created_by', 'created_at', 'updated_at')
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(ExpandableFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category # Assuming you create a Category model
         fields = ('id', 'name')
 
-class MenuItemSerializer(serializers.ModelSerializer):
-    category = CategorySerializer(read_only=True) 
+class MenuItemSerializer(ExpandableFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        'category': (CategorySerializer, {}),
+        'restaurant': (RestaurantSerializer, {}),
+    }
 
     class Meta:
         model = MenuItem
         # Explicitly list fields for better control
-        fields = ('id', 'name', 'description', 'price', 'image_url', 'category', 'is_available', 'restaurant')
-        read_only_fields = ('created_at', 'updated_at')
+        fields = ('id', 'name', 'description', 'price', 'image_url', 'category', 'is_available', 'stock', 'restaurant')
+        read_only_fields = ('category', 'created_at', 'updated_at')
+
+    def update(self, instance, validated_data):
+        # Restocking an item that sold out puts it back on the menu
+        if instance.stock == 0 and validated_data.get('stock') and 'is_available' not in validated_data:
+            validated_data['is_available'] = True
+        return super().update(instance, validated_data)
 
-class CartItemSerializer(serializers.ModelSerializer):
-    menu_item = MenuItemSerializer(read_only=True)
+class CartItemSerializer(ExpandableFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
+    expandable_fields = {'menu_item': (MenuItemSerializer, {})}
+    always_select_related = ('menu_item',)  # subtotal
     menu_item_id = serializers.PrimaryKeyRelatedField(
         queryset=MenuItem.objects.all(),
         source='menu_item',
@@ -57,35 +91,45 @@ class CartItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = CartItem
         fields = ('id', 'menu_item', 'menu_item_id', 'quantity', 'special_instructions', 'subtotal')
-        read_only_fields = ('subtotal',)
+        read_only_fields = ('menu_item', 'subtotal')
 
-class CartSerializer(serializers.ModelSerializer):
+class CartSerializer(ExpandableFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
     items = CartItemSerializer(many=True, read_only=True)
     total = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
 
     class Meta:
         model = Cart
-        fields = ('id', 'customer', 'items', 'total', 'created_at', 'updated_at')
-        read_only_fields = ('customer', 'total', 'created_at', 'updated_at')
+        fields = ('id', 'customer', 'items', 'item_count', 'subtotal', 'total', 'created_at', 'updated_at')
+        read_only_fields = ('customer', 'item_count', 'subtotal', 'total', 'created_at', 'updated_at')
 
-class OrderItemSerializer(serializers.ModelSerializer):
-    menu_item = MenuItemSerializer(read_only=True)
+class OrderItemSerializer(ExpandableFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
+    expandable_fields = {'menu_item': (MenuItemSerializer, {})}
 
     class Meta:
         model = OrderItem
         fields = ('id', 'menu_item', 'quantity', 'price', 'special_instructions', 'subtotal')
-        read_only_fields = ('price', 'subtotal')
+        read_only_fields = ('menu_item', 'price', 'subtotal')
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(ExpandableFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
+    expandable_fields = {'restaurant': (RestaurantSerializer, {})}
     items = OrderItemSerializer(many=True, read_only=True)
-    restaurant = RestaurantSerializer(read_only=True)
     restaurant_id = serializers.PrimaryKeyRelatedField(
         queryset=Restaurant.objects.all(),
         source='restaurant',
         write_only=True
     )
+    archived = serializers.SerializerMethodField()
 
     class Meta:
         model = Order
         fields = '__all__'
-        read_only_fields = ('customer', 'status', 'total_amount', 'created_at', 'updated_at', 'placed_at', 'cancelled_at')
\ No newline at end of file
+        read_only_fields = ('customer', 'restaurant', 'status', 'total_amount', 'created_at', 'updated_at', 'placed_at', 'cancelled_at')
+
+    def get_archived(self, obj):
+        return isinstance(obj, ArchivedOrder)
+
+class KitchenTicketSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = KitchenTicket
+        fields = ('id', 'order', 'restaurant', 'station', 'status', 'promised_at', 'lines', 'created_at', 'acknowledged_at', 'ready_at')
+        read_only_fields = fields
@@ -0,0 +1,79 @@
+# signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import analytics, kitchen, leaderboards, recommendations
+from .jobs import menu_documents, recommendation_updates
+from .menus import rebuild_category_menus, rebuild_menu_document
+from .models import Cart, Category, CrewAvailability, MenuItem, Order, OrderItem, Restaurant
+
+# Menu documents are rebuilt once the change is committed, off the request
+# path. Queryset.update() and bulk_create() send no signals; run
+# `manage.py rebuild_menu_documents` after those.
+
+
+@receiver([post_save, post_delete], sender=MenuItem)
+def menu_item_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: menu_documents.enqueue(rebuild_menu_document, instance.restaurant_id))
+
+
+@receiver(post_save, sender=MenuItem)
+def menu_item_saved(sender, instance, created, **kwargs):
+    # Stored cart totals are at current prices
+    if not created and instance.price != getattr(instance, '_loaded_price', None):
+        Cart.recalculate(Cart.objects.filter(items__menu_item=instance))
+    instance._loaded_price = instance.price
+
+
+@receiver(pre_delete, sender=MenuItem)
+def menu_item_deleting(sender, instance, **kwargs):
+    # Its cart lines are deleted by cascade; remember whose totals to fix
+    instance._cart_ids = list(Cart.objects.filter(items__menu_item=instance).values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=MenuItem)
+def menu_item_deleted(sender, instance, **kwargs):
+    if getattr(instance, '_cart_ids', None):
+        Cart.recalculate(Cart.objects.filter(pk__in=instance._cart_ids))
+
+
+@receiver([post_save, post_delete], sender=Restaurant)
+def restaurant_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: menu_documents.enqueue(rebuild_menu_document, instance.pk))
+
+
+@receiver(post_save, sender=Restaurant)
+def restaurant_saved(sender, instance, created, **kwargs):
+    if not created:
+        leaderboards.sync_region(instance)
+
+
+@receiver(post_save, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    # Deleting a category cascades to its items, whose own signals cover it
+    transaction.on_commit(lambda: menu_documents.enqueue(rebuild_category_menus, instance.pk))
+
+
+@receiver(post_save, sender=Order)
+def order_saved(sender, instance, created, **kwargs):
+    # Closed analytics buckets are cached; a late status change must show up.
+    # Dropped on commit, or a read in between would cache the old rows again.
+    # Deletes are handled by OrderViewSet; archiving changes no totals.
+    region = instance.restaurant.region
+    transaction.on_commit(lambda: analytics.invalidate_order(instance, region))
+    kitchen.order_saved(instance)
+    if instance.status in ('delivered', 'cancelled') and getattr(instance, '_loaded_status', None) != instance.status:
+        # Frees the crew member api/dispatch.py gave it to, if any
+        CrewAvailability.objects.filter(crew__delivery_assignments__order=instance).update(is_available=True)
+    # Counters are written in the order's transaction, unlike the menu rebuilds
+    leaderboards.order_saved(instance, created)
+    if created:
+        # Its items exist once the checkout commits
+        transaction.on_commit(lambda: recommendation_updates.enqueue(recommendations.record_order, instance.pk))
+
+
+@receiver(post_save, sender=OrderItem)
+def order_item_saved(sender, instance, created, **kwargs):
+    if created:
+        leaderboards.order_item_created(instance)
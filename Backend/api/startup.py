@@ -0,0 +1,190 @@
+# startup.py
+"""
+Cold start: warming a freshly booted process, and measuring the boot.
+
+restaurant/wsgi.py and asgi.py call warmup() once the application is
+loaded (unless WARMUP_ON_START is off), so the work Django and DRF
+otherwise do lazily on the first requests, like compiling every URL
+pattern, loading translation catalogs, building serializer fields and
+rendering the frontend's shell, happens before the worker takes traffic.
+
+`manage.py profile_startup` boots the application in a fresh interpreter
+under `python -X importtime` and reports the time per phase and the
+slowest imports, by module and by top-level package.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.urls import URLResolver, get_resolver
+from django.utils import translation
+from rest_framework.serializers import Serializer
+from rest_framework.settings import api_settings
+
+# Loaded lazily by DRF and simplejwt on the first request that needs them
+DRF_SETTINGS = (
+    'DEFAULT_RENDERER_CLASSES', 'DEFAULT_PARSER_CLASSES', 'DEFAULT_AUTHENTICATION_CLASSES',
+    'DEFAULT_PERMISSION_CLASSES', 'DEFAULT_THROTTLE_CLASSES', 'DEFAULT_CONTENT_NEGOTIATION_CLASS',
+    'DEFAULT_FILTER_BACKENDS', 'EXCEPTION_HANDLER',
+)
+
+
+def _compile_patterns(resolver):
+    count = 0
+    for pattern in resolver.url_patterns:
+        pattern.pattern.regex  # Compiled on first access
+        count += 1
+        if isinstance(pattern, URLResolver):
+            count += _compile_patterns(pattern)
+    return count
+
+
+def _warm_urls():
+    resolver = get_resolver()
+    resolver.reverse_dict  # Populates the reverse lookup tables
+    return _compile_patterns(resolver)
+
+
+def _warm_translations():
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext('Not found.')
+
+
+def _warm_models():
+    for model in apps.get_models():
+        model._meta.get_fields()
+        model._meta.related_objects
+
+
+def _warm_serializers():
+    from . import serializers
+
+    count = 0
+    for value in vars(serializers).values():
+        if isinstance(value, type) and issubclass(value, Serializer) and value.__module__ == serializers.__name__:
+            value().fields
+            count += 1
+    return count
+
+
+def _warm_authentication():
+    from rest_framework_simplejwt.settings import api_settings as jwt_settings
+    from rest_framework_simplejwt.state import token_backend  # noqa: F401
+
+    for name in DRF_SETTINGS:
+        getattr(api_settings, name)
+    jwt_settings.AUTH_TOKEN_CLASSES
+
+
+def _warm_frontend():
+    from .frontend import shell
+
+    shell()
+
+
+WARMUP_STEPS = (
+    ('urls', _warm_urls),
+    ('translations', _warm_translations),
+    ('models', _warm_models),
+    ('serializers', _warm_serializers),
+    ('authentication', _warm_authentication),
+    ('frontend', _warm_frontend),
+)
+
+
+def warmup():
+    """Runs every warmup step. Returns {step: milliseconds}."""
+    timings = {}
+    for name, step in WARMUP_STEPS:
+        started = time.perf_counter()
+        step()
+        timings[name] = round((time.perf_counter() - started) * 1000, 2)
+    return timings
+
+
+# Run in the profiled interpreter; prints the phase timings as the last line of stdout
+BOOT_SCRIPT = """
+import json, time
+started = time.perf_counter()
+phases = {}
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+phases['settings'] = time.perf_counter()
+django.setup(set_prefix=False)
+phases['apps'] = time.perf_counter()
+from django.utils.module_loading import import_string
+import_string(settings.WSGI_APPLICATION)
+phases['application'] = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+phases['urlconf'] = time.perf_counter()
+if %(warmup)r:
+    from api.startup import warmup
+    warmup()
+    phases['warmup'] = time.perf_counter()
+previous, report = started, {}
+for name, moment in phases.items():
+    report[name] = round((moment - previous) * 1000, 2)
+    previous = moment
+print(json.dumps(report))
+"""
+
+
+def parse_importtime(text):
+    """[{module, self_us, cumulative_us, depth}] from `python -X importtime` output, in import order."""
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append({
+            'module': name.strip(),
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us),
+            'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+        })
+    return rows
+
+
+def package_totals(rows):
+    """{top-level package: total self time in us}, slowest first."""
+    totals = defaultdict(int)
+    for row in rows:
+        totals[row['module'].split('.')[0]] += row['self_us']
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def profile(limit=25, with_warmup=False):
+    """
+    Boots the application in a new interpreter with -X importtime and
+    returns a JSON-serialisable report: milliseconds per boot phase, total
+    import time, and the `limit` slowest modules (cumulative, i.e.
+    including what they import) and packages (own time only).
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT % {'warmup': with_warmup}],
+        # The WSGI module would otherwise warm up inside the 'application' phase
+        capture_output=True, text=True, env={**os.environ, 'WARMUP_ON_START': 'False'}, cwd=settings.BASE_DIR,
+    )
+    if result.returncode:
+        raise RuntimeError(f'Boot failed:\n{result.stderr[-2000:]}')
+    rows = parse_importtime(result.stderr)
+    slowest = sorted(rows, key=lambda row: row['cumulative_us'], reverse=True)[:limit]
+    return {
+        'phases_ms': json.loads(result.stdout.strip().splitlines()[-1]),
+        'import_ms': round(sum(row['self_us'] for row in rows) / 1000, 2),
+        'modules': len(rows),
+        'slowest_modules': [
+            {'module': row['module'], 'cumulative_ms': round(row['cumulative_us'] / 1000, 2), 'self_ms': round(row['self_us'] / 1000, 2)}
+            for row in slowest
+        ],
+        'slowest_packages': [
+            {'package': package, 'ms': round(us / 1000, 2)} for package, us in list(package_totals(rows).items())[:limit]
+        ],
+    }
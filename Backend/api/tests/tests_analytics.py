@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api import analytics
+from api.models import Order, Restaurant, User
+
+
+class OrderAnalyticsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.manager = User.objects.create_user(email="manager@example.com", password="pass", first_name="Man", region="india", role="manager")
+        self.member = User.objects.create_user(email="member@example.com", password="pass", first_name="Mem", region="india")
+        self.spice = Restaurant.objects.create(name="Spice", cuisine_type="Indian", region="india", rating="4.5")
+        self.diner = Restaurant.objects.create(name="Diner", cuisine_type="American", region="america", rating="4.0")
+        self.yesterday = timezone.now() - timedelta(days=1)
+        self.create_order(self.spice, "delivered", "10.00", self.yesterday)
+        self.create_order(self.spice, "delivered", "5.50", self.yesterday)
+        self.cancelled = self.create_order(self.spice, "cancelled", "7.00", self.yesterday)
+        self.create_order(self.spice, "pending", "3.00", timezone.now())
+        self.create_order(self.diner, "delivered", "99.00", self.yesterday)
+        self.client.force_authenticate(user=self.manager)
+        self.url = reverse("order-analytics")
+
+    def create_order(self, restaurant, status, amount, created_at):
+        order = Order.objects.create(
+            customer=self.member, restaurant=restaurant, status=status, payment_method="cash", total_amount=Decimal(amount)
+        )
+        Order.objects.filter(pk=order.pk).update(created_at=created_at)
+        order.created_at = created_at
+        return order
+
+    def bucket(self, response, moment):
+        start = analytics.bucket_start(moment, "day")
+        return next(bucket for bucket in response.data["buckets"] if bucket["start"] == start)
+
+    def test_groups_by_day_restaurant_and_status_in_region(self):
+        response = self.client.get(self.url, {"granularity": "day", "start": (self.yesterday - timedelta(days=1)).date().isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["region"], "india")
+        self.assertEqual(len(response.data["buckets"]), 3)
+        closed = self.bucket(response, self.yesterday)
+        self.assertTrue(closed["closed"])
+        self.assertEqual(
+            [(row["status"], row["orders"], row["revenue"]) for row in closed["rows"]],
+            [("cancelled", 1, Decimal("7.00")), ("delivered", 2, Decimal("15.50"))],
+        )
+        today = self.bucket(response, timezone.now())
+        self.assertFalse(today["closed"])
+        self.assertEqual(today["rows"][0]["status"], "pending")
+
+    def test_closed_buckets_come_from_cache(self):
+        self.client.get(self.url, {"granularity": "hour"})
+        with self.assertNumQueries(2):  # Current and archived orders, for the open bucket only
+            self.client.get(self.url, {"granularity": "hour"})
+
+    def test_order_save_drops_its_cached_buckets(self):
+        self.client.get(self.url)
+        self.cancelled.status = "delivered"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cancelled.save()
+            # Kept until the commit, so a read in between can't cache the old rows again
+            rows = self.bucket(self.client.get(self.url), self.yesterday)["rows"]
+            self.assertEqual([row["status"] for row in rows], ["cancelled", "delivered"])
+        rows = self.bucket(self.client.get(self.url), self.yesterday)["rows"]
+        self.assertEqual([(row["status"], row["orders"]) for row in rows], [("delivered", 3)])
+
+    def test_rejects_bad_parameters_and_members(self):
+        self.assertEqual(self.client.get(self.url, {"granularity": "minute"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {"start": "yesterday"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {"granularity": "hour", "start": "2000-01-01"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(user=self.member)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_buckets_align_to_local_days_and_weeks(self):
+        moment = timezone.make_aware(datetime(2026, 3, 4, 15, 30))  # a Wednesday
+        self.assertEqual(analytics.bucket_start(moment, "week"), timezone.make_aware(datetime(2026, 3, 2)))
+        self.assertEqual(analytics.next_bucket(analytics.bucket_start(moment, "day"), "day"), timezone.make_aware(datetime(2026, 3, 5)))
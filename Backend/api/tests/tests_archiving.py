@@ -0,0 +1,89 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.archiving import OrderHistory
+from api.models import ArchivedOrder, ArchivedOrderItem, Category, MenuItem, Order, OrderItem, Restaurant, User
+
+
+class OrderArchivingTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(email="admin@example.com", password="pass", first_name="Ad", region="global", role="admin")
+        self.member = User.objects.create_user(email="member@example.com", password="pass", first_name="Mem", region="india")
+        self.restaurant = Restaurant.objects.create(name="Spice", cuisine_type="Indian", region="india", rating="4.5")
+        self.item = MenuItem.objects.create(
+            restaurant=self.restaurant, name="Korma", price=Decimal("9.50"), category=Category.objects.create(name="Mains")
+        )
+        self.old = self.create_order("delivered", days_ago=200)
+        self.old_cancelled = self.create_order("cancelled", days_ago=150)
+        self.old_pending = self.create_order("pending", days_ago=200)
+        self.recent = self.create_order("delivered", days_ago=1)
+
+    def create_order(self, status, days_ago):
+        order = Order.objects.create(
+            customer=self.member, restaurant=self.restaurant, status=status, payment_method="cash", total_amount=Decimal("19.00")
+        )
+        OrderItem.objects.create(order=order, menu_item=self.item, quantity=2, price=Decimal("9.50"))
+        Order.objects.filter(pk=order.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+        return order
+
+    def archive(self):
+        call_command("archive_orders", "--older-than-days=90", "--batch-size=1", stdout=StringIO())
+
+    def test_moves_only_old_finished_orders(self):
+        self.archive()
+        self.assertEqual(set(ArchivedOrder.objects.values_list("id", flat=True)), {self.old.id, self.old_cancelled.id})
+        self.assertEqual(set(Order.objects.values_list("id", flat=True)), {self.old_pending.id, self.recent.id})
+        self.assertEqual(ArchivedOrderItem.objects.filter(order_id=self.old.id).get().subtotal, Decimal("19.00"))
+        self.assertFalse(OrderItem.objects.filter(order_id__in=[self.old.id, self.old_cancelled.id]).exists())
+
+    def test_dry_run_moves_nothing(self):
+        out = StringIO()
+        call_command("archive_orders", "--dry-run", stdout=out)
+        self.assertIn("2 orders would be archived", out.getvalue())
+        self.assertFalse(ArchivedOrder.objects.exists())
+
+    def test_history_merges_newest_first(self):
+        self.archive()
+        history = OrderHistory().filter(customer=self.member)
+        self.assertEqual(history.count(), 4)
+        self.assertEqual([order.id for order in history][:2], [self.recent.id, self.old_cancelled.id])
+        self.assertIsInstance(history.get(pk=self.old.id), ArchivedOrder)
+        with self.assertRaises(Order.DoesNotExist):
+            history.get(pk=0)
+
+    def test_member_still_sees_archived_orders(self):
+        self.archive()
+        self.client.force_authenticate(user=self.member)
+        response = self.client.get(reverse("order-list"), {"expand": "items.menu_item"})
+        self.assertEqual(len(response.data), 4)
+        archived = next(order for order in response.data if order["id"] == self.old.id)
+        self.assertTrue(archived["archived"])
+        self.assertEqual(archived["items"][0]["menu_item"]["name"], "Korma")
+        response = self.client.get(reverse("order-detail", args=[self.old.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_amount"], "19.00")
+
+    def test_staff_history_and_dashboard_include_archive(self):
+        self.archive()
+        self.client.force_authenticate(user=self.admin)
+        self.assertEqual(len(self.client.get(reverse("order-list")).data), 2)
+        response = self.client.get(reverse("order-history"), {"customer": self.member.id})
+        self.assertEqual(len(response.data), 4)
+        dashboard = self.client.get(reverse("admin-dashboard")).data
+        self.assertEqual(dashboard["total_orders"], 4)
+        self.assertEqual(dashboard["total_revenue"], Decimal("38.00"))
+
+    def test_archived_orders_are_read_only(self):
+        self.archive()
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.patch(reverse("order-detail", args=[self.old.id]), {"special_instructions": "x"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
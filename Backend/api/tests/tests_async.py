@@ -0,0 +1,74 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.models import Category, MenuItem, Order, Restaurant, User
+
+
+class AsyncViewsTest(TestCase):
+    """The async views through Django's ASGI handler and the async middleware chain."""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(email="admin@example.com", password="pass", first_name="Ad", region="global", role="admin")
+        self.member = User.objects.create_user(email="member@example.com", password="pass", first_name="Mem", region="india")
+        self.other_member = User.objects.create_user(email="other@example.com", password="pass", first_name="Oth", region="india")
+        self.restaurant = Restaurant.objects.create(name="Spice", cuisine_type="Indian", region="india", rating="4.5")
+        category = Category.objects.create(name="Mains")
+        for name in ("Biryani", "Korma"):
+            MenuItem.objects.create(restaurant=self.restaurant, name=name, price=Decimal("9.50"), category=category)
+        self.order, self.archived = [
+            Order.objects.create(customer=self.member, restaurant=self.restaurant, status="delivered",
+                                 payment_method="cash", total_amount=Decimal("19.00"))
+            for _ in range(2)
+        ]
+        Order.objects.filter(pk=self.archived.pk).update(created_at=timezone.now() - timedelta(days=200))
+        call_command("archive_orders", "--older-than-days=90", stdout=StringIO())
+
+    def headers(self, user):
+        return {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+
+    async def test_lists_and_conditional_get(self):
+        response = await self.async_client.get(reverse("menuitem-list"), headers=self.headers(self.member))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(item["name"] for item in response.json()), ["Biryani", "Korma"])
+        self.assertIn("db;dur=", response["Server-Timing"])
+
+        headers = {**self.headers(self.member), "If-None-Match": response["ETag"]}
+        response = await self.async_client.get(reverse("menuitem-list"), headers=headers)
+        self.assertEqual(response.status_code, 304)
+
+        response = await self.async_client.get(reverse("restaurant-list"), headers=self.headers(self.member))
+        self.assertEqual([restaurant["name"] for restaurant in response.json()], ["Spice"])
+
+    async def test_order_detail_includes_archived_orders(self):
+        for order, archived in ((self.order, False), (self.archived, True)):
+            response = await self.async_client.get(reverse("order-detail", args=[order.id]), headers=self.headers(self.member))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["archived"], archived)
+        response = await self.async_client.get(reverse("order-detail", args=[self.archived.id]), headers=self.headers(self.admin))
+        self.assertEqual(response.status_code, 200)
+
+        response = await self.async_client.get(reverse("order-detail", args=[self.order.id]), headers=self.headers(self.other_member))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_dashboards(self):
+        response = await self.async_client.get(reverse("admin-dashboard"), headers=self.headers(self.admin))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data["total_users"], data["total_restaurants"], data["total_orders"]), (3, 1, 2))
+        self.assertEqual(Decimal(data["total_revenue"]), 38)
+        self.assertEqual([order["id"] for order in data["recent_orders"]], [self.order.id])
+
+        response = await self.async_client.get(reverse("member-dashboard"), headers=self.headers(self.member))
+        self.assertEqual(response.json()["top_restaurants"], [{"id": self.restaurant.id, "name": "Spice", "order_count": 1}])
+
+        response = await self.async_client.get(reverse("manager-dashboard"), headers=self.headers(self.member))
+        self.assertEqual(response.status_code, 403)
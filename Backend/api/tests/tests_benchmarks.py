@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from api import benchmarks
+
+
+class BenchmarkSuiteTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_run_suite_reports_every_metric(self):
+        report = benchmarks.run_suite(iterations=2, warmup=0, memory_iterations=1,
+                                      names=["menu_list", "cart_add", "checkout", "member_dashboard"])
+        self.assertEqual(report["meta"]["scale"], 1)
+        self.assertEqual(set(report["flows"]), {"menu_list", "cart_add", "checkout", "member_dashboard"})
+        for result in report["flows"].values():
+            for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "queries", "response_bytes", "peak_memory_kb"):
+                self.assertIn(key, result)
+            self.assertGreater(result["queries"], 0)
+
+    def test_middleware_comparison(self):
+        report = benchmarks.run_suite(iterations=2, warmup=1, memory_iterations=1, names=["menu_list"], middleware=True)
+        for variant in ("stock", "lean"):
+            self.assertEqual(set(report["middleware"][variant]), {"menu_list_revalidate", "api_not_found"})
+        self.assertEqual(set(report["middleware"]["saved_p50_ms"]), {"menu_list_revalidate", "api_not_found"})
+
+    def test_unknown_flow(self):
+        with self.assertRaises(ValueError):
+            benchmarks.run_suite(names=["nope"])
+
+    def test_compare_flags_regressions(self):
+        baseline = {"flows": {"menu_list": {"p50_ms": 10.0, "p95_ms": 20.0, "queries": 3}}}
+        same = {"flows": {"menu_list": {"p50_ms": 11.0, "p95_ms": 21.0, "queries": 3}}}
+        slower = {"flows": {"menu_list": {"p50_ms": 15.0, "p95_ms": 21.0, "queries": 4}}}
+        self.assertEqual(benchmarks.compare(same, baseline), [])
+        self.assertEqual(len(benchmarks.compare(slower, baseline)), 2)
+
+
+class ConcurrencyRunTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(JOBS_EAGER=True)
+    def test_sync_workers_and_asgi_serve_every_request(self):
+        ctx = benchmarks.BenchmarkContext(benchmarks.seed())
+        report = benchmarks.run_concurrency(ctx, clients=3, requests=4, workers=2, db_latency_ms=1)
+        self.assertEqual(report["requests"], 12)
+        self.assertEqual(report["wsgi"]["workers"], 2)
+        for server in ("wsgi", "asgi"):
+            self.assertEqual(report[server]["non_200"], 0)
+            self.assertGreater(report[server]["requests_per_s"], 0)
@@ -0,0 +1,66 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import path, resolve, reverse
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api.middleware import query_canceled, statement_timeout_for
+
+
+class SleepView(APIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    statement_timeout_scope = "cart"
+
+    def get(self, request):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_sleep(%s)", [float(request.query_params.get("seconds", 0))])
+            cursor.execute("SHOW statement_timeout")
+            return Response({"statement_timeout": cursor.fetchone()[0]})
+
+
+urlpatterns = [path("sleep/", SleepView.as_view())]
+
+
+class QueryCanceled(Exception):
+    sqlstate = "57014"
+
+
+class StatementTimeoutScopeTest(SimpleTestCase):
+    def test_scopes(self):
+        timeouts = settings.STATEMENT_TIMEOUTS
+        for url, scope in ((reverse("admin-dashboard"), "dashboard"), (reverse("order-analytics"), "analytics"),
+                           (reverse("cart-add-item", args=[1]), "cart"), (reverse("order-list"), "default")):
+            self.assertEqual(statement_timeout_for(resolve(url).func), timeouts[scope], url)
+
+    def test_query_canceled(self):
+        canceled = OperationalError("canceling statement due to statement timeout")
+        canceled.__cause__ = QueryCanceled()
+        self.assertTrue(query_canceled(canceled))
+        self.assertFalse(query_canceled(OperationalError("server closed the connection")))
+
+
+@skipUnless(connection.vendor == "postgresql", "Needs PostgreSQL")
+@override_settings(ROOT_URLCONF=__name__, STATEMENT_TIMEOUTS={**settings.STATEMENT_TIMEOUTS, "cart": 200})
+class PostgresStatementTimeoutTest(TransactionTestCase):
+    def test_connections_are_pooled(self):
+        self.assertIsNotNone(connection.pool)
+
+    def test_timeout_per_scope_and_503(self):
+        response = self.client.get("/sleep/")
+        self.assertEqual(response.json(), {"statement_timeout": "200ms"})
+
+        response = self.client.get("/sleep/", {"seconds": 1})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "5")
+
+        # Reset before the connection went back to the pool
+        for _ in range(settings.DATABASES["default"]["OPTIONS"]["pool"]["min_size"] + 1):
+            with connection.cursor() as cursor:
+                cursor.execute("SHOW statement_timeout")
+                self.assertEqual(cursor.fetchone()[0], "0")
+            connection.close()
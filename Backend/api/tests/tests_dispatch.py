@@ -0,0 +1,101 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+import numpy as np
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import archiving, dispatch
+from api.models import CrewAvailability, DeliveryAssignment, Order, Restaurant, User
+
+
+class DispatchTest(TestCase):
+    def setUp(self):
+        self.crew_group = Group.objects.create(name="Crew")
+        self.customer = User.objects.create_user(email="member@example.com", password="pass", first_name="Mem", region="india")
+        # Two restaurants ~11 km apart along a meridian
+        self.north = Restaurant.objects.create(name="North", cuisine_type="Indian", region="india", rating="4", latitude=28.7, longitude=77.1)
+        self.south = Restaurant.objects.create(name="South", cuisine_type="Indian", region="india", rating="4", latitude=28.6, longitude=77.1)
+
+    def crew(self, name, latitude, longitude, region="india"):
+        user = User.objects.create_user(email=f"{name}@example.com", password="pass", first_name=name, region=region)
+        user.groups.add(self.crew_group)
+        CrewAvailability.objects.create(crew=user, latitude=latitude, longitude=longitude)
+        return user
+
+    def order(self, restaurant, status="ready"):
+        return Order.objects.create(customer=self.customer, restaurant=restaurant, status=status, payment_method="cash", total_amount=Decimal("10"))
+
+    def test_assigns_nearest_crew(self):
+        near_south = self.crew("near-south", 28.6, 77.1)
+        near_north = self.crew("near-north", 28.7, 77.1)
+        north_order, south_order = self.order(self.north), self.order(self.south)
+        self.order(self.north, status="preparing")
+        assignments = dispatch.assign_region("india")
+        self.assertEqual({(a.order_id, a.crew_id) for a in assignments}, {(north_order.id, near_north.id), (south_order.id, near_south.id)})
+        self.assertEqual(DeliveryAssignment.objects.get(order=north_order).travel_minutes, 0)
+        self.assertFalse(CrewAvailability.objects.filter(is_available=True).exists())
+        # Nothing left to assign
+        self.assertEqual(dispatch.assign_region("india"), [])
+
+    def test_older_orders_go_first_when_crew_is_short(self):
+        self.crew("rider", 28.6, 77.1)
+        older = self.order(self.north)
+        newer = self.order(self.south)
+        Order.objects.filter(pk=older.pk).update(updated_at=timezone.now() - timedelta(minutes=45))
+        [assignment] = dispatch.assign_region("india")
+        self.assertEqual(assignment.order_id, older.id)
+        self.assertFalse(DeliveryAssignment.objects.filter(order=newer).exists())
+
+    def test_only_available_crew_of_the_region(self):
+        self.crew("abroad", 28.6, 77.1, region="america")
+        outsider = User.objects.create_user(email="outsider@example.com", password="pass", first_name="Out", region="india")
+        CrewAvailability.objects.create(crew=outsider)
+        self.order(self.north)
+        self.assertEqual(dispatch.assign_region("india"), [])
+
+    def test_delivery_frees_the_crew(self):
+        rider = self.crew("rider", None, None)
+        order = self.order(self.north)
+        dispatch.assign_region("india")
+        order = Order.objects.get(pk=order.pk)
+        order.status = "delivered"
+        order.save()
+        self.assertTrue(CrewAvailability.objects.get(crew=rider).is_available)
+
+    def test_deleting_or_archiving_an_undelivered_order_frees_the_crew(self):
+        rider = self.crew("rider", None, None)
+        order = self.order(self.north)
+        dispatch.assign_region("india")
+        admin = User.objects.create_user(email="admin@example.com", password="pass", first_name="Ad", region="global", role="admin")
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        self.assertEqual(client.delete(reverse("order-detail", args=[order.id])).status_code, 204)
+        self.assertTrue(CrewAvailability.objects.get(crew=rider).is_available)
+
+        order = self.order(self.north)
+        dispatch.assign_region("india")
+        archiving.archive_batch(Order.objects.filter(pk=order.pk), 10)
+        self.assertTrue(CrewAvailability.objects.get(crew=rider).is_available)
+
+    def test_unknown_positions_use_default_travel_time(self):
+        minutes = dispatch.travel_minutes(np.array([[np.nan, np.nan]]), np.array([[28.6, 77.1], [28.7, 77.1]]))
+        self.assertEqual(minutes.tolist(), [[15, 15]])
+
+    def test_hundreds_of_orders_in_one_batch(self):
+        rng = np.random.default_rng(0)
+        pairs = dispatch.match(rng.uniform(28, 29, (300, 2)), rng.uniform(28, 29, (400, 2)), rng.uniform(0, 30, 400))
+        self.assertEqual(len(pairs), 300)
+        self.assertEqual(len({order for _, order, _ in pairs}), 300)
+
+    def test_command(self):
+        self.crew("rider", 28.6, 77.1)
+        self.order(self.south)
+        out = StringIO()
+        call_command("assign_deliveries", "--region", "india", stdout=out)
+        self.assertIn("india: assigned 1 orders", out.getvalue())
@@ -0,0 +1,39 @@
+from django.test import SimpleTestCase
+
+from api import frontend
+from api.middleware import StaticFilesMiddleware
+
+
+class FrontendRoutingTest(SimpleTestCase):
+    def setUp(self):
+        frontend.shell.cache_clear()
+
+    def test_shell_for_client_side_routes(self):
+        for path in ("/", "/orders/42"):
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, 200, path)
+            self.assertContains(response, '<div id="root"></div>')
+            self.assertEqual(response["Cache-Control"], "no-cache")
+
+        response = self.client.get("/orders/42", headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.client.post("/orders/42").status_code, 405)
+
+    def test_unknown_api_paths_get_a_json_404(self):
+        for path in ("/api/v1/no-such-endpoint/", "/api/v2/orders/", "/api/v1/schema/nope"):
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, 404, path)
+            self.assertEqual(response.json(), {"detail": "Not found."})
+
+        # Not swallowed by a catch-all, so a missing slash is still redirected
+        response = self.client.get("/api/v1/dashboard/member")
+        self.assertRedirects(response, "/api/v1/dashboard/member/", 301, fetch_redirect_response=False)
+
+    def test_static_and_media_are_not_the_shell(self):
+        for path in ("/static/missing.js", "/media/missing.png"):
+            self.assertEqual(self.client.get(path).status_code, 404, path)
+
+    def test_vite_assets_are_immutable(self):
+        middleware = StaticFilesMiddleware(lambda request: None)
+        self.assertTrue(middleware.immutable_file_test(None, "/static/dist/assets/index-DRdIM2nM.js"))
+        self.assertFalse(middleware.immutable_file_test(None, "/static/dist/vite.svg"))
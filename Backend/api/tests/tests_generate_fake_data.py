@@ -0,0 +1,41 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import F, Sum
+from django.test import TestCase
+
+from api.models import Cart, CartItem, MenuItem, Order, OrderItem, Restaurant, User
+
+
+class GenerateFakeDataCommandTest(TestCase):
+    def generate(self, **options):
+        options = {"users": 40, "restaurants": 4, "menu_items_per_restaurant": 5, "carts": 10,
+                   "orders": 120, "batch_size": 25, "workers": 1, **options}
+        call_command("generate_fake_data", "--until=2026-01-15T12:00", stdout=StringIO(), **options)
+
+    def test_creates_requested_volumes(self):
+        self.generate()
+        self.assertEqual(User.objects.count(), 40)
+        self.assertEqual(Restaurant.objects.count(), 4)
+        self.assertEqual(MenuItem.objects.count(), 20)
+        self.assertEqual(Cart.objects.count(), 10)
+        self.assertEqual(Order.objects.count(), 120)
+        self.assertTrue(CartItem.objects.exists())
+
+    def test_orders_are_consistent(self):
+        self.generate()
+        for order in Order.objects.annotate(lines=Sum(F("items__price") * F("items__quantity")))[:20]:
+            self.assertEqual(order.total_amount, order.lines)
+            self.assertEqual(order.customer.region, order.restaurant.region)
+        self.assertFalse(OrderItem.objects.exclude(menu_item__restaurant=F("order__restaurant")).exists())
+        self.assertFalse(Order.objects.filter(created_at__gt="2026-01-15T12:00Z").exists())
+
+    def test_same_seed_same_data(self):
+        def snapshot():
+            return list(Order.objects.order_by("id").values_list("status", "total_amount", "created_at"))
+
+        self.generate(seed=7)
+        first = snapshot()
+        Order.objects.all().delete()
+        self.generate(seed=7)
+        self.assertEqual([row[1:] for row in snapshot()], [row[1:] for row in first])
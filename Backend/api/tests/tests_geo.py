@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api import geo
+from api.models import Restaurant, User
+
+
+class GeohashTest(SimpleTestCase):
+    def test_encode(self):
+        self.assertEqual(geo.encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+
+    def test_cell_range(self):
+        self.assertEqual(geo.cell_range("ttnf"), ("ttnf", "ttng"))
+        self.assertEqual(geo.cell_range("tz"), ("tz", "u"))
+        self.assertEqual(geo.cell_range("zz"), ("zz", None))
+
+    def test_covering_cells_contain_the_circle(self):
+        cells = geo.covering_cells(28.6139, 77.2090, 3)
+        self.assertEqual(len(cells), 9)
+        self.assertEqual({len(cell) for cell in cells}, {geo.search_precision(28.6139, 3)})
+        # Points 3 km away in every direction fall in one of the cells
+        for latitude, longitude in [(28.6409, 77.2090), (28.5869, 77.2090), (28.6139, 77.2397), (28.6139, 77.1783)]:
+            self.assertTrue(geo.encode(latitude, longitude).startswith(tuple(cells)))
+
+
+class NearbyRestaurantsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.member = User.objects.create_user(email="member@example.com", password="pass", first_name="Mem", region="india")
+        self.client.force_authenticate(user=self.member)
+        self.url = reverse("restaurant-nearby")
+
+    def restaurant(self, name, latitude, longitude, region="india", **kwargs):
+        return Restaurant.objects.create(
+            name=name, cuisine_type="Indian", region=region, rating="4", latitude=latitude, longitude=longitude, **kwargs
+        )
+
+    def test_nearest_first_within_radius(self):
+        far = self.restaurant("Far", 28.70, 77.21)  # ~10 km north
+        near = self.restaurant("Near", 28.62, 77.21)
+        nearer = self.restaurant("Nearer", 28.614, 77.209)
+        self.restaurant("Closed", 28.614, 77.209, is_active=False)
+        self.restaurant("Abroad", 28.614, 77.209, region="america")
+        self.restaurant("Unplaced", None, None)
+
+        response = self.client.get(self.url, {"lat": 28.6139, "lon": 77.2090, "radius": 5})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["id"] for r in response.data], [nearer.id, near.id])
+        self.assertLess(response.data[0]["distance_km"], 0.1)
+
+        response = self.client.get(self.url, {"lat": 28.6139, "lon": 77.2090, "radius": 20, "limit": 3})
+        self.assertEqual([r["id"] for r in response.data], [nearer.id, near.id, far.id])
+
+    def test_geohash_follows_position(self):
+        restaurant = self.restaurant("Moving", 28.6139, 77.2090)
+        self.assertEqual(restaurant.geohash, geo.encode(28.6139, 77.2090))
+        restaurant.latitude, restaurant.longitude = 19.076, 72.8777
+        restaurant.save(update_fields=["latitude", "longitude"])
+        self.assertEqual(Restaurant.objects.get(pk=restaurant.pk).geohash, geo.encode(19.076, 72.8777))
+
+    def test_invalid_parameters(self):
+        for params in ({"lat": 28.6}, {"lat": "north", "lon": 77.2}, {"lat": 95, "lon": 77.2},
+                       {"lat": 28.6, "lon": 77.2, "radius": 500}, {"lat": 28.6, "lon": 77.2, "limit": 0}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
@@ -0,0 +1,72 @@
+import json
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api import inventory
+from api.models import Cart, CartItem, Category, MenuItem, Order, Restaurant, User
+
+
+@override_settings(JOBS_EAGER=True)
+class InventoryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_user(email="admin@example.com", password="pass", first_name="Ad", region="global", role="admin")
+        self.manager = User.objects.create_user(email="manager@example.com", password="pass", first_name="Man", region="india", role="manager")
+        self.client.force_authenticate(user=self.manager)
+        category = Category.objects.create(name="Mains")
+        self.restaurant = Restaurant.objects.create(name="Spice", cuisine_type="Indian", region="india", rating="4.5")
+        self.korma = MenuItem.objects.create(restaurant=self.restaurant, name="Korma", price=Decimal("9.50"), category=category, stock=3)
+        self.naan = MenuItem.objects.create(restaurant=self.restaurant, name="Naan", price=Decimal("2.00"), category=category)
+        self.cart = Cart.objects.create(customer=self.manager)
+        self.checkout_url = reverse("cart-checkout", args=[self.cart.id])
+
+    def fill_cart(self, korma, naan=1):
+        CartItem.objects.create(cart=self.cart, menu_item=self.korma, quantity=korma)
+        CartItem.objects.create(cart=self.cart, menu_item=self.naan, quantity=naan)
+
+    def test_checkout_takes_stock(self):
+        self.fill_cart(2, naan=50)
+        response = self.client.post(self.checkout_url, {"payment_method": "cash"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.korma.refresh_from_db()
+        self.assertEqual(self.korma.stock, 1)
+        self.assertTrue(self.korma.is_available)
+        self.assertIsNone(MenuItem.objects.get(pk=self.naan.pk).stock)
+
+    def test_short_stock_rolls_checkout_back(self):
+        self.fill_cart(4)
+        response = self.client.post(self.checkout_url, {"payment_method": "cash"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["menu_item"], self.korma.id)
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(self.cart.items.count(), 2)
+        self.assertEqual(MenuItem.objects.get(pk=self.korma.pk).stock, 3)
+
+    def test_selling_out_hides_the_item(self):
+        self.fill_cart(3)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.checkout_url, {"payment_method": "cash"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.korma.refresh_from_db()
+        self.assertEqual((self.korma.stock, self.korma.is_available), (0, False))
+        menu = json.loads(self.restaurant.menu_document.body)
+        self.assertEqual([item["name"] for category in menu["categories"] for item in category["items"]], ["Naan"])
+
+    def test_shortfall_sells_down_to_zero(self):
+        inventory.reserve([(self.korma, 5)], allow_shortfall=True)
+        self.korma.refresh_from_db()
+        self.assertEqual((self.korma.stock, self.korma.is_available), (0, False))
+
+    def test_restock_makes_item_available_again(self):
+        MenuItem.objects.filter(pk=self.korma.pk).update(stock=0, is_available=False)
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.patch(reverse("menuitem-detail", args=[self.korma.id]), {"stock": 10}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.korma.refresh_from_db()
+        self.assertEqual((self.korma.stock, self.korma.is_available), (10, True))
@@ -0,0 +1,81 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api import kitchen
+from api.models import Cart, CartItem, Category, KitchenTicket, MenuItem, Order, Restaurant, User
+
+
+class KitchenQueueTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.manager = User.objects.create_user(email="manager@example.com", password="pass", first_name="Man", region="india", role="manager")
+        self.client.force_authenticate(user=self.manager)
+        self.restaurant = Restaurant.objects.create(name="Spice", cuisine_type="Indian", region="india", rating="4.5")
+        self.diner = Restaurant.objects.create(name="Diner", cuisine_type="American", region="america", rating="4.0")
+        mains = Category.objects.create(name="Mains", station="grill")
+        drinks = Category.objects.create(name="Drinks", station="bar")
+        self.tikka = MenuItem.objects.create(restaurant=self.restaurant, name="Tikka", price=Decimal("9.00"), category=mains)
+        self.lassi = MenuItem.objects.create(restaurant=self.restaurant, name="Lassi", price=Decimal("2.00"), category=drinks)
+        self.cart = Cart.objects.create(customer=self.manager)
+
+    def checkout(self, *items):
+        for menu_item in items:
+            CartItem.objects.create(cart=self.cart, menu_item=menu_item, quantity=1)
+        response = self.client.post(reverse("cart-checkout", args=[self.cart.id]), {"payment_method": "cash"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Order.objects.get(pk=response.data["id"])
+
+    def test_checkout_splits_order_by_station(self):
+        order = self.checkout(self.tikka, self.lassi)
+        tickets = {ticket.station: ticket for ticket in order.tickets.all()}
+        self.assertEqual(set(tickets), {"bar", "grill"})
+        self.assertEqual([line["name"] for line in tickets["grill"].lines], ["Tikka"])
+        self.assertEqual(tickets["bar"].promised_at, order.created_at + timedelta(minutes=30))
+
+    def test_queue_is_ordered_by_promised_time(self):
+        late = self.checkout(self.tikka)
+        early = self.checkout(self.tikka)
+        KitchenTicket.objects.filter(order=early).update(promised_at=late.tickets.get().promised_at - timedelta(minutes=5))
+        with self.assertNumQueries(2):  # The restaurant, then one range of the queue index
+            response = self.client.get(reverse("kitchenticket-list"), {"restaurant": self.restaurant.id, "station": "grill", "limit": 5})
+        self.assertEqual([ticket["order"] for ticket in response.data], [early.id, late.id])
+
+    def test_tickets_advance_the_order(self):
+        order = self.checkout(self.tikka, self.lassi)
+        response = self.client.post(reverse("kitchenticket-next"), {"restaurant": self.restaurant.id, "station": "grill", "limit": 5}, format="json")
+        self.assertEqual([ticket["status"] for ticket in response.data], ["acknowledged"])
+        order.refresh_from_db()
+        self.assertEqual(order.status, "preparing")
+        # Taken tickets leave the queue
+        response = self.client.post(reverse("kitchenticket-next"), {"restaurant": self.restaurant.id, "station": "grill"}, format="json")
+        self.assertEqual(response.data, [])
+
+        ids = list(order.tickets.values_list("id", flat=True))
+        response = self.client.post(reverse("kitchenticket-ready"), {"restaurant": self.restaurant.id, "ids": ids[:1]}, format="json")
+        order.refresh_from_db()
+        self.assertEqual(order.status, "preparing")
+        response = self.client.post(reverse("kitchenticket-ready"), {"restaurant": self.restaurant.id, "ids": ids}, format="json")
+        self.assertEqual(response.data, {"ready": ids[1:]})
+        order.refresh_from_db()
+        self.assertEqual(order.status, "ready")
+
+    def test_cancelling_an_order_cancels_its_tickets(self):
+        order = self.checkout(self.tikka, self.lassi)
+        self.client.post(reverse("order-cancel", args=[order.id]))
+        self.assertEqual(set(order.tickets.values_list("status", flat=True)), {"cancelled"})
+        self.assertFalse(kitchen.queue(self.restaurant.id, "grill").exists())
+
+    def test_managers_only_see_their_region(self):
+        response = self.client.get(reverse("kitchenticket-list"), {"restaurant": self.diner.id, "station": "grill"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        member = User.objects.create_user(email="member@example.com", password="pass", first_name="Mem", region="india")
+        self.client.force_authenticate(user=member)
+        response = self.client.get(reverse("kitchenticket-list"), {"restaurant": self.restaurant.id, "station": "grill"})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,77 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api import leaderboards
+from api.models import Category, DailyRestaurantOrderCount, MenuItem, Order, OrderItem, Restaurant, RestaurantOrderCount, User
+
+
+class LeaderboardTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(email="admin@example.com", password="pass", first_name="Ad", region="global", role="admin")
+        self.member = User.objects.create_user(email="member@example.com", password="pass", first_name="Mem", region="india")
+        mains = Category.objects.create(name="Mains")
+        self.spice = Restaurant.objects.create(name="Spice", cuisine_type="Indian", region="india", rating="4.5")
+        self.tandoor = Restaurant.objects.create(name="Tandoor", cuisine_type="Indian", region="india", rating="4.1")
+        self.diner = Restaurant.objects.create(name="Diner", cuisine_type="American", region="america", rating="4.0")
+        self.korma = MenuItem.objects.create(restaurant=self.spice, name="Korma", price=Decimal("9.50"), category=mains)
+        self.naan = MenuItem.objects.create(restaurant=self.tandoor, name="Naan", price=Decimal("2.00"), category=mains)
+        self.burger = MenuItem.objects.create(restaurant=self.diner, name="Burger", price=Decimal("8.00"), category=mains)
+        self.order(self.korma, 1)
+        self.order(self.korma, 2)
+        self.naan_order = self.order(self.naan, 5)
+        self.order(self.burger, 1)
+
+    def order(self, menu_item, quantity, status="pending"):
+        order = Order.objects.create(
+            customer=self.member, restaurant=menu_item.restaurant, status=status, payment_method="cash",
+            total_amount=menu_item.price * quantity,
+        )
+        OrderItem.objects.create(order=order, menu_item=menu_item, quantity=quantity, price=menu_item.price)
+        return order
+
+    def test_counts_follow_creation_and_cancellation(self):
+        self.assertEqual([r["name"] for r in leaderboards.top_restaurants("india")], ["Spice", "Tandoor"])
+        self.assertEqual([(i["name"], i["quantity"]) for i in leaderboards.top_menu_items("india")], [("Naan", 5), ("Korma", 3)])
+
+        order = Order.objects.get(pk=self.naan_order.pk)
+        order.status = "cancelled"
+        order.save()
+        self.assertEqual(leaderboards.top_restaurants("india"), [{"id": self.spice.id, "name": "Spice", "order_count": 2}])
+        self.assertEqual([i["name"] for i in leaderboards.top_menu_items("india")], ["Korma"])
+        self.order(self.naan, 1, status="cancelled")
+        self.assertEqual(RestaurantOrderCount.objects.get(restaurant=self.tandoor).order_count, 0)
+
+    def test_windows_sum_daily_counters(self):
+        DailyRestaurantOrderCount.objects.filter(restaurant=self.spice).update(day=timezone.localdate() - timedelta(days=10))
+        self.assertEqual([r["name"] for r in leaderboards.top_restaurants("india", "7d")], ["Tandoor"])
+        self.assertEqual([r["order_count"] for r in leaderboards.top_restaurants("india", "30d")], [2, 1])
+
+    def test_top_n_is_one_query(self):
+        with self.assertNumQueries(1):
+            leaderboards.top_menu_items("india", "30d")
+
+    def test_rebuild_matches_incremental_counts(self):
+        expected = (leaderboards.top_restaurants(limit=10), leaderboards.top_menu_items(limit=10, window="7d"))
+        RestaurantOrderCount.objects.update(order_count=0)
+        call_command("rebuild_leaderboards", stdout=StringIO())
+        self.assertEqual((leaderboards.top_restaurants(limit=10), leaderboards.top_menu_items(limit=10, window="7d")), expected)
+
+    def test_endpoint_and_dashboards(self):
+        self.client.force_authenticate(user=self.member)
+        response = self.client.get(reverse("leaderboards"), {"window": "7d"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["name"] for r in response.data["restaurants"]], ["Spice", "Tandoor"])
+        self.assertEqual(self.client.get(reverse("leaderboards"), {"window": "1y"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(user=self.admin)
+        dashboard = self.client.get(reverse("admin-dashboard")).data
+        self.assertEqual(dashboard["top_menu_items"][0]["name"], "Naan")
+        self.assertEqual(len(dashboard["top_restaurants"]), 3)
@@ -0,0 +1,98 @@
+import gzip
+import json
+import threading
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api import menus
+from api.jobs import JobQueue
+from api.models import Category, MenuDocument, MenuItem, Restaurant, User
+
+
+@override_settings(JOBS_EAGER=True)
+class MenuDocumentTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.member = User.objects.create_user(email="member@example.com", password="pass", first_name="Mem", region="india")
+        self.client.force_authenticate(user=self.member)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.restaurant = Restaurant.objects.create(name="Spice", cuisine_type="Indian", region="india", rating="4.5")
+            self.drinks = Category.objects.create(name="Drinks")
+            self.mains = Category.objects.create(name="Mains")
+            self.lassi = MenuItem.objects.create(restaurant=self.restaurant, name="Lassi", price=Decimal("1.99"), category=self.drinks)
+            MenuItem.objects.create(restaurant=self.restaurant, name="Korma", price=Decimal("9.50"), category=self.mains)
+        self.url = reverse("restaurant-menu", args=[self.restaurant.id])
+
+    def test_menu_grouped_by_category(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        menu = json.loads(response.content)
+        self.assertEqual(menu["restaurant"]["name"], "Spice")
+        self.assertEqual([c["name"] for c in menu["categories"]], ["Drinks", "Mains"])
+        self.assertEqual(menu["categories"][0]["items"][0]["price"], "1.99")
+        # Stock would go stale between rebuilds; availability is kept
+        self.assertNotIn("stock", menu["categories"][0]["items"][0])
+        self.assertTrue(menu["categories"][0]["items"][0]["is_available"])
+
+    def test_served_without_orm_work(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(response.content))["restaurant"]["id"], self.restaurant.id)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_rebuilt_when_items_or_categories_change(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lassi.price = Decimal("2.49")
+            self.lassi.save()
+        menu = json.loads(self.client.get(self.url).content)
+        self.assertEqual(menu["categories"][0]["items"][0]["price"], "2.49")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.drinks.name = "Beverages"
+            self.drinks.save()
+        menu = json.loads(self.client.get(self.url).content)
+        self.assertEqual(menu["categories"][0]["name"], "Beverages")
+
+    def test_inactive_and_other_region_restaurants_are_hidden(self):
+        other = Restaurant.objects.create(name="Diner", cuisine_type="American", region="america", rating="4.0")
+        response = self.client.get(reverse("restaurant-menu", args=[other.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.restaurant.is_active = False
+            self.restaurant.save()
+        self.assertFalse(MenuDocument.objects.filter(restaurant=self.restaurant).exists())
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_missing_document_is_built_on_demand(self):
+        MenuDocument.objects.all().delete()
+        cache.clear()
+        self.assertIsNotNone(menus.get_menu_document(self.restaurant.id))
+        self.assertTrue(MenuDocument.objects.filter(restaurant=self.restaurant).exists())
+
+
+class JobQueueTest(SimpleTestCase):
+    def test_runs_on_worker_thread_and_coalesces_pending_jobs(self):
+        jobs = JobQueue("test")
+        release = threading.Event()
+        calls = []
+
+        def job(value):
+            release.wait(5)
+            calls.append((value, threading.current_thread().name))
+
+        jobs.enqueue(job, 1)  # blocks the worker until released
+        jobs.enqueue(job, 2)
+        jobs.enqueue(job, 2)
+        release.set()
+        jobs.join()
+        self.assertEqual(calls, [(1, "jobs-test"), (2, "jobs-test")])
@@ -0,0 +1,77 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api import analytics, menus
+from api.models import Cart, CartItem, Category, MenuItem, Restaurant, User
+
+
+class MetricsViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email="admin@example.com", password="pass", first_name="Ad", region="global", role="admin"
+        )
+        self.member = User.objects.create_user(
+            email="member@example.com", password="pass", first_name="Mem", region="india"
+        )
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(user=self.member)
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(METRICS_TOKEN="scrape-secret")
+    def test_scraper_token(self):
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Token wrong")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Token scrape-secret")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_exposes_latency_by_route_and_checkout_outcomes(self):
+        self.client.force_authenticate(user=self.admin)
+        restaurant = Restaurant.objects.create(name="Spice", cuisine_type="Indian", region="india", rating="4.5")
+        category = Category.objects.create(name="Mains")
+        item = MenuItem.objects.create(restaurant=restaurant, name="Korma", price=Decimal("9.50"), category=category)
+        cart = Cart.objects.create(customer=self.admin)
+        CartItem.objects.create(cart=cart, menu_item=item, quantity=2)
+
+        self.client.get(reverse("menuitem-list"))
+        self.client.post(reverse("cart-checkout", args=[cart.id]), {"payment_method": "cash"}, format="json")
+
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn('api_request_latency_seconds_bucket{action="list",le="0.005",method="GET",route="menuitem-list"}', body)
+        self.assertIn('api_db_queries_total{action="list",route="menuitem-list"}', body)
+        self.assertIn('api_checkouts_total{flow="cart",outcome="created"}', body)
+
+
+class CacheLookupMetricsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def lookups(self, name):
+        return [REGISTRY.get_sample_value("api_cache_requests_total", {"cache": name, "result": result}) or 0
+                for result in ("hit", "miss")]
+
+    def test_menu_hit_and_miss(self):
+        restaurant = Restaurant.objects.create(name="Spice", cuisine_type="Indian", region="india", rating="4.5")
+        hits, misses = self.lookups("menu")
+        menus.get_menu_document(restaurant.id)
+        menus.get_menu_document(restaurant.id)
+        self.assertEqual(self.lookups("menu"), [hits + 1, misses + 1])
+
+    def test_analytics_buckets_hit_and_miss(self):
+        end = analytics.bucket_start(timezone.now(), "hour")
+        hits, misses = self.lookups("analytics")
+        analytics.order_buckets(analytics.ALL_REGIONS, "hour", end - timedelta(hours=2), end)
+        analytics.order_buckets(analytics.ALL_REGIONS, "hour", end - timedelta(hours=2), end)
+        self.assertEqual(self.lookups("analytics"), [hits + 2, misses + 2])
@@ -0,0 +1,112 @@
+import gzip
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Category, MenuItem, Restaurant, User
+
+
+class RequestInstrumentationMiddlewareTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="member@example.com", password="pass", first_name="Mem", region="india"
+        )
+        self.client.force_authenticate(user=self.user)
+        restaurant = Restaurant.objects.create(name="Spice", cuisine_type="Indian", region="india", rating="4.5")
+        category = Category.objects.create(name="Mains")
+        for name in ("Biryani", "Korma"):
+            MenuItem.objects.create(restaurant=restaurant, name=name, price=Decimal("9.50"), category=category)
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse("menuitem-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        timing = response["Server-Timing"]
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertRegex(timing, r"serialize;dur=[\d.]+")
+        self.assertRegex(timing, r"total;dur=[\d.]+")
+
+    @override_settings(SLOW_REQUEST_THRESHOLD_MS=0)
+    def test_slow_requests_are_logged_with_view_and_action(self):
+        with self.assertLogs("api.slow_requests", level="WARNING") as logs:
+            self.client.get(reverse("menuitem-list"))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["view"], "MenuItemViewSet")
+        self.assertEqual(record["action"], "list")
+        self.assertEqual(record["status"], 200)
+        self.assertGreater(record["sql_count"], 0)
+        self.assertGreater(record["serializer_ms"], 0)
+        self.assertLessEqual(len(record["top_queries"]), 5)
+        self.assertIn("api_menuitem", record["top_queries"][0]["sql"])
+
+    def test_fast_requests_are_not_logged(self):
+        with self.assertNoLogs("api.slow_requests", level="WARNING"):
+            self.client.get(reverse("menuitem-list"))
+
+
+class CompressionMiddlewareTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email="admin@example.com", password="pass", first_name="Ad", region="global", role="admin"
+        )
+        self.client.force_authenticate(user=self.admin)
+        restaurant = Restaurant.objects.create(name="Spice", cuisine_type="Indian", region="india", rating="4.5")
+        category = Category.objects.create(name="Mains")
+        MenuItem.objects.bulk_create([
+            MenuItem(restaurant=restaurant, name=f"Dish {i}", price=Decimal("9.50"), category=category)
+            for i in range(50)
+        ])
+
+    def test_large_responses_are_gzipped(self):
+        response = self.client.get(reverse("menuitem-list"), HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))), 50)
+
+    def test_uncompressed_without_accept_encoding(self):
+        response = self.client.get(reverse("menuitem-list"))
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(len(response.json()), 50)
+
+    @override_settings(COMPRESSION_MIN_SIZE=10 ** 6)
+    def test_small_responses_are_not_compressed(self):
+        client = APIClient()  # middleware settings are read when the handler loads
+        client.force_authenticate(user=self.admin)
+        response = client.get(reverse("menuitem-list"), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+
+class BrowserOnlyMiddlewareTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email="admin@example.com", password="pass", first_name="Ad", region="global", role="admin", is_staff=True
+        )
+
+    def test_api_requests_skip_sessions_and_csrf(self):
+        client = APIClient(enforce_csrf_checks=True)
+        client.force_login(self.admin)  # a browser that is also logged in to the admin
+        client.force_authenticate(user=self.admin)
+        response = client.get(reverse("menuitem-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(hasattr(response.wsgi_request, "session"))
+        self.assertFalse(hasattr(response.wsgi_request, "_messages"))
+
+        response = client.post(reverse("menuitem-list"), {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)  # validated, not refused by CSRF
+
+    # The manifest only exists after collectstatic
+    @override_settings(STORAGES={**settings.STORAGES, "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"}})
+    def test_admin_keeps_them(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.admin)
+        response = client.get("/admin/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.wsgi_request.user, self.admin)
+        self.assertEqual(client.post("/admin/logout/").status_code, status.HTTP_403_FORBIDDEN)
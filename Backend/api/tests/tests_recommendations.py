@@ -0,0 +1,157 @@
+import threading
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api import recommendations
+from api.models import Cart, CartItem, Category, MenuItem, MenuItemPairCount, MenuItemRecommendation, Order, OrderItem, Restaurant, User
+
+
+@override_settings(JOBS_EAGER=True, RECOMMENDATIONS_PER_ITEM=2)
+class RecommendationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.manager = User.objects.create_user(email="manager@example.com", password="pass", first_name="Man", region="india", role="manager")
+        self.client.force_authenticate(user=self.manager)
+        mains = Category.objects.create(name="Mains")
+        self.restaurant = Restaurant.objects.create(name="Spice", cuisine_type="Indian", region="india", rating="4.5")
+        self.curry, self.naan, self.rice, self.lassi = [
+            MenuItem.objects.create(restaurant=self.restaurant, name=name, price=Decimal("5.00"), category=mains)
+            for name in ("Curry", "Naan", "Rice", "Lassi")
+        ]
+        self.cart = Cart.objects.create(customer=self.manager)
+
+    def order(self, *items, status="delivered"):
+        order = Order.objects.create(customer=self.manager, restaurant=self.restaurant, status=status, payment_method="cash", total_amount=Decimal("10"))
+        for item in items:
+            OrderItem.objects.create(order=order, menu_item=item, quantity=1, price=item.price)
+        return order
+
+    def neighbours(self, item):
+        return list(MenuItemRecommendation.objects.filter(menu_item=item).order_by("-score", "recommended").values_list("recommended__name", "score"))
+
+    def test_rebuild_counts_pairs_and_keeps_top_k(self):
+        self.order(self.curry, self.naan, self.rice)
+        self.order(self.curry, self.naan, self.naan)
+        self.order(self.curry, self.lassi)
+        self.order(self.curry, self.lassi, self.rice, status="cancelled")
+        out = StringIO()
+        call_command("build_recommendations", stdout=out)
+        self.assertEqual(MenuItemPairCount.objects.get(menu_item=self.curry, other=self.naan).orders, 2)
+        # Ties go to the lower id
+        self.assertEqual(self.neighbours(self.curry), [("Naan", 2), ("Rice", 1)])
+        self.assertEqual(self.neighbours(self.naan), [("Curry", 2), ("Rice", 1)])
+
+    def test_new_orders_update_incrementally(self):
+        self.order(self.curry, self.rice)
+        recommendations.rebuild()
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.order(self.curry, self.naan)
+        self.assertEqual(self.neighbours(self.curry), [("Naan", 2), ("Rice", 1)])
+        # Incremental updates agree with a rebuild
+        incremental = sorted(MenuItemPairCount.objects.values_list("menu_item", "other", "orders"))
+        recommendations.rebuild()
+        self.assertEqual(sorted(MenuItemPairCount.objects.values_list("menu_item", "other", "orders")), incremental)
+
+    def test_cart_recommendations_are_one_query(self):
+        self.order(self.curry, self.naan, self.rice)
+        self.order(self.curry, self.naan)
+        self.order(self.rice, self.lassi)
+        self.order(self.rice, self.lassi)
+        recommendations.rebuild()
+        CartItem.objects.create(cart=self.cart, menu_item=self.curry, quantity=1)
+        CartItem.objects.create(cart=self.cart, menu_item=self.rice, quantity=1)
+        url = reverse("cart-recommendations", args=[self.cart.id])
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual([(item["name"], item["score"]) for item in response.data], [("Naan", 2), ("Lassi", 2)])
+
+        MenuItem.objects.filter(pk=self.naan.pk).update(is_available=False)
+        self.assertEqual([item["name"] for item in self.client.get(url).data], ["Lassi"])
+        other = User.objects.create_user(email="other@example.com", password="pass", first_name="Oth", region="india", role="manager")
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(url).data, [])
+        for pk in ("abc", 2**63):
+            self.assertEqual(self.client.get(reverse("cart-recommendations", args=[pk])).status_code, 404, pk)
+
+
+@override_settings(JOBS_EAGER=True, RECOMMENDATIONS_PER_ITEM=2)
+class RecommendationConcurrencyTest(TransactionTestCase):
+    @skipUnlessDBFeature("has_select_for_update")  # SQLite serialises writers; nothing to race
+    def test_parallel_orders_lose_no_pairs(self):
+        manager = User.objects.create_user(email="manager@example.com", password="pass", first_name="Man", region="india", role="manager")
+        restaurant = Restaurant.objects.create(name="Spice", cuisine_type="Indian", region="india", rating="4.5")
+        mains = Category.objects.create(name="Mains")
+        curry, naan, rice = [
+            MenuItem.objects.create(restaurant=restaurant, name=name, price=Decimal("5.00"), category=mains)
+            for name in ("Curry", "Naan", "Rice")
+        ]
+        orders = []
+        for items in [(curry, naan), (curry, rice), (naan, curry, rice)] * 4:
+            order = Order.objects.create(customer=manager, restaurant=restaurant, status="delivered", payment_method="cash", total_amount=Decimal("10"))
+            OrderItem.objects.bulk_create([OrderItem(order=order, menu_item=item, quantity=1, price=item.price) for item in items])
+            orders.append(order.pk)
+        barrier, errors = threading.Barrier(len(orders)), []
+
+        def record(order_id):
+            try:
+                barrier.wait()
+                recommendations.record_order(order_id)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=record, args=[order_id]) for order_id in orders]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(MenuItemPairCount.objects.get(menu_item=curry, other=naan).orders, 8)
+        self.assertEqual(
+            list(MenuItemRecommendation.objects.filter(menu_item=curry).order_by("-score", "recommended").values_list("recommended", "score")),
+            [(naan.pk, 8), (rice.pk, 8)],
+        )
+
+    @skipUnlessDBFeature("has_select_for_update")
+    def test_does_not_wait_for_locked_menu_items(self):
+        manager = User.objects.create_user(email="manager@example.com", password="pass", first_name="Man", region="india", role="manager")
+        restaurant = Restaurant.objects.create(name="Spice", cuisine_type="Indian", region="india", rating="4.5")
+        mains = Category.objects.create(name="Mains")
+        curry, naan = [MenuItem.objects.create(restaurant=restaurant, name=name, price=Decimal("5.00"), category=mains) for name in ("Curry", "Naan")]
+        order = Order.objects.create(customer=manager, restaurant=restaurant, status="delivered", payment_method="cash", total_amount=Decimal("10"))
+        OrderItem.objects.bulk_create([OrderItem(order=order, menu_item=item, quantity=1, price=item.price) for item in (curry, naan)])
+        locked, release = threading.Event(), threading.Event()
+
+        def checkout():
+            # Holds the item rows as checkout's stock update does
+            try:
+                with transaction.atomic():
+                    MenuItem.objects.filter(pk__in=[curry.pk, naan.pk]).update(stock=None)
+                    locked.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=checkout)
+        thread.start()
+        try:
+            locked.wait(10)
+            with connection.cursor() as cursor:
+                cursor.execute("SET lock_timeout = '2s'")
+            recommendations.record_order(order.pk)
+        finally:
+            release.set()
+            thread.join()
+            with connection.cursor() as cursor:
+                cursor.execute("RESET lock_timeout")
+        self.assertEqual(MenuItemPairCount.objects.get(menu_item=curry, other=naan).orders, 1)
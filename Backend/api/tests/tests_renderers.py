@@ -0,0 +1,32 @@
+import datetime
+import json
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    def test_decimals_are_exact(self):
+        rendered = ORJSONRenderer().render({"total": Decimal("10.10"), "count": Decimal("0.1") * 3})
+        self.assertEqual(json.loads(rendered), {"total": "10.10", "count": "0.3"})
+
+    def test_matches_drf_for_api_types(self):
+        data = {
+            "created_at": datetime.datetime(2024, 5, 1, 12, 30, 15, 120000, tzinfo=datetime.timezone.utc),
+            "date": datetime.date(2024, 5, 1),
+            "detail": gettext_lazy("Not found."),
+            "items": [{"id": 1, "name": "Lassi"}],
+            2: None,
+        }
+        self.assertEqual(json.loads(ORJSONRenderer().render(data)), json.loads(JSONRenderer().render(data)))
+
+    def test_indent_from_accept_header(self):
+        rendered = ORJSONRenderer().render({"a": 1}, "application/json; indent=4")
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+
+    def test_none_renders_empty(self):
+        self.assertEqual(ORJSONRenderer().render(None), b"")
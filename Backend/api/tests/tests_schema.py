@@ -0,0 +1,57 @@
+import gzip
+import json
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from api import schema
+
+
+class PrebuiltSchemaTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        settings = override_settings(SCHEMA_ARTIFACT_DIR=self.directory.name, SCHEMA_LIVE=False)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        schema.documents.cache_clear()
+        self.addCleanup(schema.documents.cache_clear)
+        self.url = reverse("schema")
+
+    def test_route_is_not_shadowed_by_the_frontend(self):
+        response = self.client.get(self.url, {"format": "json"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/vnd.oai.openapi+json")
+        self.assertIn("/api/v1/orders/", json.loads(response.content)["paths"])
+
+    def test_serves_the_built_artifact_with_etag_and_gzip(self):
+        call_command("build_schema", stdout=StringIO())
+        with mock.patch.object(schema, "generate") as generate:
+            response = self.client.get(self.url)
+            gzipped = self.client.get(self.url, headers={"Accept-Encoding": "gzip"})
+            generate.assert_not_called()
+        self.assertEqual(response["Content-Type"], "application/vnd.oai.openapi")
+        self.assertTrue(response.content.startswith(b"openapi: "))
+        self.assertEqual(gzipped["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(gzipped.content), response.content)
+        self.assertEqual(gzipped["ETag"], response["ETag"])
+
+        response = self.client.get(self.url, headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+    def test_generated_once_without_artifact(self):
+        with mock.patch.object(schema, "generate", wraps=schema.generate) as generate:
+            for _ in range(2):
+                self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(generate.call_count, 1)
+
+    def test_live_schema(self):
+        with override_settings(SCHEMA_LIVE=True), mock.patch.object(schema, "documents") as documents:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+        documents.assert_not_called()
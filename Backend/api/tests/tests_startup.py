@@ -0,0 +1,35 @@
+from django.test import SimpleTestCase
+
+from api import startup
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        420 | io
+import time:        50 |         50 |     rest_framework.compat
+import time:       200 |        250 |   rest_framework.settings
+import time:       400 |        650 | rest_framework
+"""
+
+
+class StartupProfileTest(SimpleTestCase):
+    def test_parse_importtime(self):
+        rows = startup.parse_importtime(IMPORTTIME)
+        self.assertEqual([row["module"] for row in rows], ["_io", "io", "rest_framework.compat", "rest_framework.settings", "rest_framework"])
+        self.assertEqual([row["depth"] for row in rows], [1, 0, 2, 1, 0])
+        self.assertEqual((rows[1]["self_us"], rows[1]["cumulative_us"]), (300, 420))
+
+    def test_package_totals(self):
+        totals = startup.package_totals(startup.parse_importtime(IMPORTTIME))
+        self.assertEqual(list(totals.items()), [("rest_framework", 650), ("io", 300), ("_io", 120)])
+
+    def test_warmup_runs_every_step(self):
+        timings = startup.warmup()
+        self.assertEqual(list(timings), [name for name, _ in startup.WARMUP_STEPS])
+        self.assertTrue(all(ms >= 0 for ms in timings.values()))
+
+
+class LazySchemaViewTest(SimpleTestCase):
+    def test_schema_view_loads_on_first_request(self):
+        response = self.client.get("/api/v1/schema/swagger-ui/")
+        self.assertEqual(response.status_code, 200)
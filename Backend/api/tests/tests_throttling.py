@@ -0,0 +1,99 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient, APIRequestFactory
+
+from api.models import User
+from api.throttling import IPTokenBucketThrottle
+
+
+RATES = {
+    "auth": "2/min",
+    "password_reset": "2/min",
+    "cart": "100/min",
+    "checkout": "1/min",
+}
+
+
+@override_settings(REST_FRAMEWORK={**api_settings.user_settings, "DEFAULT_THROTTLE_RATES": RATES})
+class TokenBucketThrottleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        api_settings.reload()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="member@example.com", password="pass", first_name="Mem", region="india"
+        )
+
+    def tearDown(self):
+        api_settings.reload()
+
+    def test_password_reset_limited_per_ip(self):
+        url = reverse("password-reset")
+        for _ in range(2):
+            response = self.client.post(url, {"email": "nobody@example.com"}, REMOTE_ADDR="10.0.0.1")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(url, {"email": "nobody@example.com"}, REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+
+        # Another client still has a full bucket
+        response = self.client.post(url, {"email": "nobody@example.com"}, REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_djoser_password_reset_is_throttled(self):
+        url = reverse("user-reset-password")
+        self.assertEqual(url, "/api/v1/auth/users/reset_password/")
+        for _ in range(2):
+            self.assertEqual(self.client.post(url, {"email": "nobody@example.com"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post(url, {"email": "nobody@example.com"}).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_client_ip_is_not_taken_from_a_spoofed_forwarded_for(self):
+        url = reverse("password-reset")
+        # The load balancer appends the address it saw; what the client sent before it doesn't count
+        for spoofed in ("1.1.1.1", "2.2.2.2", "3.3.3.3"):
+            response = self.client.post(url, {"email": "nobody@example.com"}, HTTP_X_FORWARDED_FOR=f"{spoofed}, 10.0.0.4")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_jwt_create_is_throttled(self):
+        url = reverse("jwt-create")
+        credentials = {"email": "member@example.com", "password": "wrong"}
+        for _ in range(2):
+            self.assertEqual(self.client.post(url, credentials).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.client.post(url, credentials).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_bucket_refills_over_time(self):
+        throttle = IPTokenBucketThrottle()
+        view = mock.Mock(throttle_scope="auth")
+        request = APIRequestFactory().get("/", REMOTE_ADDR="10.0.0.3")
+
+        with mock.patch("api.throttling.time.time", return_value=1000.0):
+            self.assertTrue(throttle.allow_request(request, view))
+            self.assertTrue(throttle.allow_request(request, view))
+            self.assertFalse(throttle.allow_request(request, view))
+            self.assertAlmostEqual(throttle.wait(), 30.0)
+
+        # 2 tokens per minute: one token is back after 30 seconds
+        with mock.patch("api.throttling.time.time", return_value=1030.0):
+            self.assertTrue(throttle.allow_request(request, view))
+            self.assertFalse(throttle.allow_request(request, view))
+
+    @override_settings(REST_FRAMEWORK={**api_settings.user_settings, "DEFAULT_THROTTLE_RATES": {**RATES, "auth": "0/min"}})
+    def test_zero_rate_rejects_every_request(self):
+        api_settings.reload()
+        response = self.client.post(reverse("jwt-create"), {"email": "member@example.com", "password": "pass"})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertNotIn("Retry-After", response)
+
+    def test_views_without_scope_are_not_throttled(self):
+        throttle = IPTokenBucketThrottle()
+        view = mock.Mock(spec=[])
+        request = APIRequestFactory().get("/", REMOTE_ADDR="10.0.0.4")
+        for _ in range(10):
+            self.assertTrue(throttle.allow_request(request, view))
@@ -1,380 +1,439 @@
-from django.test import TestCase
+from django.core.cache import cache
+import threading
+
+from django.db import IntegrityError, connection
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
-from api.models import Category, MenuItem, Cart, CartItem, Order, OrderItem, Table, TableBooking
-from django.contrib.auth.models import User, Group
+from api.models import User, Restaurant, Category, MenuItem, Cart, CartItem, Order, OrderItem
 from decimal import Decimal
-from PIL import Image
-from io import BytesIO
-from django.core.files.uploadedfile import SimpleUploadedFile
-from datetime import date, time
-import json
-
-
-class CategoryViewSetTest(TestCase):
-    def setUp(self):
-        self.client = APIClient()
-        self.manager_group = Group.objects.create(name="Managers")
-        self.user = User.objects.create_user(username="manager", password="pass")
-        self.user.groups.add(self.manager_group)
-        self.client.login(username="manager", password="pass")
-        self.category_data = {"name": "Drinks"}
-
-    def test_create_category(self):
-        response = self.client.post(reverse("category-list"), self.category_data)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(Category.objects.count(), 1)
-        self.assertEqual(Category.objects.get().name, "Drinks")
-
-    def test_list_categories(self):
-        Category.objects.create(name="Drinks")
-        response = self.client.get(reverse("category-list"))
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
 
 
-class MenuItemViewSetTest(TestCase):
+class APITestCase(TestCase):
     def setUp(self):
+        cache.clear()  # throttle buckets
         self.client = APIClient()
-        self.manager_group = Group.objects.create(name="Managers")
-        self.user = User.objects.create_user(username="manager", password="pass")
-        self.user.groups.add(self.manager_group)
-        self.client.login(username="manager", password="pass")
-        self.category = Category.objects.create(name="Drinks")
-
-        image = Image.new("RGB", (100, 100))
-        image_file = BytesIO()
-        image.save(image_file, "jpeg")
-        image_file.seek(0)
-        image = SimpleUploadedFile(
-            "test_image.jpg", image_file.read(), content_type="image/jpeg"
+        self.admin = User.objects.create_user(
+            email="admin@example.com", password="pass", first_name="Ad", region="global", role="admin"
         )
-
-        self.menu_item_data = {
-            "name": "Coke",
-            "price": Decimal("1.99"),
-            "category": self.category.id,
-            "description": "A refreshing beverage",
-            "image": image,
-        }
-
-    def test_create_menu_item(self):
-        response = self.client.post(reverse("menuitem-list"), self.menu_item_data)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(MenuItem.objects.count(), 1)
-        self.assertEqual(MenuItem.objects.get().name, "Coke")
-
-    def test_list_menu_items(self):
-        MenuItem.objects.create(
-            name="Coke",
-            price=Decimal("1.99"),
-            category=self.category,
-            description="A refreshing beverage",
+        self.manager = User.objects.create_user(
+            email="manager@example.com", password="pass", first_name="Man", region="india", role="manager"
+        )
+        self.member = User.objects.create_user(
+            email="member@example.com", password="pass", first_name="Mem", region="india"
         )
-        response = self.client.get(reverse("menuitem-list"))
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-
-
-class CartViewSetTest(TestCase):
-    def setUp(self):
-        self.client = APIClient()
-        self.user = User.objects.create_user(username="customer", password="pass")
-        self.client.login(username="customer", password="pass")
         self.category = Category.objects.create(name="Drinks")
+        self.restaurant = Restaurant.objects.create(name="Spice", cuisine_type="Indian", region="india", rating="4.5")
+        self.other_restaurant = Restaurant.objects.create(name="Diner", cuisine_type="American", region="america", rating="4.0")
         self.menu_item = MenuItem.objects.create(
-            name="Coke", price=Decimal("1.99"), category=self.category
+            restaurant=self.restaurant, name="Lassi", price=Decimal("1.99"), category=self.category
         )
-
-    def test_add_to_cart(self):
-        response = self.client.post(
-            reverse("cart-list"), {"menuitem": self.menu_item.id, "quantity": 2}
+        self.other_menu_item = MenuItem.objects.create(
+            restaurant=self.other_restaurant, name="Shake", price=Decimal("3.50"), category=self.category
         )
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(CartItem.objects.count(), 1)
-        self.assertEqual(CartItem.objects.get().quantity, 2)
 
-    def test_list_cart_items(self):
-        cart = Cart.objects.create(customer=self.user)
-        CartItem.objects.create(cart=cart, menuitem=self.menu_item, quantity=2)
-        response = self.client.get(reverse("cart-list"))
+
+class RestaurantViewSetTest(APITestCase):
+    def test_member_sees_own_region(self):
+        self.client.force_authenticate(user=self.member)
+        response = self.client.get(reverse("restaurant-list"))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data["items"]), 1)
+        self.assertEqual([r["id"] for r in response.data], [self.restaurant.id])
+
+    def test_admin_sees_all_regions(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(reverse("restaurant-list"))
+        self.assertEqual(len(response.data), 2)
+
+    def test_create_restaurant_admin_only(self):
+        data = {"name": "Grill", "cuisine_type": "BBQ", "region": "america", "rating": "4.2"}
+        self.client.force_authenticate(user=self.manager)
+        self.assertEqual(self.client.post(reverse("restaurant-list"), data).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post(reverse("restaurant-list"), data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Restaurant.objects.get(name="Grill").created_by, self.admin)
 
 
-class OrderViewSetTest(TestCase):
-    def setUp(self):
-        self.client = APIClient()
-        # Create user groups
-        self.manager_group = Group.objects.create(name="Managers")
-        self.crew_group = Group.objects.create(name="Crew")
-        
-        # Create users
-        self.customer = User.objects.create_user(
-            username="customer",
-            password="testpass123"
-        )
-        self.manager = User.objects.create_user(
-            username="manager",
-            password="testpass123"
-        )
-        self.delivery_crew = User.objects.create_user(
-            username="crew",
-            password="testpass123"
-        )
-        
-        # Assign groups
-        self.manager.groups.add(self.manager_group)
-        self.delivery_crew.groups.add(self.crew_group)
+class MenuItemViewSetTest(APITestCase):
+    def test_list_menu_items_by_restaurant(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(reverse("menuitem-list"), {"restaurant_id": self.restaurant.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["name"], "Lassi")
 
-        # Create test data
-        self.category = Category.objects.create(name="Test Category")
-        self.menu_item = MenuItem.objects.create(
-            name="Test Item",
-            price=Decimal("1.99"),
-            category=self.category
-        )
-        
-        # Create table and booking
-        self.table = Table.objects.create(
-            table_number=1,
-            capacity=4
-        )
-        self.table_booking = TableBooking.objects.create(
-            customer=self.customer,
-            table=self.table,
-            booking_date=date(2024, 3, 20),
-            booking_time=time(19, 0),
-            number_of_guests=2
-        )
+    def test_member_only_sees_own_region(self):
+        self.client.force_authenticate(user=self.member)
+        response = self.client.get(reverse("menuitem-list"))
+        self.assertEqual([item["id"] for item in response.data], [self.menu_item.id])
 
-    def test_create_dine_in_order_with_booking(self):
-        self.client.force_authenticate(user=self.customer)
-        
-        # Create cart and add items
-        cart = Cart.objects.create(customer=self.customer)
-        CartItem.objects.create(
-            cart=cart,
-            menuitem=self.menu_item,
-            quantity=1,
-            unit_price=self.menu_item.price,
-            price=self.menu_item.price
-        )
-        
-        data = {
-            'delivery_type': 'dine_in',
-            'table_booking': self.table_booking.id
-        }
-        response = self.client.post(reverse('order-list'), data, format='json')
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        
-        order = Order.objects.first()
-        self.assertEqual(order.delivery_type, 'dine_in')
-        self.assertEqual(order.table_booking.id, self.table_booking.id)
-
-    def test_order_with_discount(self):
-        self.client.force_authenticate(user=self.customer)
-        
-        # Create cart and add items
-        cart = Cart.objects.create(customer=self.customer)
-        CartItem.objects.create(
-            cart=cart,
-            menuitem=self.menu_item,
-            quantity=2,
-            unit_price=self.menu_item.price,
-            price=self.menu_item.price * 2
-        )
-        
-        data = {
-            'delivery_type': 'delivery',
-            'discount': 10
-        }
-        response = self.client.post(reverse('order-list'), data, format='json')
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        
-        order = Order.objects.first()
-        total = Decimal('3.98')  # 1.99 * 2
-        expected_subtotal = Decimal('3.58')  # 3.98 - (3.98 * 0.10)
-        
-        self.assertEqual(order.total, total)
-        self.assertEqual(order.subtotal, expected_subtotal)
+    def test_unavailable_items_are_hidden(self):
+        MenuItem.objects.filter(pk=self.menu_item.pk).update(is_available=False)
+        self.client.force_authenticate(user=self.member)
+        self.assertEqual(self.client.get(reverse("menuitem-list")).data, [])
 
 
-class TableViewSetTest(TestCase):
+class CartViewSetTest(APITestCase):
     def setUp(self):
-        self.client = APIClient()
-        # Create admin user
-        self.admin_user = User.objects.create_superuser(
-            username='admin',
-            email='admin@example.com',
-            password='adminpass'
-        )
-        # Create regular user
-        self.user = User.objects.create_user(
-            username='testuser',
-            password='testpass'
-        )
-        # Create test table
-        self.table = Table.objects.create(
-            table_number=1,
-            capacity=4
-        )
+        super().setUp()
+        self.client.force_authenticate(user=self.manager)
+        self.cart = Cart.objects.create(customer=self.manager)
 
-    def test_list_tables_authenticated(self):
-        self.client.force_authenticate(user=self.user)
-        response = self.client.get(reverse('table-list'))
+    def test_current_cart(self):
+        response = self.client.get(reverse("cart-current"))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data["id"], self.cart.id)
+        self.assertEqual(response.data["items"], [])
+
+    def test_add_item_twice_increments_quantity(self):
+        url = reverse("cart-add-item", args=[self.cart.id])
+        self.client.post(url, {"menu_item_id": self.menu_item.id, "quantity": 2}, format="json")
+        response = self.client.post(url, {"menu_item_id": self.menu_item.id, "quantity": 1}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(CartItem.objects.get(cart=self.cart).quantity, 3)
+        self.assertEqual(Decimal(response.data["total"]), Decimal("5.97"))
+        self.assertEqual(response.data["item_count"], 3)
+
+    def test_add_item_is_a_single_upsert(self):
+        url = reverse("cart-add-item", args=[self.cart.id])
+        self.client.post(url, {"menu_item_id": self.menu_item.id}, format="json")
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(url, {"menu_item_id": self.menu_item.id}, format="json")
+        statements = [q["sql"].split()[0].upper() for q in queries.captured_queries if "SAVEPOINT" not in q["sql"]]
+        # Upsert, totals, then the cart and its lines for the response
+        self.assertEqual(statements, ["INSERT", "UPDATE", "SELECT", "SELECT"])
+        self.assertEqual(CartItem.objects.get().quantity, 2)
 
-    def test_create_table_admin_only(self):
-        # Test with regular user
-        self.client.force_authenticate(user=self.user)
-        data = {
-            'table_number': 2,
-            'capacity': 6
-        }
+    def test_add_item_validation(self):
+        url = reverse("cart-add-item", args=[self.cart.id])
+        for quantity in (0, True, 2**63, "2"):
+            response = self.client.post(url, {"menu_item_id": self.menu_item.id, "quantity": quantity}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, quantity)
+        response = self.client.post(url, {"menu_item_id": 999999}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        for menu_item_id in ("abc", 2**63, -1, True, [1]):
+            response = self.client.post(url, {"menu_item_id": menu_item_id}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, menu_item_id)
+        self.assertEqual(self.client.post(url, {"menu_item_id": str(self.menu_item.id)}, format="json").status_code, status.HTTP_200_OK)
+        for pk in ("abc", 2**63):
+            response = self.client.post(reverse("cart-add-item", args=[pk]), {"menu_item_id": self.menu_item.id}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, pk)
+
+    def test_cannot_modify_another_cart(self):
+        other_cart = Cart.objects.create(customer=self.member)
+        url = reverse("cart-add-item", args=[other_cart.id])
+        response = self.client.post(url, {"menu_item_id": self.menu_item.id}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_update_quantity_and_remove_item(self):
+        cart_item = CartItem.objects.create(cart=self.cart, menu_item=self.menu_item, quantity=1)
         response = self.client.post(
-            reverse('table-list'),
-            data,
-            format='json'
-        )
-        self.assertEqual(
-            response.status_code,
-            status.HTTP_403_FORBIDDEN
+            reverse("cart-update-quantity", args=[self.cart.id]),
+            {"cart_item_id": cart_item.id, "quantity": 4}, format="json",
         )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["items"][0]["quantity"], 4)
 
-        # Test with admin user
-        self.client.force_authenticate(user=self.admin_user)
         response = self.client.post(
-            reverse('table-list'),
-            data,
-            format='json'
+            reverse("cart-remove-item", args=[self.cart.id]), {"cart_item_id": cart_item.id}, format="json"
         )
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(Table.objects.count(), 2)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(CartItem.objects.filter(pk=cart_item.pk).exists())
 
-class TableBookingViewSetTest(TestCase):
+    def test_checkout_creates_order(self):
+        CartItem.objects.create(cart=self.cart, menu_item=self.menu_item, quantity=2)
+        response = self.client.post(reverse("cart-checkout", args=[self.cart.id]), {"payment_method": "cash"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get()
+        self.assertEqual(order.customer, self.manager)
+        self.assertEqual(order.restaurant, self.restaurant)
+        self.assertEqual(order.total_amount, Decimal("3.98"))
+        self.assertEqual(OrderItem.objects.get(order=order).quantity, 2)
+        self.assertFalse(self.cart.items.exists())
+
+    def test_checkout_rejects_empty_cart_and_bad_payment(self):
+        url = reverse("cart-checkout", args=[self.cart.id])
+        self.assertEqual(self.client.post(url, {"payment_method": "cash"}, format="json").status_code, status.HTTP_400_BAD_REQUEST)
+        CartItem.objects.create(cart=self.cart, menu_item=self.menu_item)
+        self.assertEqual(self.client.post(url, {"payment_method": "gold"}, format="json").status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_members_cannot_checkout(self):
+        self.client.force_authenticate(user=self.member)
+        cart = Cart.objects.create(customer=self.member)
+        CartItem.objects.create(cart=cart, menu_item=self.menu_item)
+        response = self.client.post(reverse("cart-checkout", args=[cart.id]), {"payment_method": "cash"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class OrderViewSetTest(APITestCase):
     def setUp(self):
-        self.client = APIClient()
-        self.user = User.objects.create_user(
-            username='testuser',
-            password='testpass'
+        super().setUp()
+        self.member_order = Order.objects.create(
+            customer=self.member, restaurant=self.restaurant, payment_method="cash", total_amount=Decimal("1.99")
         )
-        self.table = Table.objects.create(
-            table_number=1,
-            capacity=4
-        )
-        self.valid_booking_data = {
-            'table': self.table.id,
-            'booking_date': '2024-03-20',
-            'booking_time': '19:00',
-            'number_of_guests': 2,
-            'special_requests': 'Window seat'
-        }
-
-    def test_create_booking(self):
-        self.client.force_authenticate(user=self.user)
-        response = self.client.post(
-            reverse('table-booking-list'),
-            self.valid_booking_data,
-            format='json'
-        )
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(TableBooking.objects.count(), 1)
-        self.assertEqual(
-            TableBooking.objects.first().customer,
-            self.user
+        OrderItem.objects.create(order=self.member_order, menu_item=self.menu_item, quantity=1, price=Decimal("1.99"))
+        self.other_order = Order.objects.create(
+            customer=self.manager, restaurant=self.restaurant, payment_method="card", total_amount=Decimal("1.99")
         )
 
-    def test_list_own_bookings(self):
-        self.client.force_authenticate(user=self.user)
-        # Create a booking
-        booking = TableBooking.objects.create(
-            customer=self.user,
-            table=self.table,
-            booking_date=date(2024, 3, 20),
-            booking_time=time(19, 0),
-            number_of_guests=2
-        )
-        
-        response = self.client.get(reverse('table-booking-list'))
+    def test_member_lists_own_orders(self):
+        self.client.force_authenticate(user=self.member)
+        response = self.client.get(reverse("order-list"))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual([o["id"] for o in response.data], [self.member_order.id])
+        self.assertEqual(len(response.data[0]["items"]), 1)
+
+    def test_manager_lists_all_orders(self):
+        self.client.force_authenticate(user=self.manager)
+        self.assertEqual(len(self.client.get(reverse("order-list")).data), 2)
+
+    def test_orders_are_not_created_directly(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post(reverse("order-list"), {})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_update_status(self):
+        self.client.force_authenticate(user=self.manager)
+        url = reverse("order-update-status", args=[self.member_order.id])
+        response = self.client.post(url, {"status": "preparing"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.member_order.refresh_from_db()
+        self.assertEqual(self.member_order.status, "preparing")
+        self.assertEqual(self.client.post(url, {"status": "eaten"}, format="json").status_code, status.HTTP_400_BAD_REQUEST)
 
-    def test_available_tables_endpoint(self):
-        self.client.force_authenticate(user=self.user)
-        # Create a booking
-        TableBooking.objects.create(
-            customer=self.user,
-            table=self.table,
-            booking_date=date(2024, 3, 20),
-            booking_time=time(19, 0),
-            number_of_guests=2
-        )
+    def test_cancel_pending_order(self):
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.post(reverse("order-cancel", args=[self.member_order.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.member_order.refresh_from_db()
+        self.assertEqual(self.member_order.status, "cancelled")
+        self.assertIsNotNone(self.member_order.cancelled_at)
+
+    def test_members_cannot_cancel(self):
+        self.client.force_authenticate(user=self.member)
+        response = self.client.post(reverse("order-cancel", args=[self.member_order.id]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
-        # Check available tables for same time (should be empty)
-        response = self.client.get(
-            reverse('table-booking-available-tables'),
-            {
-                'date': '2024-03-20',
-                'time': '19:00',
-                'guests': 2
-            }
+    def test_update_payment_admin_only(self):
+        url = reverse("order-update-payment", args=[self.member_order.id])
+        self.client.force_authenticate(user=self.manager)
+        self.assertEqual(self.client.post(url, {"payment_method": "card"}, format="json").status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(user=self.admin)
+        self.assertEqual(self.client.post(url, {"payment_method": "card"}, format="json").status_code, status.HTTP_200_OK)
+
+
+class DashboardViewTest(APITestCase):
+    def setUp(self):
+        super().setUp()
+        Order.objects.create(
+            customer=self.member, restaurant=self.restaurant, payment_method="cash",
+            total_amount=Decimal("10.00"), status="delivered",
         )
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 0)
-
-        # Check available tables for different time (should show table)
-        response = self.client.get(
-            reverse('table-booking-available-tables'),
-            {
-                'date': '2024-03-20',
-                'time': '20:00',
-                'guests': 2
-            }
+        Order.objects.create(
+            customer=self.member, restaurant=self.other_restaurant, payment_method="cash",
+            total_amount=Decimal("5.00"), status="pending",
         )
+
+    def test_admin_dashboard(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(reverse("admin-dashboard"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_orders"], 2)
+        self.assertEqual(response.data["total_revenue"], Decimal("10.00"))
+        self.assertEqual(len(response.data["recent_orders"]), 2)
+
+    def test_manager_dashboard_is_regional(self):
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.get(reverse("manager-dashboard"))
+        self.assertEqual(response.data["region"], "india")
+        self.assertEqual(response.data["total_orders"], 1)
+        self.assertEqual(response.data["top_restaurants"][0]["id"], self.restaurant.id)
+
+    def test_member_dashboard(self):
+        self.client.force_authenticate(user=self.member)
+        response = self.client.get(reverse("member-dashboard"))
+        self.assertEqual(response.data["total_orders"], 2)
+        self.assertEqual(response.data["total_spent"], Decimal("10.00"))
+
+    def test_dashboards_are_role_restricted(self):
+        self.client.force_authenticate(user=self.member)
+        self.assertEqual(self.client.get(reverse("admin-dashboard")).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(reverse("manager-dashboard")).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class SparseFieldsetTest(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.manager)
+        for _ in range(3):
+            order = Order.objects.create(
+                customer=self.member, restaurant=self.restaurant, payment_method="cash", total_amount=Decimal("1.99")
+            )
+            OrderItem.objects.create(order=order, menu_item=self.menu_item, quantity=1, price=Decimal("1.99"))
+
+    def test_relations_default_to_ids(self):
+        order = self.client.get(reverse("order-list")).data[0]
+        self.assertEqual(order["restaurant"], self.restaurant.id)
+        self.assertEqual(order["items"][0]["menu_item"], self.menu_item.id)
+
+    def test_expand_nested_relations(self):
+        response = self.client.get(reverse("order-list"), {"expand": "restaurant,items.menu_item.category"})
+        order = response.data[0]
+        self.assertEqual(order["restaurant"]["name"], "Spice")
+        self.assertEqual(order["items"][0]["menu_item"]["name"], "Lassi")
+        self.assertEqual(order["items"][0]["menu_item"]["category"], {"id": self.category.id, "name": "Drinks"})
+        self.assertEqual(order["items"][0]["menu_item"]["restaurant"], self.restaurant.id)
+
+    def test_fields_restricts_output(self):
+        response = self.client.get(reverse("order-list"), {"fields": "id,status,items.quantity"})
+        self.assertEqual(set(response.data[0]), {"id", "status", "items"})
+        self.assertEqual(response.data[0]["items"], [{"quantity": 1}])
+
+    def test_queries_only_cover_requested_relations(self):
+        # force_authenticate skips the user lookup: orders, plus one prefetch for items when included
+        with self.assertNumQueries(1):
+            self.client.get(reverse("order-list"), {"fields": "id,status"})
+        with self.assertNumQueries(2):
+            self.client.get(reverse("order-list"), {"expand": "restaurant,items.menu_item.category"})
+
+    def test_cart_actions_honour_expand(self):
+        cart = Cart.objects.create(customer=self.manager)
+        url = reverse("cart-add-item", args=[cart.id])
+        response = self.client.post(url + "?expand=items.menu_item", {"menu_item_id": self.menu_item.id}, format="json")
+        self.assertEqual(response.data["items"][0]["menu_item"]["name"], "Lassi")
+        response = self.client.get(reverse("cart-current"))
+        self.assertEqual(response.data["items"][0]["menu_item"], self.menu_item.id)
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.member)
+
+    def test_list_not_modified_without_loading_rows(self):
+        url = reverse("menuitem-list")
+        etag = self.client.get(url)["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+        with self.assertNumQueries(1):  # the aggregate only
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_etag_changes_with_data_query_and_role(self):
+        url = reverse("menuitem-list")
+        etag = self.client.get(url)["ETag"]
+        self.assertNotEqual(self.client.get(url, {"expand": "category"})["ETag"], etag)
+        self.menu_item.price = Decimal("2.49")
+        self.menu_item.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+        self.client.force_authenticate(user=self.manager)
+        self.assertNotEqual(self.client.get(url)["ETag"], etag)
+
+    def test_expanded_restaurant_changes_invalidate(self):
+        url = reverse("menuitem-list")
+        etag = self.client.get(url, {"expand": "restaurant"})["ETag"]
+        Restaurant.objects.filter(pk=self.restaurant.pk).update(updated_at=self.restaurant.updated_at.replace(year=2100))
+        response = self.client.get(url, {"expand": "restaurant"}, HTTP_IF_NONE_MATCH=etag)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
 
-    def test_booking_validation(self):
-        self.client.force_authenticate(user=self.user)
-        # Test booking with too many guests
-        invalid_data = self.valid_booking_data.copy()
-        invalid_data['number_of_guests'] = 6  # Table capacity is 4
-        
-        response = self.client.post(
-            reverse('table-booking-list'),
-            invalid_data,
-            format='json'
-        )
+    def test_expanded_category_changes_invalidate(self):
+        url = reverse("menuitem-detail", args=[self.menu_item.id])
+        response = self.client.get(url, {"expand": "category"})
+        self.category.name = "Beverages"
+        self.category.save()
+        response = self.client.get(url, {"expand": "category"}, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["category"]["name"], "Beverages")
+
+    def test_detail_if_modified_since(self):
+        url = reverse("restaurant-detail", args=[self.restaurant.id])
+        response = self.client.get(url)
+        self.assertIn("Last-Modified", response)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
         self.assertEqual(
-            response.status_code,
-            status.HTTP_400_BAD_REQUEST
+            self.client.get(url, HTTP_IF_MODIFIED_SINCE="Sat, 01 Jan 2000 00:00:00 GMT").status_code,
+            status.HTTP_200_OK,
         )
 
-    def test_update_booking(self):
-        self.client.force_authenticate(user=self.user)
-        # Create a booking
-        booking = TableBooking.objects.create(
-            customer=self.user,
-            table=self.table,
-            booking_date=date(2024, 3, 20),
-            booking_time=time(19, 0),
-            number_of_guests=2
-        )
+    def test_missing_detail_is_404(self):
+        url = reverse("restaurant-detail", args=[self.other_restaurant.id])  # other region
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        for name in ("restaurant-detail", "menuitem-detail"):
+            for pk in ("abc", 2**63):
+                self.assertEqual(self.client.get(reverse(name, args=[pk])).status_code, status.HTTP_404_NOT_FOUND, (name, pk))
+
 
-        # Update booking
-        update_data = {
-            'number_of_guests': 3,
-            'special_requests': 'Near kitchen'
-        }
-        response = self.client.patch(
-            reverse('table-booking-detail', kwargs={'pk': booking.pk}),
-            update_data,
-            format='json'
+@override_settings(JOBS_EAGER=True)
+class CartConcurrencyTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(
+            email="manager@example.com", password="pass", first_name="Man", region="india", role="manager"
         )
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        booking.refresh_from_db()
-        self.assertEqual(booking.number_of_guests, 3)
-        self.assertEqual(booking.special_requests, 'Near kitchen')
\ No newline at end of file
+        restaurant = Restaurant.objects.create(name="Spice", cuisine_type="Indian", region="india", rating="4.5")
+        self.menu_item = MenuItem.objects.create(
+            restaurant=restaurant, name="Lassi", price=Decimal("1.99"), category=Category.objects.create(name="Drinks")
+        )
+        self.cart = Cart.objects.create(customer=self.manager)
+
+    def test_one_cart_per_customer(self):
+        with self.assertRaises(IntegrityError):
+            Cart.objects.create(customer=self.manager)
+
+    @skipUnlessDBFeature("has_select_for_update")  # SQLite serialises writers; nothing to race
+    def test_parallel_adds_lose_no_quantity(self):
+        adds, errors = 20, []
+        barrier = threading.Barrier(adds)
+
+        def add():
+            try:
+                barrier.wait()
+                client = APIClient()
+                client.force_authenticate(user=self.manager)
+                response = client.post(reverse("cart-add-item", args=[self.cart.id]), {"menu_item_id": self.menu_item.id}, format="json")
+                if response.status_code != status.HTTP_200_OK:
+                    errors.append(response.status_code)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=add) for _ in range(adds)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(CartItem.objects.get(cart=self.cart).quantity, adds)
+        self.cart.refresh_from_db()
+        self.assertEqual((self.cart.item_count, self.cart.subtotal), (adds, Decimal("1.99") * adds))
+
+    @skipUnlessDBFeature("has_select_for_update")
+    def test_parallel_checkouts_of_one_cart_place_one_order(self):
+        CartItem.objects.create(cart=self.cart, menu_item=self.menu_item, quantity=2)
+        checkouts, codes = 8, []
+        barrier = threading.Barrier(checkouts)
+
+        def checkout():
+            try:
+                barrier.wait()
+                client = APIClient()
+                client.force_authenticate(user=self.manager)
+                codes.append(client.post(reverse("cart-checkout", args=[self.cart.id]), {"payment_method": "cash"}, format="json").status_code)
+            except Exception as e:
+                codes.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=checkout) for _ in range(checkouts)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(codes), [status.HTTP_201_CREATED] + [status.HTTP_400_BAD_REQUEST] * (checkouts - 1))
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(OrderItem.objects.get().quantity, 2)
@@ -0,0 +1,98 @@
+# throttling.py
+import time
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket throttle keyed by `view.throttle_scope`.
+
+    Rates come from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] using the usual
+    DRF "<num>/<period>" syntax: the bucket holds <num> tokens and refills
+    at <num> tokens per <period>, so clients may burst up to <num> requests
+    and are then smoothed to the average rate.
+
+    A rate of 0 rejects every request of the scope.
+
+    Buckets live in the cache named by `cache_alias`, which is shared between
+    workers when a Redis cache is configured and falls back to the local
+    in-memory cache otherwise. The read/modify/write is not atomic, so under
+    heavy concurrency a client may briefly exceed its budget by a request or
+    two; that keeps the throttle to a single get/set per request.
+    """
+    cache_alias = 'default'
+    cache_format = 'throttle:%(scope)s:%(kind)s:%(ident)s'
+    kind = None
+    durations = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+    def __init__(self):
+        self.cache = caches[self.cache_alias]
+        self.retry_after = None
+
+    def parse_rate(self, rate):
+        num, period = rate.split('/')
+        capacity = int(num)
+        return capacity, capacity / self.durations[period[0]]
+
+    def get_rate(self, scope):
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[scope]
+        except KeyError:
+            raise ImproperlyConfigured(f"No throttle rate set for scope '{scope}'")
+
+    def get_ident_key(self, request):
+        raise NotImplementedError('.get_ident_key() must be overridden')
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if not scope:
+            return True
+        rate = self.get_rate(scope)
+        if rate is None:
+            return True
+        ident = self.get_ident_key(request)
+        if ident is None:
+            return True
+
+        capacity, refill_rate = self.parse_rate(rate)
+        if not capacity:
+            # "0/<period>" shuts the scope off; there is nothing to wait for
+            self.retry_after = None
+            return False
+        key = self.cache_format % {'scope': scope, 'kind': self.kind, 'ident': ident}
+        now = time.time()
+
+        tokens, stamp = self.cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - stamp) * refill_rate)
+        if tokens < 1:
+            self.retry_after = (1 - tokens) / refill_rate
+            return False
+
+        # Expire idle buckets once they would have refilled completely.
+        self.cache.set(key, (tokens - 1, now), int(capacity / refill_rate) + 1)
+        return True
+
+    def wait(self):
+        return self.retry_after
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Limits authenticated users by id; anonymous requests are left to the IP throttle."""
+    kind = 'user'
+
+    def get_ident_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return None
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Limits every request by client IP, authenticated or not."""
+    kind = 'ip'
+
+    def get_ident_key(self, request):
+        return self.get_ident(request)
@@ -1,13 +1,13 @@
 from django.urls import path, re_path, include
-from django.views.generic import TemplateView
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     UserViewSet, RestaurantViewSet, MenuItemViewSet,
     CartViewSet, OrderViewSet, PasswordResetConfirmView, PasswordResetView,
-    paypal_payment_complete,
-    AdminDashboardView, ManagerDashboardView, MemberDashboardView
+    paypal_payment_complete, ThrottledTokenObtainPairView, ThrottledDjoserUserViewSet,
+    AdminDashboardView, ManagerDashboardView, MemberDashboardView, MetricsView, RestaurantMenuView,
+    OrderAnalyticsView, LeaderboardView, KitchenTicketViewSet
 )
 
 router = DefaultRouter()
@@ -16,20 +16,28 @@ router.register(r'restaurants', RestaurantViewSet, basename='restaurant')
 router.register(r'menu-items', MenuItemViewSet, basename='menuitem')
 router.register(r'cart', CartViewSet, basename='cart')
 router.register(r'orders', OrderViewSet, basename='order')
+router.register(r'kitchen/tickets', KitchenTicketViewSet, basename='kitchenticket')
 
 urlpatterns = [
+    # Shadows djoser's jwt/create/ so login attempts are throttled,
+    re_path(r'^auth/jwt/create/?$', ThrottledTokenObtainPairView.as_view(), name='jwt-create'),
+    # and its routes that email a user, so they can't be used to flood inboxes
+    path('auth/users/reset_password/', ThrottledDjoserUserViewSet.as_view({'post': 'reset_password'}), name='user-reset-password'),
+    path('auth/users/reset_username/', ThrottledDjoserUserViewSet.as_view({'post': 'reset_username'}), name='user-reset-username'),
     path('auth/', include('djoser.urls')),
     path('auth/', include('djoser.urls.jwt')),
     path('dashboard/admin/', AdminDashboardView.as_view(), name='admin-dashboard'),
     path('dashboard/manager/', ManagerDashboardView.as_view(), name='manager-dashboard'),
     path('dashboard/member/', MemberDashboardView.as_view(), name='member-dashboard'),
+    path('analytics/orders/', OrderAnalyticsView.as_view(), name='order-analytics'),
+    path('leaderboards/', LeaderboardView.as_view(), name='leaderboards'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    path('restaurants/<int:pk>/menu/', RestaurantMenuView.as_view(), name='restaurant-menu'),
     path('', include(router.urls)),
     # path('payments/verify/<int:order_id>/', verify_payment, name='verify-payment'),
     path('payments/paypal/complete/', paypal_payment_complete, name='paypal-payment-complete'),
     path('auth/password/reset/', PasswordResetView.as_view(), name='password-reset'),
     path('auth/password/reset/confirm/', PasswordResetConfirmView.as_view(), name='password-reset-confirm'),
-    # Catch-all route for React
-    re_path(r'^.*$', TemplateView.as_view(template_name='index.html')),
 ]
 
 # urlpatterns += staticfiles_urlpatterns
\ No newline at end of file
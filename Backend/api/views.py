@@ -1,15 +1,18 @@
 # views.py
+import asyncio
+from adrf.views import APIView as AsyncAPIView
+from adrf.viewsets import GenericViewSet as AsyncGenericViewSet
 from django.utils import timezone
-from rest_framework import viewsets, status
+from rest_framework import mixins, viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
-from django.db import transaction
-from .models import User, Restaurant, MenuItem, Cart, CartItem, Order, OrderItem
+from django.db import connection, transaction
+from .models import User, Restaurant, MenuItem, Cart, CartItem, Order, OrderItem, CrewAvailability
 from .serializers import (
     UserSerializer, RestaurantSerializer, MenuItemSerializer,
-    CartSerializer, CartItemSerializer, OrderSerializer, OrderItemSerializer
+    CartSerializer, CartItemSerializer, OrderSerializer, OrderItemSerializer, KitchenTicketSerializer
 )
 from .permissions import (
     IsAdmin, IsAdminOrReadOnly, IsManager, IsMember, IsAdminOrManager,
@@ -23,59 +26,107 @@ from django.utils.http import urlsafe_base64_decode
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.core.mail import send_mail
 
-from django.db.models import F, Sum, Count, Q
+from django.db.models import Sum, Count, Q
 from django.utils.encoding import force_bytes
 from .permissions import IsAdmin, IsManager, IsMember
 from .models import User, Restaurant, Order
-from paypalcheckoutsdk.orders import OrdersGetRequest
+from rest_framework_simplejwt.views import TokenObtainPairView
+from djoser.views import UserViewSet as DjoserUserViewSet
 from .paypal import PayPalClient
-
-class AdminDashboardView(APIView):
+from .throttling import UserTokenBucketThrottle, IPTokenBucketThrottle
+from .permissions import HasMetricsToken
+from . import metrics
+from django.http import HttpResponse
+from django.db.models import prefetch_related_objects
+from .fieldsets import ExpandableQuerysetMixin
+from .conditional import ConditionalGetMixin
+from . import menus
+from .archiving import OrderHistory, aorder_totals
+from . import analytics, geo, inventory, kitchen, leaderboards
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, time
+from .middleware import accepts_gzip
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+
+async def alist(queryset):
+    return [row async for row in queryset]
+
+def as_id(value):
+    """`value` as a primary key (an int, or digits from a URL or form), or None if it can't be one."""
+    if isinstance(value, str) and value.isdigit():
+        value = int(value)
+    if type(value) is not int or not 0 < value <= connection.ops.integer_field_range('BigAutoField')[1]:
+        return None
+    return value
+
+class AsyncModelViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.UpdateModelMixin,
+                        mixins.DestroyModelMixin, mixins.ListModelMixin, AsyncGenericViewSet):
+    """
+    ModelViewSet on adrf: actions overridden with `async def` run on the
+    event loop under ASGI, the others in a thread as before.
+    """
+
+# The dashboards are async (adrf): their independent queries are awaited together
+class AdminDashboardView(AsyncAPIView):
     permission_classes = [IsAuthenticated, IsAdmin]
-    def get(self, request):
-        total_users = User.objects.count()
-        total_restaurants = Restaurant.objects.count()
-        total_orders = Order.objects.count()
-        total_revenue = Order.objects.filter(status__in=["confirmed", "preparing", "ready", "delivered"]).aggregate(Sum("total_amount"))["total_amount__sum"] or 0
-        recent_orders = list(Order.objects.select_related('restaurant', 'customer').order_by('-created_at')[:5].values(
-            'id', 'customer__first_name', 'restaurant__name', 'status', 'created_at', 'total_amount'))
-        top_restaurants = list(Restaurant.objects.annotate(order_count=Count('order')).order_by('-order_count')[:3].values('id', 'name', 'order_count'))
+    statement_timeout_scope = 'dashboard'
+    async def get(self, request):
+        recent_orders = Order.objects.select_related('restaurant', 'customer').order_by('-created_at')[:5].values(
+            'id', 'customer__first_name', 'restaurant__name', 'status', 'created_at', 'total_amount')
+        total_users, total_restaurants, (total_orders, total_revenue), recent_orders, top_restaurants, top_menu_items = await asyncio.gather(
+            User.objects.acount(),
+            Restaurant.objects.acount(),
+            aorder_totals(),
+            alist(recent_orders),
+            leaderboards.atop_restaurants(),
+            leaderboards.atop_menu_items(),
+        )
         return Response({
             "total_users": total_users,
             "total_restaurants": total_restaurants,
             "total_orders": total_orders,
             "total_revenue": total_revenue,
             "recent_orders": recent_orders,
-            "top_restaurants": top_restaurants
+            "top_restaurants": top_restaurants,
+            "top_menu_items": top_menu_items
         })
 
-class ManagerDashboardView(APIView):
+class ManagerDashboardView(AsyncAPIView):
     permission_classes = [IsAuthenticated, IsManager]
-    def get(self, request):
+    statement_timeout_scope = 'dashboard'
+    async def get(self, request):
         region = request.user.region
-        total_restaurants = Restaurant.objects.filter(region=region).count()
-        total_orders = Order.objects.filter(restaurant__region=region).count()
-        total_revenue = Order.objects.filter(restaurant__region=region, status__in=["confirmed", "preparing", "ready", "delivered"]).aggregate(Sum("total_amount"))["total_amount__sum"] or 0
-        recent_orders = list(Order.objects.filter(restaurant__region=region).select_related('restaurant', 'customer').order_by('-created_at')[:5].values(
-            'id', 'customer__first_name', 'restaurant__name', 'status', 'created_at', 'total_amount'))
-        top_restaurants = list(Restaurant.objects.filter(region=region).annotate(order_count=Count('order')).order_by('-order_count')[:3].values('id', 'name', 'order_count'))
+        recent_orders = Order.objects.filter(restaurant__region=region).select_related('restaurant', 'customer').order_by('-created_at')[:5].values(
+            'id', 'customer__first_name', 'restaurant__name', 'status', 'created_at', 'total_amount')
+        total_restaurants, (total_orders, total_revenue), recent_orders, top_restaurants, top_menu_items = await asyncio.gather(
+            Restaurant.objects.filter(region=region).acount(),
+            aorder_totals(restaurant__region=region),
+            alist(recent_orders),
+            leaderboards.atop_restaurants(region),
+            leaderboards.atop_menu_items(region),
+        )
         return Response({
             "region": region,
             "total_restaurants": total_restaurants,
             "total_orders": total_orders,
             "total_revenue": total_revenue,
             "recent_orders": recent_orders,
-            "top_restaurants": top_restaurants
+            "top_restaurants": top_restaurants,
+            "top_menu_items": top_menu_items
         })
 
-class MemberDashboardView(APIView):
+class MemberDashboardView(AsyncAPIView):
     permission_classes = [IsAuthenticated, IsMember]
-    def get(self, request):
-        total_orders = Order.objects.filter(customer=request.user).count()
-        total_spent = Order.objects.filter(customer=request.user, status__in=["confirmed", "preparing", "ready", "delivered"]).aggregate(Sum("total_amount"))["total_amount__sum"] or 0
-        recent_orders = list(Order.objects.filter(customer=request.user).select_related('restaurant').order_by('-created_at')[:5].values(
-            'id', 'restaurant__name', 'status', 'created_at', 'total_amount'))
-        top_restaurants = list(Restaurant.objects.filter(order__customer=request.user).annotate(order_count=Count('order', filter=Q(order__customer=request.user))).order_by('-order_count').distinct()[:3].values('id', 'name', 'order_count'))
+    statement_timeout_scope = 'dashboard'
+    async def get(self, request):
+        recent_orders = Order.objects.filter(customer=request.user).select_related('restaurant').order_by('-created_at')[:5].values(
+            'id', 'restaurant__name', 'status', 'created_at', 'total_amount')
+        top_restaurants = Restaurant.objects.filter(order__customer=request.user).annotate(order_count=Count('order', filter=Q(order__customer=request.user))).order_by('-order_count').distinct()[:3].values('id', 'name', 'order_count')
+        (total_orders, total_spent), recent_orders, top_restaurants = await asyncio.gather(
+            aorder_totals(customer=request.user),
+            alist(recent_orders),
+            alist(top_restaurants),
+        )
         return Response({
             "total_orders": total_orders,
             "total_spent": total_spent,
@@ -83,6 +134,84 @@ class MemberDashboardView(APIView):
             "top_restaurants": top_restaurants
         })
 
+class OrderAnalyticsView(APIView):
+    """
+    Order counts and revenue per ?granularity= (hour, day or week) bucket,
+    restaurant and status, over [?start=, ?end=) (ISO dates or datetimes).
+    Managers see their region; admins all regions or ?region=.
+    """
+    permission_classes = [IsAuthenticated, IsAdminOrManager]
+    statement_timeout_scope = 'analytics'
+
+    def get(self, request):
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in analytics.GRANULARITIES:
+            return Response({"detail": "granularity must be one of hour, day, week."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            end = min(self.parse_moment(request.query_params.get('end')) or timezone.now(), timezone.now())
+            start = self.parse_moment(request.query_params.get('start')) or end - analytics.DEFAULT_SPANS[granularity] * analytics.GRANULARITIES[granularity]
+        except ValueError:
+            return Response({"detail": "start and end must be ISO 8601 dates or datetimes."}, status=status.HTTP_400_BAD_REQUEST)
+        if start >= end:
+            return Response({"detail": "start must be before end."}, status=status.HTTP_400_BAD_REQUEST)
+        if (end - start) / analytics.GRANULARITIES[granularity] > analytics.MAX_BUCKETS:
+            return Response({"detail": f"At most {analytics.MAX_BUCKETS} buckets per request."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.user.role == 'admin':
+            region = request.query_params.get('region') or analytics.ALL_REGIONS
+        else:
+            region = request.user.region
+        restaurant = request.query_params.get('restaurant')
+        buckets = []
+        for bucket, closed, rows in analytics.order_buckets(region, granularity, start, end):
+            if restaurant:
+                rows = [row for row in rows if str(row['restaurant']) == restaurant]
+            buckets.append({"start": bucket, "closed": closed, "rows": rows})
+        return Response({"granularity": granularity, "region": region, "buckets": buckets})
+
+    @staticmethod
+    def parse_moment(value):
+        if not value:
+            return None
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is None:
+                raise ValueError(value)
+            moment = datetime.combine(day, time.min)
+        return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+class LeaderboardView(APIView):
+    """
+    Top restaurants and menu items over ?window= all, 7d or 30d, from the
+    counter tables. Admins see every region or ?region=; everyone else their own.
+    """
+    permission_classes = [IsAuthenticated]
+    statement_timeout_scope = 'dashboard'
+
+    def get(self, request):
+        window = request.query_params.get('window', 'all')
+        if window not in leaderboards.WINDOWS:
+            return Response({"detail": "window must be one of all, 7d, 30d."}, status=status.HTTP_400_BAD_REQUEST)
+        limit = request.query_params.get('limit', '10')
+        if not limit.isdigit() or not 1 <= int(limit) <= 100:
+            return Response({"detail": "limit must be between 1 and 100."}, status=status.HTTP_400_BAD_REQUEST)
+        region = request.query_params.get('region') if request.user.role == 'admin' else request.user.region
+        return Response({
+            "window": window,
+            "region": region,
+            "restaurants": leaderboards.top_restaurants(region, window, int(limit)),
+            "menu_items": leaderboards.top_menu_items(region, window, int(limit)),
+        })
+
+class MetricsView(APIView):
+    """Prometheus text exposition of the API metrics, for admins and scrapers holding METRICS_TOKEN."""
+    permission_classes = [IsAdmin | HasMetricsToken]
+
+    def get(self, request):
+        body, content_type = metrics.render_latest()
+        return HttpResponse(body, content_type=content_type)
+
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -95,7 +224,7 @@ class UserViewSet(viewsets.ModelViewSet):
             return User.objects.filter(region=self.request.user.region)
         return User.objects.none()
 
-class RestaurantViewSet(viewsets.ModelViewSet):
+class RestaurantViewSet(ConditionalGetMixin, AsyncModelViewSet):
     serializer_class = RestaurantSerializer
     permission_classes = [IsAdminOrReadOnly]
 
@@ -108,13 +237,59 @@ class RestaurantViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
-class MenuItemViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    def nearby(self, request):
+        """The ?limit= (default 10) nearest restaurants within ?radius= km (default 5) of ?lat=&lon=, with their distance."""
+        try:
+            latitude, longitude = float(request.query_params['lat']), float(request.query_params['lon'])
+            radius = float(request.query_params.get('radius', 5))
+            limit = int(request.query_params.get('limit', 10))
+        except (KeyError, ValueError):
+            return Response({"detail": "lat and lon are required; radius and limit must be numbers."}, status=status.HTTP_400_BAD_REQUEST)
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return Response({"detail": "lat or lon out of range."}, status=status.HTTP_400_BAD_REQUEST)
+        if not (0 < radius <= geo.MAX_SEARCH_RADIUS_KM and 1 <= limit <= 50):
+            return Response({"detail": f"radius must be at most {geo.MAX_SEARCH_RADIUS_KM} km and limit between 1 and 50."}, status=status.HTTP_400_BAD_REQUEST)
+
+        ranked = geo.nearest(self.get_queryset(), latitude, longitude, radius, limit)
+        data = self.get_serializer([restaurant for _, restaurant in ranked], many=True).data
+        for restaurant, (distance, _) in zip(data, ranked):
+            restaurant['distance_km'] = round(distance, 3)
+        return Response(data)
+
+class RestaurantMenuView(APIView):
+    """A restaurant's available items grouped by category, served as pre-rendered bytes (see api/menus.py)."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        document = menus.get_menu_document(pk)
+        if document is None or (request.user.role in ['manager', 'member'] and document['region'] != request.user.region):
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        etag = 'W/' + document['etag']  # the same validator for both encodings
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            if accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+                response = HttpResponse(document['gzip_body'], content_type='application/json')
+                response['Content-Encoding'] = 'gzip'
+            else:
+                response = HttpResponse(document['body'], content_type='application/json')
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Accept-Encoding', 'Authorization'))
+        return response
+
+class MenuItemViewSet(ConditionalGetMixin, ExpandableQuerysetMixin, AsyncModelViewSet):
     serializer_class = MenuItemSerializer
     permission_classes = [IsAdminOrReadOnly]
+    expanded_last_modified = {'restaurant': 'restaurant__updated_at', 'category': 'category__updated_at'}
 
     def get_queryset(self):
         restaurant_id = self.request.query_params.get('restaurant_id')
-        queryset = MenuItem.objects.filter(is_available=True)
+        queryset = MenuItem.objects.all()
+        if self.action == 'list' or self.request.user.role != 'admin':
+            # Admins can still reach sold-out items, e.g. to restock them
+            queryset = queryset.filter(is_available=True)
         
         if restaurant_id:
             queryset = queryset.filter(restaurant_id=restaurant_id)
@@ -122,68 +297,68 @@ class MenuItemViewSet(viewsets.ModelViewSet):
         if self.request.user.role in ['manager', 'member']:
             queryset = queryset.filter(restaurant__region=self.request.user.region)
         
-        return queryset
+        return self.select_requested(queryset)
 
-class CartViewSet(viewsets.GenericViewSet):
+class CartViewSet(ExpandableQuerysetMixin, viewsets.GenericViewSet):
     permission_classes = [IsAuthenticated] # All actions require authentication
     serializer_class = CartSerializer
+    throttle_classes = [UserTokenBucketThrottle, IPTokenBucketThrottle]
+    throttle_scope = 'cart'
+    statement_timeout_scope = 'cart'
 
     def get_object(self):
         # Ensure the user has a cart, create one if not
         cart, created = Cart.objects.get_or_create(customer=self.request.user)
         return cart
 
+    def cart_response(self, cart):
+        # Prefetch after any changes so the serialized cart is current
+        select, prefetch = CartSerializer.related_lookups(self.get_field_selection())
+        prefetch_related_objects([cart], *select, *prefetch)
+        return Response(self.get_serializer(cart).data, status=status.HTTP_200_OK)
+
     @action(detail=False, methods=['get'])
     def current(self, request):
         """Retrieves the current user's cart."""
-        cart = self.get_object()
-        serializer = self.get_serializer(cart)
-        return Response(serializer.data)
+        return self.cart_response(self.get_object())
 
     @action(detail=True, methods=['post'])
     def add_item(self, request, pk=None):
         """Adds or updates an item in the cart."""
-        cart = self.get_object()
-        if int(pk) != cart.id: # Ensure user modifies their own cart
-            return Response({"detail": "You can only modify your own cart."}, status=status.HTTP_403_FORBIDDEN)
-
         menu_item_id = request.data.get('menu_item_id')
         quantity = request.data.get('quantity', 1)
         special_instructions = request.data.get('special_instructions', '')
 
         if not menu_item_id:
             return Response({"detail": "menu_item_id is required."}, status=status.HTTP_400_BAD_REQUEST)
-        if not isinstance(quantity, int) or quantity <= 0:
+        if as_id(menu_item_id) is None:
+            return Response({"detail": "menu_item_id must be a positive integer."}, status=status.HTTP_400_BAD_REQUEST)
+        # Bools are ints to Python but not to PostgreSQL
+        if type(quantity) is not int or not 0 < quantity <= connection.ops.integer_field_range('PositiveIntegerField')[1]:
             return Response({"detail": "Quantity must be a positive integer."}, status=status.HTTP_400_BAD_REQUEST)
+        # The ids and quantity go into raw SQL, where a non-integer or out-of-range one is a DataError
+        if as_id(pk) is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        try:
-            menu_item = MenuItem.objects.get(id=menu_item_id)
-        except MenuItem.DoesNotExist:
-            return Response({"detail": "Menu item not found."}, status=status.HTTP_404_NOT_FOUND)
-
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            menu_item=menu_item,
-            defaults={'quantity': quantity, 'special_instructions': special_instructions}
-        )
-
-        if not created:
-            cart_item.quantity = F('quantity') + quantity
-            cart_item.special_instructions = special_instructions
-            cart_item.save()
-            cart_item.refresh_from_db()
+        # One upsert that also checks the cart is the user's and the item exists
+        if Cart.add_item(as_id(pk), request.user.id, as_id(menu_item_id), quantity, special_instructions):
+            return self.cart_response(Cart.objects.get(pk=pk))
 
-        serializer = CartSerializer(cart)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        cart = self.get_object()
+        if int(pk) != cart.id: # Ensure user modifies their own cart
+            return Response({"detail": "You can only modify your own cart."}, status=status.HTTP_403_FORBIDDEN)
+        return Response({"detail": "Menu item not found."}, status=status.HTTP_404_NOT_FOUND)
 
-    @action(detail=True, methods=['post'], permission_classes=[IsAdmin | IsManager]) # Restrict checkout to Admin/Manager
+    @action(detail=True, methods=['post'], permission_classes=[IsAdmin | IsManager], throttle_scope='checkout') # Restrict checkout to Admin/Manager
     def checkout(self, request, pk=None):
         """Proceeds to checkout and creates an order from the cart."""
         cart = self.get_object()
         if int(pk) != cart.id:
+            metrics.record_checkout('cart', 'forbidden')
             return Response({"detail": "You can only checkout your own cart."}, status=status.HTTP_403_FORBIDDEN)
 
         if not cart.items.exists():
+            metrics.record_checkout('cart', 'empty_cart')
             return Response({"detail": "Your cart is empty."}, status=status.HTTP_400_BAD_REQUEST)
 
         payment_method = request.data.get('payment_method')
@@ -192,33 +367,73 @@ class CartViewSet(viewsets.GenericViewSet):
         # Use the actual choices from the Order model
         order_payment_choices = [choice[0] for choice in Order.PAYMENT_METHOD_CHOICES]
         if payment_method not in order_payment_choices:
+            metrics.record_checkout('cart', 'invalid_payment_method')
             return Response({"detail": "Invalid payment method."}, status=status.HTTP_400_BAD_REQUEST)
 
-        with transaction.atomic():
-            first_item_restaurant = cart.items.first().menu_item.restaurant if cart.items.first() else None
-
-            order = Order.objects.create(
-                customer=request.user,
-                restaurant=first_item_restaurant,
-                total_amount=cart.total,
-                payment_method=payment_method,
-                special_instructions=special_instructions,
-                status='pending'
-            )
+        try:
+            with transaction.atomic():
+                # Locked, so a second checkout of the cart waits for this one and then finds it empty
+                cart = Cart.objects.select_for_update().get(pk=cart.pk)
+                order = self.place_order(cart, payment_method, special_instructions) if cart.items.exists() else None
+        except inventory.OutOfStock as e:
+            metrics.record_checkout('cart', 'out_of_stock')
+            return Response({"detail": str(e), "menu_item": e.menu_item.id}, status=status.HTTP_409_CONFLICT)
+        if order is None:
+            metrics.record_checkout('cart', 'empty_cart')
+            return Response({"detail": "Your cart is empty."}, status=status.HTTP_400_BAD_REQUEST)
 
-            for cart_item in cart.items.all():
-                OrderItem.objects.create(
-                    order=order,
-                    menu_item=cart_item.menu_item,
-                    quantity=cart_item.quantity,
-                    price=cart_item.menu_item.price,
-                    special_instructions=cart_item.special_instructions
-                )
-            cart.items.all().delete() # Clear the cart items
-
-        serializer = OrderSerializer(order)
+        metrics.record_checkout('cart', 'created')
+        serializer = OrderSerializer(order, context=self.get_serializer_context())
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    def place_order(self, cart, payment_method, special_instructions):
+        lines = list(cart.items.select_related('menu_item__restaurant'))
+        inventory.reserve([(line.menu_item, line.quantity) for line in lines])
+        order = Order.objects.create(
+            customer=self.request.user,
+            restaurant=lines[0].menu_item.restaurant,
+            total_amount=cart.total,
+            payment_method=payment_method,
+            special_instructions=special_instructions,
+            status='pending'
+        )
+        for cart_item in lines:
+            OrderItem.objects.create(
+                order=order,
+                menu_item=cart_item.menu_item,
+                quantity=cart_item.quantity,
+                price=cart_item.menu_item.price,
+                special_instructions=cart_item.special_instructions
+            )
+        kitchen.create_tickets(order)
+        cart.clear()
+        return order
+
+    @action(detail=True, methods=['get'])
+    def recommendations(self, request, pk=None):
+        """
+        Available items most often ordered together with the cart's contents
+        (?limit=, default 5), each with its `score`: one query over the
+        precomputed neighbours (see api/recommendations.py).
+        """
+        limit = request.query_params.get('limit', '5')
+        if not limit.isdigit() or not 1 <= int(limit) <= 20:
+            return Response({"detail": "limit must be between 1 and 20."}, status=status.HTTP_400_BAD_REQUEST)
+        if as_id(pk) is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        # Scoped to the user's own cart inside the query; another cart simply has no suggestions
+        in_cart = CartItem.objects.filter(cart_id=as_id(pk), cart__customer=request.user).values('menu_item_id')
+        items = (
+            MenuItem.objects.filter(recommended_with__menu_item__in=in_cart, is_available=True)
+            .exclude(pk__in=in_cart)
+            .annotate(score=Sum('recommended_with__score'))
+            .order_by('-score', 'id')[:int(limit)]
+        )
+        data = MenuItemSerializer(items, many=True, context=self.get_serializer_context()).data
+        for item, menu_item in zip(data, items):
+            item['score'] = menu_item.score
+        return Response(data)
+
     @action(detail=True, methods=['post']) # Members can remove their own items
     def remove_item(self, request, pk=None):
         """Removes an item from the cart."""
@@ -232,11 +447,10 @@ class CartViewSet(viewsets.GenericViewSet):
             return Response({"detail": "cart_item_id is required."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            cart_item = CartItem.objects.get(cart=cart, id=cart_item_id)
+            cart_item = cart.items.select_related('menu_item').get(id=cart_item_id)
             cart_item.delete()
             # After deletion, re-serialize the entire cart to send the updated state
-            serializer = CartSerializer(cart)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return self.cart_response(cart)
         except CartItem.DoesNotExist:
             return Response({"detail": "Cart item not found in your cart."}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
@@ -258,27 +472,36 @@ class CartViewSet(viewsets.GenericViewSet):
             return Response({"detail": "Quantity must be a positive integer."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            cart_item = CartItem.objects.get(cart=cart, id=cart_item_id)
+            cart_item = cart.items.select_related('menu_item').get(id=cart_item_id)
             cart_item.quantity = new_quantity
             cart_item.save()
-            serializer = CartSerializer(cart)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return self.cart_response(cart)
         except CartItem.DoesNotExist:
             return Response({"detail": "Cart item not found in your cart."}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             return Response({"detail": f"An error occurred: {e}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(ExpandableQuerysetMixin, AsyncModelViewSet):
     queryset = Order.objects.all().order_by('-created_at')
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated] # Base permission for all order actions
 
     def get_queryset(self):
         # Admins/Managers can see all orders. Members can only see their own.
-        if self.request.user.is_authenticated and not (self.request.user.is_staff or self.request.user.role in ['admin', 'manager']):
-            return self.queryset.filter(customer=self.request.user)
-        return self.queryset
+        is_member = self.request.user.is_authenticated and not (self.request.user.is_staff or self.request.user.role in ['admin', 'manager'])
+        # Reads include archived orders; the staff list stays on current orders (see `history`)
+        if self.action in ('retrieve', 'history') or (self.action == 'list' and is_member):
+            queryset = OrderHistory().apply(self.select_requested)
+        else:
+            queryset = self.select_requested(self.queryset)
+        if is_member:
+            return queryset.filter(customer=self.request.user)
+        return queryset
+
+    async def retrieve(self, request, *args, **kwargs):
+        order = await self.aget_object()  # Current, then archived
+        return Response(self.get_serializer(order).data)
 
     def create(self, request, *args, **kwargs):
         # Orders are created via cart checkout, not directly via POST to /orders/
@@ -300,6 +523,28 @@ class OrderViewSet(viewsets.ModelViewSet):
             return Response({"detail": "Only admins can delete orders."}, status=status.HTTP_403_FORBIDDEN)
         return super().destroy(request, *args, **kwargs)
 
+    def perform_destroy(self, instance):
+        items = list(instance.items.values_list('menu_item_id', 'quantity'))
+        with transaction.atomic():
+            CrewAvailability.release(Order.objects.filter(pk=instance.pk))
+            super().perform_destroy(instance)
+            leaderboards.order_deleted(instance, items)
+        region = instance.restaurant.region
+        transaction.on_commit(lambda: analytics.invalidate_order(instance, region))
+
+    @action(detail=False, methods=['get'])
+    def history(self, request):
+        """Current and archived orders, newest first, optionally for one ?customer= or ?restaurant=."""
+        queryset = self.get_queryset()
+        for param in ('customer', 'restaurant'):
+            value = request.query_params.get(param)
+            if value:
+                if not value.isdigit():
+                    return Response({"detail": f"Invalid {param}."}, status=status.HTTP_400_BAD_REQUEST)
+                queryset = queryset.filter(**{f'{param}_id': value})
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
     @action(detail=True, methods=['post'], permission_classes=[IsAdmin | IsManager]) # Only Admin/Manager can update status
     def update_status(self, request, pk=None):
         """Admin/Manager action to update order status."""
@@ -338,8 +583,65 @@ class OrderViewSet(viewsets.ModelViewSet):
             return Response(serializer.data)
         return Response({"detail": "Invalid payment method or payment method not provided."}, status=status.HTTP_400_BAD_REQUEST)
 
+class KitchenTicketViewSet(viewsets.GenericViewSet):
+    """
+    A station's ticket queue: list peeks at the next ?limit= queued tickets,
+    `next` acknowledges and returns them, `ready` marks tickets done. Managers
+    work the restaurants of their region.
+    """
+    permission_classes = [IsAdmin | IsManager]
+    serializer_class = KitchenTicketSerializer
+
+    def get_restaurant(self, data):
+        restaurants = Restaurant.objects.all()
+        if self.request.user.role != 'admin':
+            restaurants = restaurants.filter(region=self.request.user.region)
+        restaurant_id = str(data.get('restaurant', ''))
+        if not restaurant_id.isdigit():
+            return None
+        return restaurants.filter(pk=restaurant_id).first()
+
+    def get_limit(self, data):
+        limit = str(data.get('limit', '10'))
+        return int(limit) if limit.isdigit() and 1 <= int(limit) <= 100 else None
+
+    def list(self, request):
+        restaurant, limit = self.get_restaurant(request.query_params), self.get_limit(request.query_params)
+        if restaurant is None or limit is None or not request.query_params.get('station'):
+            return Response({"detail": "restaurant, station and a limit between 1 and 100 are required."}, status=status.HTTP_400_BAD_REQUEST)
+        tickets = kitchen.queue(restaurant.pk, request.query_params['station'])[:limit]
+        return Response(self.get_serializer(tickets, many=True).data)
+
+    @action(detail=False, methods=['post'])
+    def next(self, request):
+        """Acknowledges the next ?limit= tickets of a station; each ticket goes to one caller."""
+        restaurant, limit = self.get_restaurant(request.data), self.get_limit(request.data)
+        if restaurant is None or limit is None or not request.data.get('station'):
+            return Response({"detail": "restaurant, station and a limit between 1 and 100 are required."}, status=status.HTTP_400_BAD_REQUEST)
+        tickets = kitchen.take_next(restaurant.pk, request.data['station'], limit)
+        return Response(self.get_serializer(tickets, many=True).data)
+
+    @action(detail=False, methods=['post'])
+    def ready(self, request):
+        restaurant, ids = self.get_restaurant(request.data), request.data.get('ids')
+        if restaurant is None or not isinstance(ids, list) or not all(isinstance(id, int) for id in ids):
+            return Response({"detail": "restaurant and a list of ticket ids are required."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"ready": kitchen.advance(restaurant.pk, ids, 'ready')})
+
+class ThrottledTokenObtainPairView(TokenObtainPairView):
+    """JWT login; password hashing is expensive, so attempts are rate limited per IP."""
+    throttle_classes = [IPTokenBucketThrottle]
+    throttle_scope = 'auth'
+
+class ThrottledDjoserUserViewSet(DjoserUserViewSet):
+    """djoser's reset_password and reset_username, which send email, rate limited per IP like PasswordResetView."""
+    throttle_classes = [IPTokenBucketThrottle]
+    throttle_scope = 'password_reset'
+
 class PasswordResetView(APIView):
     permission_classes = (AllowAny,)
+    throttle_classes = [IPTokenBucketThrottle]
+    throttle_scope = 'password_reset'
 
     def post(self, request):
         email = request.data.get('email')
@@ -399,6 +701,8 @@ class PasswordResetConfirmView(APIView):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def paypal_payment_complete(request):
+    from paypalcheckoutsdk.orders import OrdersGetRequest
+
     PPClient = PayPalClient()
     order_id = request.data.get("orderID")
     if not order_id:
@@ -416,11 +720,20 @@ def paypal_payment_complete(request):
     # Get user's cart
     cart, _ = Cart.objects.get_or_create(customer=request.user)
     if not cart.items.exists():
+        metrics.record_checkout('paypal', 'empty_cart')
         return Response({"detail": "Cart is empty"}, status=status.HTTP_400_BAD_REQUEST)
 
     # Create order
     with transaction.atomic():
-        first_item_restaurant = cart.items.first().menu_item.restaurant
+        # Locked, so a second completion for the cart waits for this one and then finds it empty
+        cart = Cart.objects.select_for_update().get(pk=cart.pk)
+        lines = list(cart.items.select_related('menu_item__restaurant'))
+        if not lines:
+            metrics.record_checkout('paypal', 'empty_cart')
+            return Response({"detail": "Cart is empty"}, status=status.HTTP_400_BAD_REQUEST)
+        # The payment is already captured, so a shortfall is sold down to zero rather than refused
+        inventory.reserve([(line.menu_item, line.quantity) for line in lines], allow_shortfall=True)
+        first_item_restaurant = lines[0].menu_item.restaurant
         order = Order.objects.create(
             customer=request.user,
             restaurant=first_item_restaurant,
@@ -429,7 +742,7 @@ def paypal_payment_complete(request):
             special_instructions="",
             status='confirmed'
         )
-        for cart_item in cart.items.all():
+        for cart_item in lines:
             OrderItem.objects.create(
                 order=order,
                 menu_item=cart_item.menu_item,
@@ -437,6 +750,8 @@ def paypal_payment_complete(request):
                 price=cart_item.menu_item.price,
                 special_instructions=cart_item.special_instructions
             )
-        cart.items.all().delete()
+        kitchen.create_tickets(order)
+        cart.clear()
 
+    metrics.record_checkout('paypal', 'created')
     return Response({"message": "Payment completed!", "order_id": order.id}, status=status.HTTP_201_CREATED)
\ No newline at end of file
@@ -0,0 +1,21 @@
+# gunicorn.conf.py
+# Picked up automatically by `gunicorn restaurant.wsgi` when started from Backend/.
+import os
+import shutil
+
+# Prometheus multiprocess mode: each worker writes its metric samples here and
+# /api/v1/metrics/ aggregates them, so counters are correct across workers.
+# Must be set before prometheus_client is imported by the app.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus_multiproc')
+
+
+def on_starting(server):
+    # Samples from a previous master would otherwise be summed in
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
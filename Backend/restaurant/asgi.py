@@ -12,5 +12,14 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "restaurant.settings")
+# A connection can't outlive its request's thread here, see DATABASES
+os.environ.setdefault("DB_CONN_MAX_AGE", "0")
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.WARMUP_ON_START:
+    from api.startup import warmup
+
+    warmup()
@@ -29,7 +29,9 @@ SECRET_KEY = 'django-insecure-=$zwlk9#8350s7zpr_$x=c2x7+#p0of=ml#ffeqh*wciy35+tn
 # SECRET_KEY = os.getenv("SECRET_KEY")
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Off unless asked for (DEBUG=True in a development .env), so a deploy without
+# it can't expose the live schema, the browsable API or debug pages
+DEBUG = config('DEBUG', default=False, cast=bool)
 
 ALLOWED_HOSTS = [
     "slooze-restaurant.onrender.com",
@@ -49,8 +51,6 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     # Third-party apps
-    'cloudinary',
-    'cloudinary_storage',
     'rest_framework',
     'rest_framework_simplejwt',
     'djoser',
@@ -62,24 +62,37 @@ INSTALLED_APPS = [
     'api.apps.ApiConfig',
 ]
 
+# Cloudinary only loads (and costs its import time) when it is configured
+if config('CLOUDINARY_URL', default=''):
+    INSTALLED_APPS[6:6] = ['cloudinary', 'cloudinary_storage']
+
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    'whitenoise.middleware.WhiteNoiseMiddleware',
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    'api.middleware.StaticFilesMiddleware',  # WhiteNoise, async-capable
+    "api.middleware.RequestInstrumentationMiddleware",
+    "api.middleware.CompressionMiddleware",
+    "api.middleware.StatementTimeoutMiddleware",  # PostgreSQL only
+    # Django's session, CSRF, auth and message middleware, skipped for /api/
+    "api.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
+    "api.middleware.CsrfViewMiddleware",
+    "api.middleware.AuthenticationMiddleware",
+    "api.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
 ROOT_URLCONF = "restaurant.urls"
 
+# The frontend's production build (index.html and assets/). collectstatic
+# stores it under static/dist/, and its index.html is the app shell
+# (api/frontend.py), ahead of the copy in templates/
+FRONTEND_DIST_DIR = config('FRONTEND_DIST_DIR', default=os.path.join(BASE_DIR.parent, 'frontend', 'dist'))
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
-        "DIRS": [os.path.join(BASE_DIR, 'templates')],
+        "DIRS": [FRONTEND_DIST_DIR, os.path.join(BASE_DIR, 'templates')],
         "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
@@ -116,15 +129,60 @@ WSGI_APPLICATION = "restaurant.wsgi.application"
 #     }
 # }
 
+# Persistent connections suit sync workers, which reuse their thread; under
+# ASGI every request runs in a thread of its own, so restaurant/asgi.py sets 0
 DATABASES = {
     'default': dj_database_url.config(
         default=config('DATABASE_URL'),
-        conn_max_age=600,
+        conn_max_age=config('DB_CONN_MAX_AGE', default=600, cast=int),
         conn_health_checks=True,
-        ssl_require=True
+        # Off for a local PostgreSQL without SSL, e.g. to run the tests against
+        ssl_require=config('DB_SSL_REQUIRE', default=True, cast=bool),
     )
 }
 
+# On PostgreSQL each process keeps a psycopg connection pool that its threads
+# (sync workers' and ASGI requests' alike) borrow from, instead of a
+# persistent connection per thread
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql' and config('DB_POOL', default=True, cast=bool):
+    DATABASES['default']['CONN_MAX_AGE'] = 0  # Returned to the pool at the end of each request
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+        'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+        # Seconds to wait for a free connection before the request fails
+        'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+    }
+
+# PostgreSQL statement timeouts in milliseconds, per view statement_timeout_scope
+# (api/middleware.py, StatementTimeoutMiddleware)
+STATEMENT_TIMEOUTS = {
+    'default': config('STATEMENT_TIMEOUT_MS', default=5000, cast=int),
+    'cart': config('CART_STATEMENT_TIMEOUT_MS', default=3000, cast=int),
+    'dashboard': config('DASHBOARD_STATEMENT_TIMEOUT_MS', default=30000, cast=int),
+    'analytics': config('ANALYTICS_STATEMENT_TIMEOUT_MS', default=60000, cast=int),
+}
+
+
+# Cache
+# A shared Redis cache is used when REDIS_URL is set (throttle buckets must be
+# visible to every worker); otherwise each process gets its own local memory cache.
+
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -162,6 +220,14 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+# Through collectstatic the build's assets get their compressed copies too
+STATICFILES_DIRS = [('dist', FRONTEND_DIST_DIR)] if os.path.isdir(FRONTEND_DIST_DIR) else []
+# collectstatic adds content hashes and gzipped copies; WhiteNoise then
+# serves the hashed files with a far-future, immutable Cache-Control
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"},
+}
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # Default primary key field type
@@ -171,9 +237,8 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
-        "rest_framework.renderers.BrowsableAPIRenderer",
-    ],
+        "api.renderers.ORJSONRenderer",
+    ] + (["rest_framework.renderers.BrowsableAPIRenderer"] if DEBUG else []),
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
     ],
@@ -181,6 +246,16 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    # Token bucket sizes per throttle_scope, see api/throttling.py
+    "DEFAULT_THROTTLE_RATES": {
+        "auth": config("THROTTLE_AUTH_RATE", default="10/min"),
+        "password_reset": config("THROTTLE_PASSWORD_RESET_RATE", default="5/hour"),
+        "cart": config("THROTTLE_CART_RATE", default="120/min"),
+        "checkout": config("THROTTLE_CHECKOUT_RATE", default="10/min"),
+    },
+    # Proxies in front of the app (Render's load balancer): the client IP the
+    # throttles key on is taken that many entries from the end of X-Forwarded-For
+    "NUM_PROXIES": config("NUM_PROXIES", default=1, cast=int),
 
 }
 
@@ -245,6 +320,11 @@ SPECTACULAR_SETTINGS = {
     "VERSION": "1.0.0",
 }
 
+# Prebuilt schema (api/schema.py): where `build_schema` writes it, and whether
+# to generate it on every request instead, as in development
+SCHEMA_ARTIFACT_DIR = config('SCHEMA_ARTIFACT_DIR', default=os.path.join(BASE_DIR, 'schema_build'))
+SCHEMA_LIVE = config('SCHEMA_LIVE', default=DEBUG, cast=bool)
+
 
 AUTH_USER_MODEL = 'api.User'
 
@@ -302,15 +382,63 @@ EMAIL_USE_TLS = config('EMAIL_USE_TLS', cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 
+# Bearer for Prometheus scrapes of /api/v1/metrics/ ("Authorization: Token <METRICS_TOKEN>")
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Requests slower than this are written to the api.slow_requests log
+SLOW_REQUEST_THRESHOLD_MS = config('SLOW_REQUEST_THRESHOLD_MS', default=500, cast=int)
+
+# Smallest response body CompressionMiddleware gzips/brotlis, in bytes
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+
+# Run api/jobs.py background jobs inline instead of on a worker thread
+JOBS_EAGER = config('JOBS_EAGER', default=False, cast=bool)
+
+# Seconds a pre-rendered menu stays in the cache. With a per-process cache
+# (no REDIS_URL) another worker may serve a menu this much out of date.
+MENU_DOCUMENT_CACHE_TIMEOUT = config('MENU_DOCUMENT_CACHE_TIMEOUT', default=300, cast=int)
+
+# Delivered and cancelled orders older than this many days are moved to the
+# archive tables by `manage.py archive_orders`
+ORDER_ARCHIVE_AFTER_DAYS = config('ORDER_ARCHIVE_AFTER_DAYS', default=90, cast=int)
+
+# Seconds a closed order analytics bucket stays cached. Order saves drop the
+# buckets they touch; this bounds staleness from queryset updates.
+ANALYTICS_CACHE_TIMEOUT = config('ANALYTICS_CACHE_TIMEOUT', default=86400, cast=int)
+
+# Kitchen tickets are promised this many minutes after their order is placed
+KITCHEN_PROMISE_MINUTES = config('KITCHEN_PROMISE_MINUTES', default=30, cast=int)
+
+# Delivery assignment (api/dispatch.py): crew travel speed, and the travel
+# time assumed when a crew member's or restaurant's position is unknown
+DELIVERY_SPEED_KMH = config('DELIVERY_SPEED_KMH', default=20, cast=float)
+DELIVERY_UNKNOWN_TRAVEL_MINUTES = config('DELIVERY_UNKNOWN_TRAVEL_MINUTES', default=15, cast=float)
+
+# "Frequently ordered together" items kept per menu item (api/recommendations.py)
+RECOMMENDATIONS_PER_ITEM = config('RECOMMENDATIONS_PER_ITEM', default=10, cast=int)
+
+# Warm up each worker once the application is loaded (see api/startup.py)
+WARMUP_ON_START = config('WARMUP_ON_START', default=True, cast=bool)
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'message': {
+            'format': '%(message)s',
+        },
+    },
     'handlers': {
         'file': {
             'level': 'DEBUG',
             'class': 'logging.FileHandler',
             'filename': 'debug.log',
         },
+        'slow_requests': {
+            'level': 'WARNING',
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
     },
     'loggers': {
         'trashapi': {
@@ -318,6 +446,12 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': True,
         },
+        # One JSON object per slow request, see api/middleware.py
+        'api.slow_requests': {
+            'handlers': ['slow_requests'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
     },
 }
 
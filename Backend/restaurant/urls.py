@@ -16,34 +16,56 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularRedocView,
-    SpectacularSwaggerView,
-)
+from django.utils.module_loading import import_string
+from django.views.decorators.csrf import csrf_exempt
 
-urlpatterns = [
-    path("admin/", admin.site.urls),
-    path("api/v1/", include("api.urls")),
-]
+from api.frontend import spa_shell
 
-# media
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
-# docs and schema
-urlpatterns += [
-    path("api/v1/schema/", SpectacularAPIView.as_view(), name="schema"),
+def lazy_view(dotted_path, **initkwargs):
+    """
+    Imports the class-based view on its first request instead of with the
+    URLconf: the schema and docs views are slow to import and rarely used.
+    """
+    view = None
+
+    @csrf_exempt
+    def dispatch(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(dotted_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    dispatch.__name__ = dotted_path.rsplit(".", 1)[-1]
+    return dispatch
+
+
+urlpatterns = [
+    path("admin/", admin.site.urls),
+    # docs and schema, ahead of api.urls and its catch-all
+    path("api/v1/schema/", lazy_view("api.schema.SchemaView"), name="schema"),
     path(
         "api/v1/schema/redoc",
-        SpectacularRedocView.as_view(),
+        lazy_view("drf_spectacular.views.SpectacularRedocView"),
         name="redoc",
     ),
     path(
         "api/v1/schema/swagger-ui/",
-        SpectacularSwaggerView.as_view(),
+        lazy_view("drf_spectacular.views.SpectacularSwaggerView"),
         name="swagger-ui",
     ),
+    path("api/v1/", include("api.urls")),
+]
+
+# media
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+# Every other path is the React app's; unknown API paths get a JSON 404
+urlpatterns += [
+    re_path(r"^(?!api/|admin/|static/|media/)", spa_shell, name="spa"),
 ]
+
+handler404 = "api.frontend.not_found"
@@ -76,7 +76,7 @@ const Dashboard: React.FC = () => {
         },
         {
           title: 'Total Revenue',
-          value: `$${(stats?.total_revenue || 0).toLocaleString()}`,
+          value: `$${Number(stats?.total_revenue || 0).toLocaleString()}`,
           icon: DollarSign,
           color: 'bg-purple-500',
           change: '+15%',
@@ -111,7 +111,7 @@ const Dashboard: React.FC = () => {
         },
         {
           title: 'Revenue',
-          value: `$${(stats?.total_revenue || 0).toLocaleString()}`,
+          value: `$${Number(stats?.total_revenue || 0).toLocaleString()}`,
           icon: DollarSign,
           color: 'bg-purple-500',
           change: '+12%',
@@ -130,7 +130,7 @@ const Dashboard: React.FC = () => {
         },
         {
           title: 'Total Spent',
-          value: `$${(stats?.total_spent || 0).toLocaleString()}`,
+          value: `$${Number(stats?.total_spent || 0).toLocaleString()}`,
           icon: DollarSign,
           color: 'bg-green-500',
           change: '',
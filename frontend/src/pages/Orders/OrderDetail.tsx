@@ -118,7 +118,7 @@ const OrderDetail: React.FC = () => {
                 <span className="text-gray-600">
                   {item.quantity}x {item.menu_item.name}
                 </span>
-                <span className="text-gray-900">${item.subtotal.toFixed(2)}</span>
+                <span className="text-gray-900">${Number(item.subtotal).toFixed(2)}</span>
               </div>
             ))}
           </div>
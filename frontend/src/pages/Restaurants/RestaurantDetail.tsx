@@ -3,7 +3,7 @@ import { useParams, Link, useNavigate } from 'react-router-dom';
 import { useQuery } from 'react-query';
 import { apiService } from '../../services/api';
 import { useAuthStore } from '../../stores/authStore';
-import { Restaurant, MenuItem } from '../../types';
+import { Restaurant, RestaurantMenu } from '../../types';
 
 const RestaurantDetail: React.FC = () => {
   const { id } = useParams<{ id: string }>();
@@ -16,11 +16,14 @@ const RestaurantDetail: React.FC = () => {
     { enabled: !!id }
   );
 
-  const { data: menuItems, isLoading: loadingMenu } = useQuery<MenuItem[]>(
-    ['menuItems', id],
-    () => apiService.getMenuItems(Number(id)),
+  const { data: menu, isLoading: loadingMenu } = useQuery<RestaurantMenu>(
+    ['restaurantMenu', id],
+    () => apiService.getRestaurantMenu(Number(id)),
     { enabled: !!id }
   );
+  const menuItems = menu?.categories.flatMap((category) =>
+    category.items.map((item) => ({ ...item, category }))
+  );
 
   if (isLoading) return <div>Loading restaurant...</div>;
   if (error || !restaurant) return <div>Restaurant not found.</div>;
@@ -3,6 +3,7 @@ import {
   User, 
   Restaurant, 
   MenuItem, 
+  RestaurantMenu,
   Cart, 
   Order, 
   LoginCredentials, 
@@ -12,6 +13,10 @@ import {
 
 const API_BASE_URL = process.env.REACT_APP_API_URL!;
 
+// The API returns related objects as ids unless expanded
+const CART_PARAMS = { expand: 'items.menu_item' };
+const ORDER_PARAMS = { expand: 'restaurant,items.menu_item' };
+
 class ApiService {
   private api: AxiosInstance;
 
@@ -139,6 +144,11 @@ class ApiService {
     return response.data;
   }
 
+  async getRestaurantMenu(id: number): Promise<RestaurantMenu> {
+    const response: AxiosResponse<RestaurantMenu> = await this.api.get(`/restaurants/${id}/menu/`);
+    return response.data;
+  }
+
   async createRestaurant(data: Omit<Restaurant, 'id' | 'created_at' | 'updated_at'>): Promise<Restaurant> {
     const response: AxiosResponse<Restaurant> = await this.api.post('/restaurants/', data);
     return response.data;
@@ -155,13 +165,13 @@ class ApiService {
 
   // Menu item endpoints
   async getMenuItems(restaurantId?: number): Promise<MenuItem[]> {
-    const params = restaurantId ? { restaurant_id: restaurantId } : {};
+    const params = restaurantId ? { restaurant_id: restaurantId, expand: 'category' } : { expand: 'category' };
     const response: AxiosResponse<MenuItem[]> = await this.api.get('/menu-items/', { params });
     return response.data;
   }
 
   async getMenuItem(id: number): Promise<MenuItem> {
-    const response: AxiosResponse<MenuItem> = await this.api.get(`/menu-items/${id}/`);
+    const response: AxiosResponse<MenuItem> = await this.api.get(`/menu-items/${id}/`, { params: { expand: 'category' } });
     return response.data;
   }
 
@@ -181,7 +191,7 @@ class ApiService {
 
   // Cart endpoints
   async getCart(): Promise<Cart> {
-    const response: AxiosResponse<Cart> = await this.api.get('/cart/current/');
+    const response: AxiosResponse<Cart> = await this.api.get('/cart/current/', { params: CART_PARAMS });
     return response.data;
   }
 
@@ -192,12 +202,12 @@ class ApiService {
       menu_item_id: menuItemId,
       quantity,
       special_instructions: specialInstructions || '',
-    });
+    }, { params: CART_PARAMS });
     return response.data;
   }
 
   async removeFromCart(cartId: number, cartItemId: number): Promise<Cart> {
-    const response: AxiosResponse<Cart> = await this.api.post(`/cart/${cartId}/remove_item/`, { cart_item_id: cartItemId });
+    const response: AxiosResponse<Cart> = await this.api.post(`/cart/${cartId}/remove_item/`, { cart_item_id: cartItemId }, { params: CART_PARAMS });
     return response.data;
   }
 
@@ -205,7 +215,7 @@ class ApiService {
     const response: AxiosResponse<Cart> = await this.api.post(`/cart/${cartId}/update_quantity/`, {
       cart_item_id: cartItemId,
       quantity: quantity,
-    });
+    }, { params: CART_PARAMS });
     return response.data;
   }
 
@@ -221,29 +231,29 @@ class ApiService {
 
   // Order endpoints
   async getOrders(): Promise<Order[]> {
-    const response: AxiosResponse<Order[]> = await this.api.get('/orders/');
+    const response: AxiosResponse<Order[]> = await this.api.get('/orders/', { params: ORDER_PARAMS });
     return response.data;
   }
 
   async getOrder(id: number): Promise<Order> {
-    const response: AxiosResponse<Order> = await this.api.get(`/orders/${id}/`);
+    const response: AxiosResponse<Order> = await this.api.get(`/orders/${id}/`, { params: ORDER_PARAMS });
     return response.data;
   }
 
   async placeOrder(id: number): Promise<Order> {
-    const response: AxiosResponse<Order> = await this.api.post(`/orders/${id}/place/`);
+    const response: AxiosResponse<Order> = await this.api.post(`/orders/${id}/place/`, null, { params: ORDER_PARAMS });
     return response.data;
   }
 
   async cancelOrder(id: number): Promise<Order> {
-    const response: AxiosResponse<Order> = await this.api.post(`/orders/${id}/cancel/`);
+    const response: AxiosResponse<Order> = await this.api.post(`/orders/${id}/cancel/`, null, { params: ORDER_PARAMS });
     return response.data;
   }
 
   async updateOrderPayment(id: number, paymentMethod: string): Promise<Order> {
     const response: AxiosResponse<Order> = await this.api.post(`/orders/${id}/update_payment/`, {
       payment_method: paymentMethod,
-    });
+    }, { params: ORDER_PARAMS });
     return response.data;
   }
 
@@ -269,6 +279,7 @@ const boundApiService = {
   ...apiService,
   getRestaurants: apiService.getRestaurants.bind(apiService),
   getRestaurant: apiService.getRestaurant.bind(apiService),
+  getRestaurantMenu: apiService.getRestaurantMenu.bind(apiService),
   createRestaurant: apiService.createRestaurant.bind(apiService),
   updateRestaurant: apiService.updateRestaurant.bind(apiService),
   deleteRestaurant: apiService.deleteRestaurant.bind(apiService),
@@ -16,6 +16,9 @@ export interface Restaurant {
   region: 'india' | 'america';
   rating: string;
   image_url?: string;
+  latitude?: number | null;
+  longitude?: number | null;
+  geohash?: string;
   is_active: boolean;
   created_by?: number;
   created_at: string;
@@ -41,6 +44,12 @@ export interface MenuItem {
   updated_at: string;
 }
 
+export interface RestaurantMenu {
+  restaurant: Pick<Restaurant, 'id' | 'name' | 'cuisine_type' | 'region'>;
+  categories: Array<Pick<Category, 'id' | 'name'> & { items: Array<Omit<MenuItem, 'category'> & { category: number }> }>;
+  generated_at: string;
+}
+
 export interface CartItem {
   id: number;
   menu_item: MenuItem;
@@ -55,6 +64,8 @@ export interface Cart {
   id: number;
   customer: number;
   items: CartItem[];
+  item_count: number;
+  subtotal: number;
   total: number;
   created_at: string;
   updated_at: string;